@@ -13,19 +13,23 @@
 # limitations under the License.
 
 # mypy: disable-error-code="attr-defined,arg-type"
+import atexit
 import logging
 import os
+from collections.abc import AsyncIterable
+from functools import cache
 from typing import Any
 
 import vertexai
 from dotenv import load_dotenv
-from google.adk.artifacts import GcsArtifactService, InMemoryArtifactService
-from google.cloud import logging as google_cloud_logging
+from google.adk.artifacts import BaseArtifactService
 from vertexai.agent_engines.templates.adk import AdkApp
 
-from app.agent import app as adk_app
+from app.app_utils.feedback_writer import FeedbackWriter
+from app.app_utils.model_backend import configure_vertex_ai
 from app.app_utils.telemetry import setup_telemetry
 from app.app_utils.typing import Feedback
+from app.app_utils.upload_queue import get_upload_queue, upload_mode
 
 # Load environment variables from .env file at runtime
 load_dotenv()
@@ -34,30 +38,123 @@ load_dotenv()
 class AgentEngineApp(AdkApp):
     def set_up(self) -> None:
         """Initialize the agent engine app with logging and telemetry."""
+        configure_vertex_ai()
         vertexai.init()
         setup_telemetry()
         super().set_up()
         logging.basicConfig(level=logging.INFO)
+        from google.cloud import logging as google_cloud_logging
+
         logging_client = google_cloud_logging.Client()
         self.logger = logging_client.logger(__name__)
+        self.start_feedback_writer()
         if gemini_location:
             os.environ["GOOGLE_CLOUD_LOCATION"] = gemini_location
+        if upload_mode() == "write-behind":
+            get_upload_queue()  # Resumes uploads spooled before a restart.
+        self.warm_up()
+
+    def warm_up(self) -> None:
+        """Pre-create clients and render workers before the first request.
+
+        The instance reports ready once this returns; the step durations are
+        logged and returned by `readiness`.
+        """
+        from app.app_utils.warmup import warm_up
+
+        app = self._tmpl_attrs.get("app")
+        agent = app.root_agent if app else self._tmpl_attrs["agent"]
+        self.warmup_report = warm_up(agent)
+        self.logger.log_struct(
+            {"event": "warmup", **self.warmup_report.to_dict()}, severity="INFO"
+        )
+        logging.info(f"Ready after {self.warmup_report.total:.2f} s of warm-up")
+
+    def readiness(self) -> dict[str, Any]:
+        """Report whether warm-up has finished and how long each step took."""
+        report = getattr(self, "warmup_report", None)
+        return {
+            "ready": report is not None,
+            "warmup": report.to_dict() if report else None,
+        }
+
+    def upload_status(self) -> dict[str, Any]:
+        """Report write-behind PDF uploads that are pending or have failed."""
+        mode = upload_mode()
+        if mode != "write-behind":
+            return {"mode": mode, "pending": [], "failed": [], "uploaded": 0}
+        return {"mode": mode, **get_upload_queue().status()}
+
+    def start_feedback_writer(self) -> None:
+        """Write feedback to `self.logger` in batches from a background thread.
+
+        Whatever is still queued is written when the interpreter exits.
+        """
+        self.feedback_writer = FeedbackWriter(self.logger).start()
+        atexit.register(self.feedback_writer.close)
 
     def register_feedback(self, feedback: dict[str, Any]) -> None:
-        """Collect and log feedback."""
+        """Collect and queue feedback for logging."""
         feedback_obj = Feedback.model_validate(feedback)
-        self.logger.log_struct(feedback_obj.model_dump(), severity="INFO")
+        self.feedback_writer.submit(feedback_obj)
+
+    async def async_stream_batch_swot(
+        self,
+        companies: list[str],
+        concurrency: int | None = None,
+        max_attempts: int | None = None,
+    ) -> AsyncIterable[dict[str, Any]]:
+        """Analyze a list of companies and stream one manifest record each."""
+        from app.app_utils.publish import publish_swot_pdf
+        from app.batch import SwotBatch, default_batch_pipeline
+
+        batch = SwotBatch(
+            default_batch_pipeline(),
+            publish_swot_pdf,
+            concurrency=concurrency,
+            max_attempts=max_attempts,
+        )
+        async for result in batch.run(companies):
+            yield result.to_manifest()
 
     def register_operations(self) -> dict[str, list[str]]:
         """Registers the operations of the Agent."""
         operations = super().register_operations()
-        operations[""] = operations.get("", []) + ["register_feedback"]
+        operations[""] = operations.get("", []) + [
+            "register_feedback",
+            "readiness",
+            "upload_status",
+        ]
+        operations["async_stream"] = [
+            *operations.get("async_stream", []),
+            "async_stream_batch_swot",
+        ]
         return operations
 
 
+def build_artifact_service() -> BaseArtifactService:
+    """GCS artifact service; gcsfs and the storage client load on first use."""
+    from app.app_utils.pdf import BUCKET_NAME
+    from app.app_utils.storage import build_artifact_service
+
+    return build_artifact_service(BUCKET_NAME)
+
+
+@cache
+def get_agent_engine() -> AgentEngineApp:
+    """Build the Agent Engine app for the agent graph on first access."""
+    from app.agent import app as adk_app
+
+    return AgentEngineApp(app=adk_app, artifact_service_builder=build_artifact_service)
+
+
+def __getattr__(name: str) -> Any:
+    # `agent_engine` is the deployment entrypoint object; building it needs
+    # project credentials, so it is created when first looked up.
+    if name == "agent_engine":
+        return get_agent_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 gemini_location = os.environ.get("GOOGLE_CLOUD_LOCATION")
 logs_bucket_name = os.environ.get("LOGS_BUCKET_NAME")
-agent_engine = AgentEngineApp(
-    app=adk_app,
-    artifact_service_builder=lambda: GcsArtifactService(bucket_name="adk-pdf-create1"),
-)
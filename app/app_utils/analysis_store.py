@@ -0,0 +1,94 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pass the finished SWOT analysis between agents by reference.
+
+The analysis the root agent presents is stored once in session state and
+downstream tools receive only its short key, so the full markdown is not
+re-emitted as tool-call arguments and re-read by every later model turn.
+"""
+
+import logging
+from typing import Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.adk.sessions import Session
+
+LATEST_ANALYSIS_KEY = "latest_analysis_key"
+ANALYSIS_COUNT_KEY = "analysis_count"
+TOKENS_SAVED_KEY = "pdf_tokens_saved"
+RESEARCH_TOOL = "swot_research_agent"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return len(text) // 4
+
+
+def store_analysis(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> LlmResponse | None:
+    """`after_model_callback` that stores presented analyses in state.
+
+    The final (non-partial) text reply to a `swot_research_agent` result is
+    the presented analysis and is saved under `swot_analysis_<n>`; the key is
+    kept in `latest_analysis_key` for the root instruction. Other replies,
+    such as help or follow-up answers, never replace it.
+    """
+    content = llm_response.content
+    if llm_response.partial or not content or not content.parts:
+        return None
+    if any(part.function_call for part in content.parts):
+        return None
+    if not answers_research(callback_context.session):
+        return None
+    text = "".join(part.text or "" for part in content.parts if not part.thought)
+    if not text.strip():
+        return None
+    state = callback_context.state
+    count = state.get(ANALYSIS_COUNT_KEY, 0) + 1
+    key = f"swot_analysis_{count}"
+    state[ANALYSIS_COUNT_KEY] = count
+    state[key] = text
+    state[LATEST_ANALYSIS_KEY] = key
+    return None
+
+
+def answers_research(session: Session) -> bool:
+    """Whether the newest event of `session` is a `swot_research_agent` result."""
+    if not session.events:
+        return False
+    return any(
+        response.name == RESEARCH_TOOL
+        for response in session.events[-1].get_function_responses()
+    )
+
+
+def resolve_analysis(state: Any, analysis_key: str) -> str | None:
+    """Look up a stored analysis and record the tokens saved by reference.
+
+    Passing the text by value costs its tokens twice: once as tool-call output
+    and once more as input to every following model turn that re-reads the
+    call. Only the key is sent instead.
+    """
+    text = state.get(analysis_key or state.get(LATEST_ANALYSIS_KEY, ""))
+    if not isinstance(text, str):
+        return None
+    saved = 2 * (estimate_tokens(text) - estimate_tokens(analysis_key))
+    state[TOKENS_SAVED_KEY] = state.get(TOKENS_SAVED_KEY, 0) + saved
+    logging.info(
+        f"PDF analysis passed by reference: {len(text)} chars, ~{saved} tokens saved"
+    )
+    return text
@@ -14,16 +14,20 @@
 
 import asyncio
 import datetime
+import hashlib
 import importlib
 import inspect
 import json
 import logging
+import os
+import time
 import warnings
 from typing import Any
 
 import click
 import google.auth
 import vertexai
+from google.genai import errors
 from vertexai._genai import _agent_engines_utils
 from vertexai._genai.types import AgentEngine, AgentEngineConfig
 
@@ -64,9 +68,115 @@ def parse_key_value_pairs(kv_string: str | None) -> dict[str, str]:
     return result
 
 
+def hash_files(paths: list[str]) -> str:
+    """Hash the relative paths and contents of every file under `paths`.
+
+    Bytecode caches are skipped, so only source changes alter the hash.
+    """
+    digest = hashlib.sha256()
+    for root_path in paths:
+        files = [root_path] if os.path.isfile(root_path) else []
+        for root, dirs, names in os.walk(root_path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            files += [os.path.join(root, n) for n in names if not n.endswith(".pyc")]
+        for path in sorted(files):
+            digest.update(os.path.relpath(path).encode() + b"\0")
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def deployment_fingerprint(
+    source_packages: list[str],
+    entrypoint: str,
+    requirements_file: str,
+    env_vars: dict[str, str],
+    target: dict[str, Any],
+    deployment: dict[str, Any],
+    metadata: dict[str, Any],
+) -> dict[str, Any]:
+    """Summarize everything a deploy sends, to detect what changed.
+
+    Environment variable values are stored as short hashes only, since they
+    may hold secrets.
+    """
+    return {
+        "target": target,
+        "source": hash_files(source_packages),
+        "entrypoint": entrypoint,
+        "requirements": hash_files([requirements_file]),
+        "env_vars": {
+            key: hashlib.sha256(value.encode()).hexdigest()[:12]
+            for key, value in sorted(env_vars.items())
+        },
+        "deployment": deployment,
+        "metadata": metadata,
+    }
+
+
+def plan_update(previous: dict[str, Any] | None, current: dict[str, Any]) -> str:
+    """Choose how to bring an existing engine from `previous` to `current`.
+
+    Returns "skip" when nothing changed and "metadata" when only the
+    description, labels or service account changed, which can be patched
+    without uploading the source. Anything else, including env vars and
+    resource settings (the API only accepts those together with the source),
+    needs a "full" update.
+    """
+    if not previous:
+        return "full"
+    changed = {key for key in current if previous.get(key) != current[key]}
+    if not changed:
+        return "skip"
+    if changed == {"metadata"}:
+        return "metadata"
+    return "full"
+
+
+def diff_fingerprints(
+    previous: dict[str, Any] | None, current: dict[str, Any]
+) -> list[str]:
+    """Describe the changes between two fingerprints, one line each."""
+    if not previous:
+        return ["no previous deployment fingerprint"]
+    lines = []
+    for key, value in current.items():
+        old = previous.get(key)
+        if old == value:
+            continue
+        if isinstance(value, dict) and isinstance(old, dict):
+            for name in sorted(old.keys() | value.keys()):
+                if name not in old:
+                    lines.append(f"{key}.{name}: added")
+                elif name not in value:
+                    lines.append(f"{key}.{name}: removed")
+                elif old[name] != value[name]:
+                    if key == "env_vars":
+                        lines.append(f"{key}.{name}: changed")
+                    else:
+                        lines.append(f"{key}.{name}: {old[name]!r} -> {value[name]!r}")
+        elif isinstance(value, str) and len(value) == 64:
+            lines.append(f"{key}: {str(old)[:12]} -> {value[:12]}")
+        else:
+            lines.append(f"{key}: {old!r} -> {value!r}")
+    return lines
+
+
+def read_deployment_metadata(
+    metadata_file: str = "deployment_metadata.json",
+) -> dict[str, Any] | None:
+    """Read the metadata written by the last deploy, if any."""
+    try:
+        with open(metadata_file, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
 def write_deployment_metadata(
     remote_agent: Any,
     metadata_file: str = "deployment_metadata.json",
+    fingerprint: dict[str, Any] | None = None,
 ) -> None:
     """Write deployment metadata to file."""
     metadata = {
@@ -75,6 +185,8 @@ def write_deployment_metadata(
         "is_a2a": False,
         "deployment_timestamp": datetime.datetime.now().isoformat(),
     }
+    if fingerprint is not None:
+        metadata["fingerprint"] = fingerprint
 
     with open(metadata_file, "w", encoding="utf-8") as f:
         json.dump(metadata, f, indent=2)
@@ -82,6 +194,81 @@ def write_deployment_metadata(
     logging.info(f"Agent Engine ID written to {metadata_file}")
 
 
+def engine_name(agent: AgentEngine) -> str:
+    """Resource name of an engine returned by the API, which always sets it."""
+    assert agent.api_resource is not None and agent.api_resource.name
+    return agent.api_resource.name
+
+
+def find_existing_engine(
+    client: Any,
+    display_name: str,
+    location: str,
+    recorded_name: str | None = None,
+) -> AgentEngine | None:
+    """Find the engine named `display_name`, cheapest lookup first.
+
+    Tries the resource name recorded in the deployment metadata, then a
+    server-side `display_name` filter, and scans every engine in the project
+    only if the filtered query fails.
+    """
+
+    def recorded() -> AgentEngine | None:
+        if not recorded_name or f"/locations/{location}/" not in recorded_name:
+            return None
+        try:
+            agent = client.agent_engines.get(name=recorded_name)
+        except errors.ClientError as e:
+            if e.code in (403, 404):
+                return None
+            raise
+        return agent if agent.api_resource.display_name == display_name else None
+
+    def filtered() -> AgentEngine | None:
+        escaped = display_name.replace("\\", "\\\\").replace('"', '\\"')
+        agents = client.agent_engines.list(
+            config={"filter": f'display_name="{escaped}"'}
+        )
+        return next(
+            (a for a in agents if a.api_resource.display_name == display_name), None
+        )
+
+    def scan() -> AgentEngine | None:
+        return next(
+            (
+                a
+                for a in client.agent_engines.list()
+                if a.api_resource.display_name == display_name
+            ),
+            None,
+        )
+
+    for strategy, lookup in (
+        ("recorded name", recorded),
+        ("filtered list", filtered),
+        ("full scan", scan),
+    ):
+        start = time.perf_counter()
+        try:
+            agent = lookup()
+        except errors.APIError as e:
+            # Without a conclusive answer a deploy could create a duplicate.
+            if strategy == "full scan":
+                raise
+            elapsed = time.perf_counter() - start
+            logging.warning(f"Engine lookup by {strategy} failed ({elapsed:.2f}s): {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        logging.info(
+            f"Engine lookup by {strategy}: "
+            f"{engine_name(agent) if agent else 'not found'} ({elapsed:.2f}s)"
+        )
+        # An empty filtered list is conclusive; only errors fall through to a scan.
+        if agent is not None or strategy != "recorded name":
+            return agent
+    return None
+
+
 def print_deployment_success(
     remote_agent: Any,
     location: str,
@@ -194,7 +381,23 @@ def print_deployment_success(
     "--num-workers",
     type=int,
     default=1,
-    help="Number of worker processes (default: 1)",
+    help="Serving processes per instance to size PDF render pools for; "
+    "the Agent Engine runtime decides how many actually run (default: 1)",
+)
+@click.option(
+    "--metadata-file",
+    default="deployment_metadata.json",
+    help="Where the engine id and deployment fingerprint are recorded",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Print what changed since the last deploy and the planned update, then exit",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Run a full update even if nothing changed",
 )
 def deploy_agent_engine_app(
     project: str | None,
@@ -214,7 +417,10 @@ def deploy_agent_engine_app(
     memory: str,
     container_concurrency: int,
     num_workers: int,
-) -> AgentEngine:
+    metadata_file: str,
+    dry_run: bool,
+    force: bool,
+) -> AgentEngine | None:
     """Deploy the agent engine app to Vertex AI."""
 
     logging.basicConfig(level=logging.INFO)
@@ -234,6 +440,10 @@ def deploy_agent_engine_app(
 
     if not project:
         _, project = google.auth.default()
+        if not project:
+            raise click.UsageError(
+                "No --project given and none set in the default credentials"
+            )
 
     print("""
     ╔═══════════════════════════════════════════════════════════╗
@@ -262,6 +472,35 @@ def deploy_agent_engine_app(
 
     source_packages_list = list(source_packages)
 
+    # Compare what would be deployed with the last deploy
+    fingerprint = deployment_fingerprint(
+        source_packages=source_packages_list,
+        entrypoint=f"{entrypoint_module}:{entrypoint_object}",
+        requirements_file=requirements_file,
+        env_vars=env_vars,
+        target={"project": project, "location": location, "display_name": display_name},
+        deployment={
+            "min_instances": min_instances,
+            "max_instances": max_instances,
+            "cpu": cpu,
+            "memory": memory,
+            "container_concurrency": container_concurrency,
+        },
+        metadata={
+            "description": description,
+            "labels": labels_dict,
+            "service_account": service_account,
+        },
+    )
+    previous = read_deployment_metadata(metadata_file) or {}
+    plan = "full" if force else plan_update(previous.get("fingerprint"), fingerprint)
+    click.echo("\n🔍 Changes since last deploy:")
+    for line in diff_fingerprints(previous.get("fingerprint"), fingerprint) or ["none"]:
+        click.echo(f"  {line}")
+    click.echo(f"  Planned update: {plan}")
+    if dry_run:
+        return None
+
     # Initialize vertexai client
     client = vertexai.Client(
         project=project,
@@ -271,6 +510,35 @@ def deploy_agent_engine_app(
 
     # Add agent garden labels if configured
 
+    # Check if an agent with this name already exists
+    existing_agent = find_existing_engine(
+        client, display_name, location, previous.get("remote_agent_engine_id")
+    )
+    # The fingerprint only describes the engine recorded with it
+    if existing_agent is None or (
+        engine_name(existing_agent) != previous.get("remote_agent_engine_id")
+    ):
+        plan = "full"
+    elif plan == "skip":
+        click.echo(f"\n✅ {display_name} is up to date, skipping the update")
+        return existing_agent
+    elif plan == "metadata":
+        click.echo(
+            f"\n📝 Patching description, labels and service account of {display_name}"
+        )
+        remote_agent = client.agent_engines.update(
+            name=engine_name(existing_agent),
+            config=AgentEngineConfig(
+                display_name=display_name,
+                description=description,
+                labels=labels_dict,
+                service_account=service_account,
+            ),
+        )
+        write_deployment_metadata(remote_agent, metadata_file, fingerprint)
+        print_deployment_success(remote_agent, location, project)
+        return remote_agent
+
     # Dynamically import the agent instance to generate class_methods
     logging.info(f"Importing {entrypoint_module}.{entrypoint_object}")
     module = importlib.import_module(entrypoint_module)
@@ -301,29 +569,21 @@ def deploy_agent_engine_app(
         agent_framework="google-adk",
     )
 
-    # Check if an agent with this name already exists
-    existing_agents = list(client.agent_engines.list())
-    matching_agents = [
-        agent
-        for agent in existing_agents
-        if agent.api_resource.display_name == display_name
-    ]
-
     # Deploy the agent (create or update)
-    if matching_agents:
+    if existing_agent is not None:
         click.echo(f"\n📝 Updating existing agent: {display_name}")
     else:
         click.echo(f"\n🚀 Creating new agent: {display_name}")
 
     click.echo("🚀 Deploying to Vertex AI Agent Engine (this can take 3-5 minutes)...")
-    if matching_agents:
+    if existing_agent is not None:
         remote_agent = client.agent_engines.update(
-            name=matching_agents[0].api_resource.name, config=config
+            name=engine_name(existing_agent), config=config
         )
     else:
         remote_agent = client.agent_engines.create(config=config)
 
-    write_deployment_metadata(remote_agent)
+    write_deployment_metadata(remote_agent, metadata_file, fingerprint)
     print_deployment_success(remote_agent, location, project)
 
     return remote_agent
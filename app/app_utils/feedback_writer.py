@@ -0,0 +1,236 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Write feedback to Cloud Logging in batches, off the request path.
+
+`register_feedback` only validates and queues the feedback. A background
+thread sends queued entries as one `entries.write` call per batch, when the
+batch is full or `flush_interval` seconds after its first entry, and drains
+the queue on `close`. Entries that do not fit in the queue, or whose batch
+failed to write, are appended to a JSONL spill file (when configured) and
+sent by the next writer that starts; without one they are dropped.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from app.app_utils.telemetry import meter
+from app.app_utils.typing import Feedback
+
+queue_depth = meter.create_up_down_counter(
+    "swot.feedback.queue.depth",
+    unit="{entry}",
+    description="Feedback entries waiting to be written.",
+)
+flush_duration = meter.create_histogram(
+    "swot.feedback.flush.duration",
+    unit="s",
+    description="Time to write one batch of feedback entries.",
+)
+overflow_entries = meter.create_counter(
+    "swot.feedback.overflow",
+    unit="{entry}",
+    description="Feedback entries spilled to disk or dropped.",
+)
+
+_STOP = object()
+
+
+class LogBatch(Protocol):
+    def log_struct(self, info: dict[str, Any], **kw: Any) -> None: ...
+
+    def commit(self) -> None: ...
+
+
+class BatchLogger(Protocol):
+    """The part of `google.cloud.logging.Logger` the writer uses."""
+
+    def batch(self) -> LogBatch: ...
+
+
+@dataclass
+class FeedbackWriterStats:
+    queued: int = 0
+    written: int = 0
+    flushes: int = 0
+    failed_flushes: int = 0
+    spilled: int = 0
+    dropped: int = 0
+    last_flush_latency: float = 0.0
+
+
+class FeedbackWriter:
+    """Queue feedback and write it to `logger` in batches from a thread.
+
+    Defaults come from `FEEDBACK_BATCH_SIZE`, `FEEDBACK_FLUSH_INTERVAL`
+    (seconds), `FEEDBACK_MAX_QUEUE` and `FEEDBACK_SPILL_PATH`.
+    """
+
+    def __init__(
+        self,
+        logger: BatchLogger,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        max_queue: int | None = None,
+        spill_path: str | None = None,
+    ) -> None:
+        self.logger = logger
+        self.batch_size = batch_size or int(os.environ.get("FEEDBACK_BATCH_SIZE", 100))
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else float(os.environ.get("FEEDBACK_FLUSH_INTERVAL", 5))
+        )
+        self.max_queue = max_queue or int(os.environ.get("FEEDBACK_MAX_QUEUE", 10000))
+        self.spill_path = spill_path or os.environ.get("FEEDBACK_SPILL_PATH") or None
+        self.stats = FeedbackWriterStats()
+        self._queue: queue.Queue[Any] = queue.Queue(self.max_queue)
+        self._spill_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> "FeedbackWriter":
+        """Start the writer thread; spilled entries are sent first."""
+        self._thread = threading.Thread(
+            target=self._run, name="feedback-writer", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def submit(self, feedback: Feedback) -> bool:
+        """Queue `feedback`; returns False if it was spilled or dropped."""
+        entry = feedback.model_dump()
+        if self._closed:
+            self._overflow([entry])
+            return False
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self._overflow([entry])
+            return False
+        self.stats.queued += 1
+        queue_depth.add(1)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write everything still queued and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            self._overflow(self._take_all())
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logging.warning("Feedback writer did not drain before shutdown")
+            return
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        self._flush(self._read_spill())
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            if entry is _STOP:
+                break
+            pending = [entry]
+            deadline = time.monotonic() + self.flush_interval
+            while len(pending) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                pending.append(entry)
+            queue_depth.add(-len(pending))
+            if stopping:
+                pending += self._take_all()
+            self._flush(pending)
+
+    def _take_all(self) -> list[dict[str, Any]]:
+        entries = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _STOP:
+                entries.append(entry)
+        queue_depth.add(-len(entries))
+        return entries
+
+    def _flush(self, entries: list[dict[str, Any]]) -> None:
+        for offset in range(0, len(entries), self.batch_size):
+            self._write_batch(entries[offset : offset + self.batch_size])
+
+    def _write_batch(self, entries: list[dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        try:
+            batch = self.logger.batch()
+            for entry in entries:
+                batch.log_struct(entry, severity="INFO")
+            batch.commit()
+        except Exception:
+            logging.exception(f"Failed to write {len(entries)} feedback entries")
+            self.stats.failed_flushes += 1
+            outcome = "error"
+            self._overflow(entries)
+        else:
+            self.stats.written += len(entries)
+            outcome = "ok"
+        latency = time.perf_counter() - start
+        self.stats.flushes += 1
+        self.stats.last_flush_latency = latency
+        flush_duration.record(latency, {"outcome": outcome})
+
+    def _overflow(self, entries: list[dict[str, Any]]) -> None:
+        if not entries:
+            return
+        if self.spill_path is None:
+            self.stats.dropped += len(entries)
+            overflow_entries.add(len(entries), {"action": "dropped"})
+            logging.warning(f"Dropped {len(entries)} feedback entries")
+            return
+        with self._spill_lock, open(self.spill_path, "a") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in entries)
+        self.stats.spilled += len(entries)
+        overflow_entries.add(len(entries), {"action": "spilled"})
+
+    def _read_spill(self) -> list[dict[str, Any]]:
+        if self.spill_path is None:
+            return []
+        with self._spill_lock:
+            try:
+                with open(self.spill_path) as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+            except FileNotFoundError:
+                return []
+            os.remove(self.spill_path)
+        return entries
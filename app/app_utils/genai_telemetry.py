@@ -0,0 +1,278 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Sample GenAI completion records and upload them to GCS in batches.
+
+The stock `upload` completion hook writes an inputs, an outputs and a system
+instruction object for every model call. `BatchedCompletionUploader` keeps a
+sampled subset instead and writes it as multi-record JSONL objects, one line
+per completion, from a background thread.
+
+Sampling is decided per trace, so either every completion of a request is
+kept or none is. Completions in the tail (a finish reason other than "stop",
+or slower than `slow_threshold` seconds) use their own, usually higher, rate.
+"""
+
+import atexit
+import dataclasses
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from app.app_utils.telemetry import meter
+
+completions = meter.create_counter(
+    "swot.genai.completions",
+    unit="{completion}",
+    description="GenAI completions seen by the upload hook, by sampling decision.",
+)
+upload_duration = meter.create_histogram(
+    "swot.genai.upload.duration",
+    unit="s",
+    description="Time to upload one batch of GenAI completion records.",
+)
+
+_TRACE_ID_LIMIT = 2**64
+
+
+def _jsonable(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+@dataclass
+class CompletionUploadStats:
+    head: int = 0
+    tail: int = 0
+    sampled_out: int = 0
+    uploads: int = 0
+    uploaded_records: int = 0
+    failed_uploads: int = 0
+    dropped_records: int = 0
+
+
+class BatchedCompletionUploader:
+    """GenAI completion hook that samples completions and batches uploads.
+
+    Defaults come from `GENAI_TELEMETRY_SAMPLE_RATE` (head rate),
+    `GENAI_TELEMETRY_TAIL_SAMPLE_RATE`, `GENAI_TELEMETRY_SLOW_SECONDS`,
+    `GENAI_TELEMETRY_BATCH_SIZE`, `GENAI_TELEMETRY_FLUSH_INTERVAL` (seconds)
+    and `GENAI_TELEMETRY_MAX_PENDING` (batches waiting for upload; records
+    beyond that are dropped).
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        fs: Any = None,
+        head_sample_rate: float | None = None,
+        tail_sample_rate: float | None = None,
+        slow_threshold: float | None = None,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        max_pending: int | None = None,
+    ) -> None:
+        if fs is None:
+            import fsspec
+
+            fs, base_path = fsspec.core.url_to_fs(base_path)
+        self.fs = fs
+        self.base_path = base_path.rstrip("/")
+        env = os.environ
+        self.head_sample_rate = (
+            head_sample_rate
+            if head_sample_rate is not None
+            else float(env.get("GENAI_TELEMETRY_SAMPLE_RATE", 1.0))
+        )
+        self.tail_sample_rate = (
+            tail_sample_rate
+            if tail_sample_rate is not None
+            else float(env.get("GENAI_TELEMETRY_TAIL_SAMPLE_RATE", 1.0))
+        )
+        self.slow_threshold = slow_threshold or float(
+            env.get("GENAI_TELEMETRY_SLOW_SECONDS", 20)
+        )
+        self.batch_size = batch_size or int(env.get("GENAI_TELEMETRY_BATCH_SIZE", 100))
+        self.flush_interval = flush_interval or float(
+            env.get("GENAI_TELEMETRY_FLUSH_INTERVAL", 30)
+        )
+        self.max_pending = max_pending or int(env.get("GENAI_TELEMETRY_MAX_PENDING", 8))
+        self.stats = CompletionUploadStats()
+        self._lock = threading.Lock()
+        self._records: list[dict[str, Any]] = []
+        self._batch_path = ""
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="genai-upload")
+        self._closed = threading.Event()
+        self._flusher: threading.Thread | None = None
+
+    def on_completion(
+        self,
+        *,
+        inputs: Sequence[Any],
+        outputs: Sequence[Any],
+        system_instruction: Sequence[Any],
+        span: Any = None,
+        log_record: Any = None,
+        **kwargs: Any,
+    ) -> None:
+        decision = self.sample(outputs, span)
+        completions.add(1, {"decision": decision})
+        if decision == "sampled_out":
+            self.stats.sampled_out += 1
+            return
+        setattr(self.stats, decision, getattr(self.stats, decision) + 1)
+        context = span.get_span_context() if span is not None else None
+        record = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "trace_id": f"{context.trace_id:032x}" if context else None,
+            "span_id": f"{context.span_id:016x}" if context else None,
+            "sample": decision,
+            "inputs": inputs,
+            "outputs": outputs,
+            "system_instruction": system_instruction,
+        }
+        with self._lock:
+            if not self._records:
+                self._batch_path = self._new_batch_path()
+                self._start_flusher()
+            path = self._batch_path
+            self._records.append(record)
+            full = len(self._records) >= self.batch_size
+        self._set_refs(self.fs.unstrip_protocol(path), span, log_record)
+        if full:
+            self.flush()
+
+    def sample(self, outputs: Sequence[Any], span: Any) -> str:
+        """Return "head", "tail" or "sampled_out" for one completion."""
+        if self._in_tail(outputs, span):
+            return "tail" if self._keep(span, self.tail_sample_rate) else "sampled_out"
+        return "head" if self._keep(span, self.head_sample_rate) else "sampled_out"
+
+    def _in_tail(self, outputs: Sequence[Any], span: Any) -> bool:
+        if any(
+            getattr(output, "finish_reason", "stop") != "stop" for output in outputs
+        ):
+            return True
+        start = getattr(span, "start_time", None)
+        if not start:
+            return False
+        return (time.time_ns() - start) / 1e9 >= self.slow_threshold
+
+    @staticmethod
+    def _keep(span: Any, rate: float) -> bool:
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        context = span.get_span_context() if span is not None else None
+        if context is not None and context.trace_id:
+            # Same rule as the SDK's TraceIdRatioBased sampler.
+            return context.trace_id % _TRACE_ID_LIMIT < rate * _TRACE_ID_LIMIT
+        return random.random() < rate
+
+    def _new_batch_path(self) -> str:
+        now = datetime.now(timezone.utc)
+        return f"{self.base_path}/{now:%Y/%m/%d}/{now:%H%M%S}_{uuid.uuid4().hex}.jsonl"
+
+    @staticmethod
+    def _set_refs(path: str, span: Any, log_record: Any) -> None:
+        # Same attributes as the stock upload hook; every ref points at the
+        # batch object, whose lines carry the trace and span ids.
+        refs = {
+            "gen_ai.input.messages_ref": path,
+            "gen_ai.output.messages_ref": path,
+            "gen_ai.system_instructions_ref": path,
+        }
+        if span is not None and span.is_recording():
+            span.set_attributes(refs)
+        if log_record is not None:
+            log_record.attributes = {**(log_record.attributes or {}), **refs}
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="genai-flush", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand the current batch to the upload thread."""
+        with self._lock:
+            records, self._records = self._records, []
+            path = self._batch_path
+        if not records:
+            return
+        if not self._slots.acquire(blocking=False):
+            self.stats.dropped_records += len(records)
+            logging.warning(f"Dropped {len(records)} GenAI completion records")
+            return
+        self._executor.submit(self._upload, path, records)
+
+    def _upload(self, path: str, records: list[dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        try:
+            data = "".join(json.dumps(r, default=_jsonable) + "\n" for r in records)
+            with self.fs.open(path, "w") as f:
+                f.write(data)
+        except Exception:
+            logging.exception(f"Failed to upload GenAI completions to {path}")
+            self.stats.failed_uploads += 1
+            outcome = "error"
+        else:
+            self.stats.uploads += 1
+            self.stats.uploaded_records += len(records)
+            outcome = "ok"
+        finally:
+            self._slots.release()
+        upload_duration.record(time.perf_counter() - start, {"outcome": outcome})
+
+    def close(self) -> None:
+        """Upload the last batch and wait for pending uploads."""
+        self._closed.set()
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+def install_completion_uploader(base_path: str) -> BatchedCompletionUploader | None:
+    """Instrument the google-genai SDK with a `BatchedCompletionUploader`.
+
+    Must run before `AdkApp.set_up`, whose own `instrument()` call is then a
+    no-op. Returns None if the instrumentation package is not installed.
+    """
+    try:
+        from opentelemetry.instrumentation.google_genai import (
+            GoogleGenAiSdkInstrumentor,
+        )
+    except ImportError:
+        logging.warning("GenAI instrumentation not installed; completions not uploaded")
+        return None
+    uploader = BatchedCompletionUploader(base_path)
+    GoogleGenAiSdkInstrumentor().instrument(completion_hook=uploader)
+    atexit.register(uploader.close)
+    return uploader
@@ -0,0 +1,672 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Single-pass Markdown to ReportLab flowable compiler.
+
+`parse_markdown` walks the text once and builds a small block AST (headings,
+paragraphs, nested lists, tables, code blocks, rules) while collecting
+reference link definitions. `markdown_story` then turns the blocks into
+flowables: the lines of a paragraph or list item are merged into one
+`Paragraph` and a table becomes one `Table`, instead of one `Paragraph` per
+line. All text is escaped before it reaches ReportLab's XML-like paragraph
+markup.
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.fonts import ps2tt, tt2ps
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import (
+    Flowable,
+    HRFlowable,
+    Paragraph,
+    Preformatted,
+    Table,
+    TableStyle,
+)
+from reportlab.platypus.paragraph import textTransformFrags
+from reportlab.platypus.paraparser import ParaFrag
+
+from app.app_utils.pdf_templates import CompiledTemplate
+
+
+@dataclass
+class HeadingBlock:
+    level: int
+    text: str
+
+
+@dataclass
+class ParagraphBlock:
+    text: str
+
+
+@dataclass
+class ListItemBlock:
+    lines: list[str]
+    children: list["ListBlock"] = field(default_factory=list)
+
+
+@dataclass
+class ListBlock:
+    ordered: bool
+    start: int = 1
+    items: list[ListItemBlock] = field(default_factory=list)
+
+
+@dataclass
+class TableBlock:
+    header: list[str]
+    rows: list[list[str]] = field(default_factory=list)
+
+
+@dataclass
+class CodeBlock:
+    text: str
+
+
+@dataclass
+class RuleBlock:
+    pass
+
+
+Block = HeadingBlock | ParagraphBlock | ListBlock | TableBlock | CodeBlock | RuleBlock
+
+
+@dataclass
+class MarkdownDocument:
+    blocks: list[Block] = field(default_factory=list)
+    references: dict[str, str] = field(default_factory=dict)
+
+
+_HEADING = re.compile(r"^ {0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_LIST_ITEM = re.compile(r"^([ \t]*)([*+-]|\d{1,9}[.)])\s+(.*)$")
+_RULE = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_REFERENCE = re.compile(
+    r"^ {0,3}\[([^\]]+)\]:\s*<?([^\s>]+)>?(?:\s+[\"'(].*[\"')])?\s*$"
+)
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+
+
+def _split_row(line: str) -> list[str]:
+    cells = line.strip()
+    if cells.startswith("|"):
+        cells = cells[1:]
+    if cells.endswith("|") and not cells.endswith("\\|"):
+        cells = cells[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in re.split(r"(?<!\\)\|", cells)]
+
+
+class _Parser:
+    """Line-by-line block parser; every line is looked at a bounded number of times."""
+
+    def __init__(self) -> None:
+        self.document = MarkdownDocument()
+        self._paragraph: list[str] = []
+        self._lists: list[tuple[int, ListBlock]] = []
+        self._table: TableBlock | None = None
+        self._skip_separator = False
+        self._fence: str | None = None
+        self._code: list[str] = []
+        self._after_blank = False
+
+    def parse(self, text: str) -> MarkdownDocument:
+        lines = text.splitlines()
+        for i, line in enumerate(lines):
+            self._line(line, lines[i + 1] if i + 1 < len(lines) else "")
+        if self._fence is not None:
+            self._emit(CodeBlock("\n".join(self._code)))
+        self._close()
+        return self.document
+
+    def _emit(self, block: Block) -> None:
+        self.document.blocks.append(block)
+
+    def _flush_paragraph(self) -> None:
+        if self._paragraph:
+            self._emit(ParagraphBlock(" ".join(self._paragraph)))
+            self._paragraph = []
+
+    def _close(self) -> None:
+        self._flush_paragraph()
+        self._lists = []
+        self._table = None
+
+    def _line(self, line: str, next_line: str) -> None:
+        if self._skip_separator:
+            self._skip_separator = False
+            return
+        if self._fence is not None:
+            if line.strip().startswith(self._fence):
+                self._emit(CodeBlock("\n".join(self._code)))
+                self._fence, self._code = None, []
+            else:
+                self._code.append(line)
+            return
+
+        if not line.strip():
+            self._flush_paragraph()
+            self._table = None
+            self._after_blank = True
+            return
+        after_blank, self._after_blank = self._after_blank, False
+
+        if self._table is not None and "|" in line:
+            self._table.rows.append(_split_row(line))
+            return
+        self._table = None
+
+        if fence := _FENCE.match(line):
+            self._close()
+            self._fence = fence.group(1)[:3]
+            return
+        if heading := _HEADING.match(line):
+            self._close()
+            self._emit(HeadingBlock(len(heading.group(1)), heading.group(2)))
+            return
+        if _RULE.match(line):
+            self._close()
+            self._emit(RuleBlock())
+            return
+        if reference := _REFERENCE.match(line):
+            self.document.references[reference.group(1).lower()] = reference.group(2)
+            return
+        if (
+            "|" in line
+            and _TABLE_SEPARATOR.match(next_line)
+            and len(_split_row(next_line)) == len(header := _split_row(line))
+        ):
+            self._close()
+            self._table = TableBlock(header)
+            self._emit(self._table)
+            self._skip_separator = True
+            return
+        if item := _LIST_ITEM.match(line):
+            self._list_item(item)
+            return
+
+        # Plain text continues the open list item or paragraph
+        if self._lists and (not after_blank or line[:1] in " \t"):
+            self._lists[-1][1].items[-1].lines.append(line.strip())
+            return
+        self._lists = []
+        self._paragraph.append(line.strip())
+
+    def _list_item(self, item: re.Match[str]) -> None:
+        self._flush_paragraph()
+        indent = len(item.group(1).expandtabs(4))
+        marker = item.group(2)
+        ordered = marker[0].isdigit()
+        while self._lists and indent < self._lists[-1][0]:
+            self._lists.pop()
+        if self._lists and indent == self._lists[-1][0]:
+            if self._lists[-1][1].ordered != ordered:
+                self._lists.pop()
+        if not self._lists or indent > self._lists[-1][0]:
+            block = ListBlock(ordered, int(marker[:-1]) if ordered else 1)
+            if self._lists:
+                self._lists[-1][1].items[-1].children.append(block)
+            else:
+                self._emit(block)
+            self._lists.append((indent, block))
+        self._lists[-1][1].items.append(ListItemBlock([item.group(3).strip()]))
+
+
+def parse_markdown(text: str) -> MarkdownDocument:
+    """Parse Markdown into a block AST in one pass over the lines."""
+    return _Parser().parse(text)
+
+
+# Characters that can start inline markup; anything else only needs escaping.
+_MARKUP_HINT = re.compile(r"[`\[<*_]|https?://")
+_OPENER = re.compile(r"[`\[<*_]|!\[|https?://")
+_BACKTICKS = re.compile(r"`+")
+_AUTOLINK = re.compile(r"<https?://")
+_BARE_URL = re.compile(r"https?://[^\s<>()\[\]]*[^\s<>()\[\].,;:!?'\"]")
+_LINK_TITLE = re.compile(r"\s+\"")
+_STRONG_OPEN = re.compile(r"(\*\*|__)(?=\S)")
+_EM_OPEN = re.compile(r"\*(?=[^\s*])|_(?=[^\s_])")
+# Characters that keep an emphasis marker right after them from opening.
+_EM_BLOCKED_AFTER = {"*": re.compile(r"[\w*]"), "_": re.compile(r"\w")}
+# Valid closing markers of each emphasis span, keyed by its opening marker.
+_CLOSE = {
+    "**": re.compile(r"(?<=\S)(?=\*\*)"),
+    "__": re.compile(r"(?<=\S)(?=__)"),
+    "*": re.compile(r"(?<=[^\s*])\*(?!\*)"),
+    "_": re.compile(r"(?<=[^\s_])_(?!\w)"),
+}
+
+
+class _Next:
+    """First match of `pattern` at or after a position, cached between calls.
+
+    Queries move forward through the text, so each search resumes where the
+    previous one ended and together they scan the text about once.
+    """
+
+    def __init__(self, text: str, pattern: str) -> None:
+        self.text = text
+        self.pattern = re.compile(pattern)
+        self._start = self._found = len(text) + 1
+
+    def __call__(self, start: int) -> int:
+        """Index of the first match at or after `start`, else `len(text)`."""
+        if not self._start <= start <= self._found:
+            match = self.pattern.search(self.text, start)
+            self._start = start
+            self._found = match.start() if match else len(self.text)
+        return self._found
+
+
+class _Closers:
+    """Sorted positions of one kind of closing marker, walked forward only."""
+
+    def __init__(self, text: str, marker: str) -> None:
+        self.positions = [match.start() for match in _CLOSE[marker].finditer(text)]
+        self._index = 0
+
+    def first(self, start: int) -> int | None:
+        positions, index = self.positions, self._index
+        while index < len(positions) and positions[index] < start:
+            index += 1
+        self._index = index
+        return positions[index] if index < len(positions) else None
+
+
+class _Writer(Protocol):
+    """Receives the text and spans ("b", "i", "code", "a") of inline Markdown."""
+
+    def text(self, text: str) -> None: ...
+
+    def start(self, kind: str, url: str = "") -> None: ...
+
+    def end(self, kind: str) -> None: ...
+
+
+_START_TAGS = {"b": "<b>", "i": "<i>", "code": '<font face="Courier">'}
+_END_TAGS = {"b": "</b>", "i": "</i>", "code": "</font>", "a": "</a>"}
+
+
+class _MarkupWriter:
+    """Writes escaped ReportLab paragraph markup."""
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+
+    def text(self, text: str) -> None:
+        self.parts.append(escape(text))
+
+    def start(self, kind: str, url: str = "") -> None:
+        if kind == "a":
+            href = escape(url.strip("<>"), {'"': "&quot;"})
+            self.parts.append(f'<a href="{href}" color="blue">')
+        else:
+            self.parts.append(_START_TAGS[kind])
+
+    def end(self, kind: str) -> None:
+        self.parts.append(_END_TAGS[kind])
+
+
+# Font family, bold, italic, colour and (index, url) links of a text run.
+_FragState = tuple[str, int, int, Any, tuple[tuple[int, str], ...]]
+
+
+class _FragmentWriter:
+    """Builds the fragments ReportLab's paragraph parser would make of the markup.
+
+    Parsing paragraph markup costs more than laying it out, so paragraphs are
+    handed these fragments instead. Runs of text in the same font, colour and
+    links become one fragment, where the parser splits them at every entity.
+    """
+
+    def __init__(self, style: ParagraphStyle, bold: bool = False) -> None:
+        self.style = style
+        family, style_bold, italic = ps2tt(style.fontName)
+        self.states: list[_FragState] = [
+            (family, int(bold) or style_bold, italic, style.textColor, ())
+        ]
+        self.runs: list[tuple[_FragState, list[str]]] = []
+        self.links = 0
+
+    def text(self, text: str) -> None:
+        if not text:
+            return
+        state = self.states[-1]
+        if self.runs and self.runs[-1][0] == state:
+            self.runs[-1][1].append(text)
+        else:
+            self.runs.append((state, [text]))
+
+    def start(self, kind: str, url: str = "") -> None:
+        family, bold, italic, color, links = self.states[-1]
+        if kind == "b":
+            bold = 1
+        elif kind == "i":
+            italic = 1
+        elif kind == "code":
+            family, bold, italic = ps2tt("Courier")
+        else:
+            links += ((self.links, url.strip("<>").strip()),)
+            self.links += 1
+            color = colors.blue
+        self.states.append((family, bold, italic, color, links))
+
+    def end(self, kind: str) -> None:
+        self.states.pop()
+
+    def fragments(self) -> list[ParaFrag]:
+        style = self.style
+        frags = [
+            ParaFrag(
+                text="".join(texts),
+                fontName=tt2ps(family, bold, italic),
+                fontSize=style.fontSize,
+                bold=bold,
+                italic=italic,
+                textColor=color,
+                link=list(links),
+                rise=0,
+                greek=0,
+                us_lines=[],
+            )
+            for (family, bold, italic, color, links), texts in self.runs
+        ]
+        textTransformFrags(frags, style)
+        return frags
+
+
+class _InlineCompiler:
+    """One left-to-right pass feeding inline Markdown to a `_Writer`.
+
+    A span is opened only when its closing marker follows inside the enclosing
+    span. Closing markers and backtick runs are indexed up front and every
+    index is only walked forward, so an unmatched opener costs constant time
+    instead of a scan to the end of the line. Open spans are kept on a stack of
+    (content start, content end, span kind, resume position), and markers are
+    matched as if the content of the innermost span were all the text there is.
+    """
+
+    def __init__(self, text: str, references: dict[str, str], writer: _Writer) -> None:
+        self.text = text
+        self.references = references
+        self.writer = writer
+        self.stack: list[tuple[int, int, str, int]] = []
+        self.closers: dict[str, _Closers] = {}
+        self.next_bracket = _Next(text, r"\]")
+        self.next_newline = _Next(text, r"\n")
+        self.next_angle = _Next(text, r">")
+        self.next_quote = _Next(text, r'"')
+        self.next_url_end = _Next(text, r"[)\s]")
+        self.next_autolink_end = _Next(text, r"[>\s]")
+        # Each backtick run is closed by the next run of the same length.
+        self.code_closers: dict[int, int] = {}
+        following: dict[int, int] = {}
+        for run in reversed(list(_BACKTICKS.finditer(text))):
+            length = run.end() - run.start()
+            if length in following:
+                self.code_closers[run.start()] = following[length]
+            following[length] = run.start()
+
+    def compile(self) -> None:
+        text, writer, stack = self.text, self.writer, self.stack
+        pos = 0
+        while True:
+            floor, limit = stack[-1][:2] if stack else (0, len(text))
+            match = _OPENER.search(text, pos, limit)
+            if match is None:
+                writer.text(text[pos:limit])
+                if not stack:
+                    return
+                _, _, kind, pos = stack.pop()
+                writer.end(kind)
+                continue
+            writer.text(text[pos : match.start()])
+            pos = self.span(match.group(), match.start(), floor, limit)
+
+    def push(self, kind: str, start: int, end: int, resume: int, url: str = "") -> int:
+        """Open a span whose content is `text[start:end]`."""
+        self.writer.start(kind, url)
+        self.stack.append((start, end, kind, resume))
+        return start
+
+    def span(self, opener: str, start: int, floor: int, limit: int) -> int:
+        """Handle the opener at `start`; return where scanning continues."""
+        text = self.text
+        end: int | None
+        if opener == "`":
+            return self.code(start, limit)
+        if opener in ("[", "!["):
+            return self.link(start, start + len(opener) - 1, limit)
+        if opener in ("*", "_"):
+            return self.emphasis(start, floor, limit)
+        if opener == "<":
+            end = self.autolink(start, limit)
+            if end is not None:
+                url = text[start + 1 : end]
+                self.url(url)
+                return end + 1
+        elif url_match := _BARE_URL.match(text, start, limit):
+            url = url_match.group()
+            self.url(url_match.group())
+            return url_match.end()
+        self.writer.text(text[start])
+        return start + 1
+
+    def url(self, url: str) -> None:
+        self.writer.start("a", url)
+        self.writer.text(url)
+        self.writer.end("a")
+
+    def code(self, start: int, limit: int) -> int:
+        run = _BACKTICKS.match(self.text, start)
+        assert run is not None
+        close = self.code_closers.get(start)
+        fence = run.end() - start
+        if close is None or close + fence > limit or self.next_newline(start) < close:
+            self.writer.text(run.group())
+            return run.end()
+        self.writer.start("code")
+        self.writer.text(self.text[run.end() : close])
+        self.writer.end("code")
+        return close + fence
+
+    def link(self, start: int, bracket: int, limit: int) -> int:
+        """`[text](url)`, `![text](url)`, `[text][ref]` or `[text]` at `start`."""
+        text = self.text
+        close = self.next_bracket(bracket + 1)
+        if close == bracket + 1 or close >= limit:
+            self.writer.text(text[start : bracket + 1])
+            return bracket + 1
+        destination = self.destination(close + 1, limit)
+        if destination is not None:
+            url_end, end = destination
+            url = text[close + 2 : url_end]
+            return self.push("a", bracket + 1, close, end, url)
+        # An image without a destination leaves a literal "!".
+        self.writer.text(text[start:bracket])
+        label, end = text[bracket + 1 : close], close + 1
+        if end < limit and text[end] == "[":
+            ref_close = self.next_bracket(end + 1)
+            if ref_close < limit:
+                label, end = text[end + 1 : ref_close] or label, ref_close + 1
+        target = self.references.get(label.lower())
+        if target is None:
+            self.writer.text(text[bracket:end])
+            return end
+        return self.push("a", bracket + 1, close, end, target)
+
+    def destination(self, paren: int, limit: int) -> tuple[int, int] | None:
+        """`(url "title")` at `paren`: the end of the url and of the whole."""
+        text = self.text
+        if not text.startswith("(", paren):
+            return None
+        start = paren + 1
+        url_ends = [self.next_url_end(start)]
+        if text.startswith("<", start):
+            url_ends.insert(0, self.next_angle(start) + 1)
+        for url_end in url_ends:
+            end = url_end
+            if start < end < len(text) and text[end].isspace():
+                title = _LINK_TITLE.match(text, end)
+                end = self.next_quote(title.end()) + 1 if title else len(text)
+            if start < url_end and end < limit and text[end] == ")":
+                return url_end, end + 1
+        return None
+
+    def autolink(self, start: int, limit: int) -> int | None:
+        """Index of the `>` closing an `<https://...>` autolink at `start`."""
+        scheme = _AUTOLINK.match(self.text, start)
+        if scheme is None:
+            return None
+        end = self.next_autolink_end(scheme.end())
+        if scheme.end() < end < limit and self.text[end] == ">":
+            return end
+        return None
+
+    def emphasis(self, start: int, floor: int, limit: int) -> int:
+        text = self.text
+        marker = text[start]
+        line_end = min(limit, self.next_newline(start))
+        if strong := _STRONG_OPEN.match(text, start, line_end):
+            close = self.closer(strong.group(1), start + 3, line_end)
+            if close is not None and close + 2 <= line_end:
+                return self.push("b", start + 2, close, close + 2)
+        blocked = start > floor and _EM_BLOCKED_AFTER[marker].match(text[start - 1])
+        if not blocked and _EM_OPEN.match(text, start, line_end):
+            close = self.closer(marker, start + 2, line_end)
+            if close is not None:
+                return self.push("i", start + 1, close, close + 1)
+        self.writer.text(marker)
+        return start + 1
+
+    def closer(self, marker: str, start: int, end: int) -> int | None:
+        """First closing `marker` in `text[start:end]`."""
+        closers = self.closers.get(marker)
+        if closers is None:
+            closers = self.closers[marker] = _Closers(self.text, marker)
+        close = closers.first(start)
+        if close is not None and close < end:
+            return close
+        # The index looks past `end`, where a nested span's content stops.
+        last = end - len(marker)
+        if last >= start and _CLOSE[marker].match(self.text, last, end):
+            return last
+        return None
+
+
+def inline_markup(text: str, references: dict[str, str] | None = None) -> str:
+    """Convert inline Markdown to escaped ReportLab paragraph markup.
+
+    Takes time linear in the length of `text`, however many markers are left
+    unmatched.
+    """
+    if not _MARKUP_HINT.search(text):
+        return escape(text)
+    writer = _MarkupWriter()
+    _InlineCompiler(text, references or {}, writer).compile()
+    return "".join(writer.parts)
+
+
+class _FlowableCompiler:
+    def __init__(self, template: CompiledTemplate, references: dict[str, str]):
+        self.template = template
+        self.references = references
+
+    def paragraph(
+        self,
+        text: str,
+        style: ParagraphStyle,
+        marker: str | None = None,
+        bold: bool = False,
+    ) -> Paragraph:
+        writer = _FragmentWriter(style, bold)
+        if marker is not None:
+            writer.text(f"{marker} ")
+        if _MARKUP_HINT.search(text):
+            _InlineCompiler(text, self.references, writer).compile()
+        else:
+            writer.text(text)
+        return Paragraph(text, style, frags=writer.fragments())
+
+    def compile(self, block: Block) -> list[Flowable]:
+        template = self.template
+        if isinstance(block, HeadingBlock):
+            style = (
+                template.heading_style
+                if block.level <= 3
+                else template.subheading_style
+            )
+            return [self.paragraph(block.text, style)]
+        if isinstance(block, ParagraphBlock):
+            return [self.paragraph(block.text, template.body_style)]
+        if isinstance(block, ListBlock):
+            story: list[Flowable] = []
+            self.compile_list(block, 0, story)
+            return story
+        if isinstance(block, TableBlock):
+            return [self.compile_table(block)]
+        if isinstance(block, CodeBlock):
+            return [Preformatted(block.text, template.code_style)]
+        return [
+            HRFlowable(width="100%", color=colors.grey, spaceBefore=6, spaceAfter=6)
+        ]
+
+    def compile_list(self, block: ListBlock, depth: int, story: list[Flowable]) -> None:
+        # One hanging-indent paragraph per item: ListFlowable wraps every item
+        # twice and lays out much slower for long lists, and a separate
+        # `bulletText` is drawn as its own text object for every item.
+        for number, item in enumerate(block.items, block.start):
+            marker = f"{number}." if block.ordered else "•"
+            style = self.template.list_style(depth, marker)
+            story.append(self.paragraph(" ".join(item.lines), style, marker))
+            for child in item.children:
+                self.compile_list(child, depth + 1, story)
+
+    def compile_table(self, block: TableBlock) -> Table:
+        columns = len(block.header)
+        style = self.template.body_style
+        data = [[self.paragraph(cell, style, bold=True) for cell in block.header]]
+        for row in block.rows:
+            row = (row + [""] * columns)[:columns]
+            data.append([self.paragraph(cell, style) for cell in row])
+        return Table(
+            data,
+            colWidths=[self.template.frame_width / columns] * columns,
+            repeatRows=1,
+            style=TableStyle(
+                [
+                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
+                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ]
+            ),
+        )
+
+
+def markdown_story(template: CompiledTemplate, text: str) -> Iterator[Flowable]:
+    """Story builder that compiles Markdown `text` into flowables.
+
+    Flowables are generated block by block as layout consumes them, so only
+    the small block AST is held for the whole document.
+    """
+    document = parse_markdown(text)
+    compiler = _FlowableCompiler(template, document.references)
+    for block in document.blocks:
+        yield from compiler.compile(block)
@@ -0,0 +1,276 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pluggable model backend with record/replay for offline runs.
+
+`MODEL_BACKEND` selects how `build_model` creates the agents' models:
+
+* `gemini` (default): the live Gemini API.
+* `record`: the live Gemini API, with every request/response exchange
+  appended to the cassette file `MODEL_CASSETTE`.
+* `replay`: answers from the cassette without network or credentials.
+  Latency is the recorded one unless `MODEL_REPLAY_LATENCY` (seconds) is set,
+  and token usage is the recorded one unless `MODEL_REPLAY_USAGE=estimate`
+  (~4 characters per token).
+
+Tools such as the local load-test server add further credential-free
+backends with `register_backend`.
+
+Google Search grounding runs inside the Gemini call, so recorded exchanges
+include the search results as well.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import AsyncGenerator, Callable
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import google.auth
+from google.adk.models import BaseLlm, Gemini, LlmRequest, LlmResponse
+from google.genai import Client, types
+
+MODEL_BACKENDS = ("gemini", "record", "replay")
+DEFAULT_CASSETTE = ".cassettes/agent.jsonl"
+
+
+def configure_vertex_ai() -> None:
+    """Point the Gemini client at Vertex AI, resolving the default project."""
+    if not os.environ.get("GOOGLE_CLOUD_PROJECT"):
+        _, project_id = google.auth.default()
+        os.environ["GOOGLE_CLOUD_PROJECT"] = project_id
+    os.environ["GOOGLE_CLOUD_LOCATION"] = "global"
+    os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "True"
+
+
+class VertexGemini(Gemini):
+    """Gemini on Vertex AI that authenticates on first use, not at import."""
+
+    @cached_property
+    def api_client(self) -> Client:
+        configure_vertex_ai()
+        return super().api_client
+
+    @cached_property
+    def _live_api_client(self) -> Client:
+        configure_vertex_ai()
+        return super()._live_api_client
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no recorded exchange matches a request."""
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """Stable key for a model request.
+
+    Function call ids are random per run and tool results (upload URLs,
+    timestamps) are not reproducible, so calls are keyed by name and
+    arguments and tool results by name only.
+    """
+    contents = []
+    for content in llm_request.contents:
+        parts = []
+        for part in content.parts or []:
+            if part.function_call:
+                parts.append(
+                    {"call": part.function_call.name, "args": part.function_call.args}
+                )
+            elif part.function_response:
+                parts.append({"response": part.function_response.name})
+            elif part.text is not None and not part.thought:
+                parts.append({"text": part.text})
+        contents.append({"role": content.role, "parts": parts})
+    payload = {
+        "model": llm_request.model,
+        "system_instruction": str(llm_request.config.system_instruction or ""),
+        "tools": sorted(llm_request.tools_dict),
+        "contents": contents,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class Cassette:
+    """Append-only JSONL store of recorded model exchanges.
+
+    Requests recorded more than once replay their responses in recording
+    order and then start over, so a short recording can drive a long
+    load test.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._exchanges: dict[str, list[dict[str, Any]]] = {}
+        self._replayed: dict[str, int] = {}
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        exchange = json.loads(line)
+                        self._exchanges.setdefault(exchange["key"], []).append(exchange)
+
+    def __len__(self) -> int:
+        return sum(len(exchanges) for exchanges in self._exchanges.values())
+
+    def record(self, key: str, responses: list[LlmResponse], latency: float) -> None:
+        exchange = {
+            "key": key,
+            "latency": latency,
+            "responses": [
+                response.model_dump(mode="json", exclude_none=True)
+                for response in responses
+            ],
+        }
+        with self._lock:
+            self._exchanges.setdefault(key, []).append(exchange)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(exchange) + "\n")
+
+    def replay(self, key: str) -> tuple[list[LlmResponse], float]:
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            if not exchanges:
+                raise CassetteMissError(
+                    f"No recorded model exchange for request {key[:12]} in "
+                    f"{self.path}; record it with MODEL_BACKEND=record"
+                )
+            index = self._replayed.get(key, 0)
+            self._replayed[key] = index + 1
+            exchange = exchanges[index % len(exchanges)]
+        responses = [
+            LlmResponse.model_validate(response) for response in exchange["responses"]
+        ]
+        return responses, exchange["latency"]
+
+
+class RecordingLlm(BaseLlm):
+    """Forwards requests to `inner` and records every exchange."""
+
+    inner: BaseLlm
+    cassette: Cassette
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key(llm_request)
+        responses = []
+        start = time.perf_counter()
+        async for response in self.inner.generate_content_async(llm_request, stream):
+            responses.append(response)
+            yield response
+        self.cassette.record(key, responses, time.perf_counter() - start)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ReplayLlm(BaseLlm):
+    """Answers from a cassette, with injected latency and token usage.
+
+    `latency` overrides the recorded latency when set; `usage="estimate"`
+    replaces the recorded token counts with size-based estimates.
+    """
+
+    cassette: Cassette
+    latency: float | None = None
+    usage: str = "recorded"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        responses, recorded_latency = self.cassette.replay(request_key(llm_request))
+        latency = recorded_latency if self.latency is None else self.latency
+        await asyncio.sleep(latency)
+        prompt_tokens = _estimate_tokens(
+            "".join(
+                content.model_dump_json(exclude_none=True)
+                for content in llm_request.contents
+            )
+        )
+        for response in responses:
+            if self.usage == "estimate" and response.content:
+                output_tokens = _estimate_tokens(
+                    response.content.model_dump_json(exclude_none=True)
+                )
+                response.usage_metadata = types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=prompt_tokens,
+                    candidates_token_count=output_tokens,
+                    total_token_count=prompt_tokens + output_tokens,
+                )
+            yield response
+
+
+_cassettes: dict[Path, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str | Path) -> Cassette:
+    """Return the process-wide cassette for `path`, shared by all agents."""
+    resolved = Path(path).resolve()
+    with _cassettes_lock:
+        cassette = _cassettes.get(resolved)
+        if cassette is None:
+            cassette = _cassettes[resolved] = Cassette(resolved)
+        return cassette
+
+
+_custom_backends: dict[str, Callable[[str], BaseLlm]] = {}
+
+
+def register_backend(name: str, factory: Callable[[str], BaseLlm]) -> None:
+    """Make `factory(model_name)` selectable with `MODEL_BACKEND=<name>`."""
+    _custom_backends[name] = factory
+
+
+def model_backend() -> str:
+    backend = os.environ.get("MODEL_BACKEND", "gemini")
+    if backend not in MODEL_BACKENDS and backend not in _custom_backends:
+        raise ValueError(
+            f"MODEL_BACKEND must be one of "
+            f"{(*MODEL_BACKENDS, *_custom_backends)}, got {backend!r}"
+        )
+    return backend
+
+
+def build_model(model: str = "gemini-2.5-flash") -> BaseLlm:
+    """Build the model for an agent according to `MODEL_BACKEND`."""
+    backend = model_backend()
+    if backend in _custom_backends:
+        return _custom_backends[backend](model)
+    if backend == "replay":
+        latency = os.environ.get("MODEL_REPLAY_LATENCY")
+        return ReplayLlm(
+            model=model,
+            cassette=get_cassette(os.environ.get("MODEL_CASSETTE", DEFAULT_CASSETTE)),
+            latency=float(latency) if latency else None,
+            usage=os.environ.get("MODEL_REPLAY_USAGE", "recorded"),
+        )
+    gemini = VertexGemini(model=model, retry_options=types.HttpRetryOptions(attempts=3))
+    if backend == "record":
+        return RecordingLlm(
+            model=model,
+            inner=gemini,
+            cassette=get_cassette(os.environ.get("MODEL_CASSETTE", DEFAULT_CASSETTE)),
+        )
+    return gemini
@@ -0,0 +1,144 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Per-agent model selection and routing of simple turns to a lighter tier.
+
+`MODEL_TIERS` names the models of each tier as comma-separated
+`tier=model` pairs (default `light=gemini-2.5-flash-lite,
+standard=gemini-2.5-flash`). `AGENT_MODELS` picks a tier or a model name
+per agent, e.g. `swot_agent=standard,google_search_agent=light`. Agents
+not listed use the `standard` tier, except `pdf_generator_agent`, which
+only forwards the analysis to the PDF tool and uses `light`.
+
+`MODEL_ROUTER` lists agents whose simple turns go to the `light` tier: a
+turn is simple when the newest message (user text or tool result) has at
+most `MODEL_ROUTER_MAX_CHARS` characters (default 500). Turns that digest
+research results or long user input stay on the agent's own model.
+Routing decisions are counted in `swot.model.routes`, and the
+`StageMetricsPlugin` labels model latency and token metrics with the model
+that served each call.
+"""
+
+import json
+import os
+from collections.abc import AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from opentelemetry import trace
+
+from app.app_utils.model_backend import build_model
+from app.app_utils.telemetry import meter
+
+DEFAULT_MODEL_TIERS = {
+    "light": "gemini-2.5-flash-lite",
+    "standard": "gemini-2.5-flash",
+}
+DEFAULT_AGENT_MODELS = {"pdf_generator_agent": "light"}
+
+routes = meter.create_counter(
+    "swot.model.routes",
+    unit="{call}",
+    description="Model calls of routed agents, by route and serving model.",
+)
+
+
+def _parse_pairs(value: str, name: str) -> dict[str, str]:
+    pairs = {}
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+        key, sep, item = pair.partition("=")
+        if not sep or not key.strip() or not item.strip():
+            raise ValueError(f"{name} entries must look like key=value, got {pair!r}")
+        pairs[key.strip()] = item.strip()
+    return pairs
+
+
+def model_tiers() -> dict[str, str]:
+    """Model name of each tier, from `MODEL_TIERS` over the defaults."""
+    return {
+        **DEFAULT_MODEL_TIERS,
+        **_parse_pairs(os.environ.get("MODEL_TIERS", ""), "MODEL_TIERS"),
+    }
+
+
+def agent_model(agent_name: str) -> str:
+    """The model configured for `agent_name` in `AGENT_MODELS`."""
+    choices = {
+        **DEFAULT_AGENT_MODELS,
+        **_parse_pairs(os.environ.get("AGENT_MODELS", ""), "AGENT_MODELS"),
+    }
+    choice = choices.get(agent_name, "standard")
+    return model_tiers().get(choice, choice)
+
+
+def routed_agents() -> set[str]:
+    """Agents listed in `MODEL_ROUTER`."""
+    return {
+        name.strip()
+        for name in os.environ.get("MODEL_ROUTER", "").split(",")
+        if name.strip()
+    }
+
+
+def build_agent_model(agent_name: str) -> BaseLlm:
+    """Build the model of `agent_name`, routed if listed in `MODEL_ROUTER`."""
+    model = build_model(agent_model(agent_name))
+    light_model = model_tiers()["light"]
+    if agent_name not in routed_agents() or model.model == light_model:
+        return model
+    return RoutedLlm(
+        model=model.model,
+        heavy=model,
+        light=build_model(light_model),
+        max_chars=int(os.environ.get("MODEL_ROUTER_MAX_CHARS", 500)),
+    )
+
+
+def turn_size(llm_request: LlmRequest) -> int:
+    """Characters of text and tool results in the newest message."""
+    if not llm_request.contents:
+        return 0
+    size = 0
+    for part in llm_request.contents[-1].parts or []:
+        if part.text:
+            size += len(part.text)
+        if part.function_response:
+            size += len(json.dumps(part.function_response.response, default=str))
+    return size
+
+
+class RoutedLlm(BaseLlm):
+    """Serves simple turns with `light` and all others with `heavy`."""
+
+    heavy: BaseLlm
+    light: BaseLlm
+    max_chars: int = 500
+
+    def route(self, llm_request: LlmRequest) -> str:
+        """Return "simple" or "complex" for the turn in `llm_request`."""
+        if not llm_request.contents:
+            return "complex"
+        return "simple" if turn_size(llm_request) <= self.max_chars else "complex"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        route = self.route(llm_request)
+        llm = self.light if route == "simple" else self.heavy
+        llm_request.model = llm.model
+        routes.add(1, {"swot.model.route": route, "gen_ai.request.model": llm.model})
+        trace.get_current_span().set_attribute("swot.model.route", route)
+        async for response in llm.generate_content_async(llm_request, stream):
+            yield response
@@ -0,0 +1,116 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import threading
+import uuid
+from typing import Any
+
+from app.app_utils.markdown import markdown_story
+from app.app_utils.pdf_templates import ReportTemplate, TemplateEngine
+
+BUCKET_NAME = "adk-pdf-create1"
+FOLDER_NAME = "pdfs"
+
+# GCS resumable uploads need chunks in multiples of 256 KiB.
+UPLOAD_CHUNK_SIZE = int(os.environ.get("PDF_UPLOAD_CHUNK_SIZE", 4 * 256 * 1024))
+
+
+SWOT_TEMPLATE = ReportTemplate(
+    name="swot",
+    version="3",
+    title_format="SWOT Analysis for {company_name}",
+)
+
+
+_template_engine: TemplateEngine | None = None
+_template_engine_lock = threading.Lock()
+
+
+def get_template_engine() -> TemplateEngine:
+    """Return the process-wide template engine with the built-in templates."""
+    global _template_engine
+    with _template_engine_lock:
+        if _template_engine is None:
+            _template_engine = TemplateEngine()
+            _template_engine.register(SWOT_TEMPLATE, markdown_story)
+        return _template_engine
+
+
+def render_swot_pdf(swot_analysis_text: str, company_name: str) -> bytes:
+    """Render a SWOT analysis written in Markdown into PDF bytes.
+
+    This function has no side effects beyond CPU work so it can be shipped to a
+    worker process.
+    """
+    return get_template_engine().render(
+        SWOT_TEMPLATE.name, swot_analysis_text, company_name=company_name
+    )
+
+
+def render_swot_pdf_with_pages(
+    swot_analysis_text: str, company_name: str
+) -> tuple[bytes, int]:
+    """Render a SWOT PDF and return its bytes and page count.
+
+    Like `render_swot_pdf`, safe to ship to a worker process.
+    """
+    buffer = io.BytesIO()
+    pages = get_template_engine().render_into(
+        SWOT_TEMPLATE.name, swot_analysis_text, buffer, company_name=company_name
+    )
+    return buffer.getvalue(), pages
+
+
+def render_swot_pdf_to_file(
+    output_path: str, swot_analysis_text: str, company_name: str
+) -> int:
+    """Render a SWOT PDF into a local file and return its page count.
+
+    Like `render_swot_pdf`, safe to ship to a worker process.
+    """
+    with open(output_path, "wb") as f:
+        return get_template_engine().render_into(
+            SWOT_TEMPLATE.name, swot_analysis_text, f, company_name=company_name
+        )
+
+
+def pdf_object_path(company_name: str, object_id: str | None = None) -> str:
+    """Build the `bucket/folder/file` path for a company's SWOT PDF.
+
+    Uses a random id unless a stable `object_id` (e.g. a content hash) is
+    given.
+    """
+    object_id = object_id or str(uuid.uuid4())
+    file_name = f"SWOT_{company_name.replace(' ', '_')}_{object_id}.pdf"
+    return f"{BUCKET_NAME}/{FOLDER_NAME}/{file_name}"
+
+
+def public_url(full_path: str) -> str:
+    """Construct the public URL (assuming the bucket allows public access)."""
+    return f"https://storage.cloud.google.com/{full_path}"
+
+
+async def upload_pdf(
+    fs: Any, full_path: str, pdf: bytes, chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> None:
+    """Upload PDF bytes to `full_path` on an async fsspec filesystem.
+
+    gcsfs sends PDFs up to `chunk_size` in a single request and larger ones
+    as a resumable upload in `chunk_size` chunks.
+    """
+    await fs._pipe_file(
+        full_path, pdf, content_type="application/pdf", chunksize=chunk_size
+    )
@@ -0,0 +1,143 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+def content_key(template_version: str, company_name: str, text: str) -> str:
+    """Hash everything that determines the rendered bytes of a report."""
+    digest = hashlib.sha256()
+    for part in (template_version, company_name, text):
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ.
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+@dataclass
+class DedupStats:
+    """Hit/miss counters for the PDF dedup cache."""
+
+    local_hits: int = 0
+    remote_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.local_hits + self.remote_hits + self.misses
+        return (self.local_hits + self.remote_hits) / total if total else 0.0
+
+
+class PdfDedupCache:
+    """Content-addressed index of already uploaded PDFs.
+
+    Lookups consult a bounded in-memory LRU index first and fall back to an
+    existence check in the bucket, so identical reports are neither rendered
+    nor uploaded twice, even across instances.
+
+    `PDF_DEDUP_TTL` only bounds how long a local entry is trusted before the
+    bucket is checked again. It does not bound the age of bucket objects: any
+    object at the content-addressed path counts as a hit, however old. Use a
+    bucket lifecycle rule to expire old reports.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries or int(
+            os.environ.get("PDF_DEDUP_MAX_ENTRIES", 1024)
+        )
+        self.ttl = (
+            ttl if ttl is not None else float(os.environ.get("PDF_DEDUP_TTL", 86400))
+        )
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = DedupStats()
+
+    def _get_local(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            full_path, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.stats.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return full_path
+
+    def put(self, key: str, full_path: str) -> None:
+        """Record that the PDF for `key` is stored at `full_path`."""
+        with self._lock:
+            self._entries[key] = (full_path, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def lookup(self, fs: Any, key: str, full_path: str) -> bool:
+        """Return whether the PDF for `key` already exists at `full_path`.
+
+        Blocking: checks the bucket on a local miss.
+        """
+        if self._get_local(key) == full_path:
+            self._count("local_hits")
+            return True
+        if fs.exists(full_path):
+            self._count("remote_hits")
+            self.put(key, full_path)
+            return True
+        self._count("misses")
+        return False
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def metrics(self) -> dict[str, Any]:
+        """Counters plus hit rate and current index size."""
+        return {
+            **asdict(self.stats),
+            "hit_rate": self.stats.hit_rate,
+            "size": len(self._entries),
+        }
+
+
+_pdf_cache: PdfDedupCache | None = None
+_pdf_cache_lock = threading.Lock()
+
+
+def get_pdf_cache() -> PdfDedupCache | None:
+    """Return the process-wide dedup cache, or None unless `PDF_DEDUP=true`."""
+    global _pdf_cache
+    if os.environ.get("PDF_DEDUP", "false").lower() != "true":
+        return None
+    with _pdf_cache_lock:
+        if _pdf_cache is None:
+            _pdf_cache = PdfDedupCache()
+        return _pdf_cache
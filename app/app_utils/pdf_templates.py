@@ -0,0 +1,276 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import IO, Any
+from xml.sax.saxutils import escape
+
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+from reportlab.platypus import (
+    BaseDocTemplate,
+    Flowable,
+    Frame,
+    PageTemplate,
+    Paragraph,
+    Spacer,
+)
+
+
+@dataclass(frozen=True)
+class ReportTemplate:
+    """Declarative description of a report layout.
+
+    `version` must be bumped whenever a change alters the rendered output, as
+    it is part of the identity of a rendered report.
+    """
+
+    name: str
+    version: str
+    title_format: str
+    page_size: tuple[float, float] = letter
+    margin: float = inch
+    title_space_after: float = 0.2 * 0.4 * letter[1]
+    header_text: str | None = None
+    footer_text: str | None = None
+    fonts: dict[str, str] = field(default_factory=dict)
+
+
+def _register_fonts(fonts: dict[str, str]) -> None:
+    registered = set(pdfmetrics.getRegisteredFontNames())
+    for font_name, path in fonts.items():
+        if font_name not in registered:
+            pdfmetrics.registerFont(TTFont(font_name, path))
+
+
+class StreamingDocTemplate(BaseDocTemplate):
+    """Doc template that lays out flowables pulled lazily from an iterable.
+
+    `BaseDocTemplate.build` needs the whole story as a list before layout
+    starts. Here only a short look-ahead window is buffered (extended while
+    flowables ask to be kept with the next one), so a flowable can be freed as
+    soon as its page is drawn and peak memory no longer grows with the number
+    of flowables in the report.
+    """
+
+    lookahead = 8
+
+    def _fill(self, window: list[Flowable], source: Iterator[Flowable]) -> bool:
+        while len(window) < self.lookahead or window[-1].getKeepWithNext():
+            flowable = next(source, None)
+            if flowable is None:
+                break
+            window.append(flowable)
+        return bool(window)
+
+    def build(
+        self,
+        flowables: Iterable[Flowable],
+        filename: Any = None,
+        canvasmaker: Any = canvas.Canvas,
+    ) -> None:
+        source = iter(flowables)
+        window: list[Flowable] = []
+        self._startBuild(filename, canvasmaker)
+        canv = self.canv
+        saved_info = canv._doc.info
+        try:
+            canv._doctemplate = self
+            while self._fill(window, source):
+                self.clean_hanging()
+                self.handle_flowable(window)
+        finally:
+            del canv._doctemplate
+        canv._doc.info = saved_info
+        self._endBuild()
+
+
+class CompiledTemplate:
+    """A report template with its styles and page layout built once.
+
+    Each render only creates the flowables for the variable content. Page
+    templates hold per-build frame state, so builds are serialized with a lock;
+    the render service runs one build per worker process anyway.
+    """
+
+    def __init__(self, template: ReportTemplate) -> None:
+        self.template = template
+        _register_fonts(template.fonts)
+
+        self.styles: StyleSheet1 = getSampleStyleSheet()
+        self.title_style = ParagraphStyle(
+            "TitleStyle", parent=self.styles["h1"], alignment=TA_CENTER, spaceAfter=14
+        )
+        self.heading_style = ParagraphStyle(
+            "HeadingStyle", parent=self.styles["h2"], spaceBefore=12, spaceAfter=6
+        )
+        self.subheading_style = ParagraphStyle(
+            "SubheadingStyle", parent=self.styles["h3"], spaceBefore=8, spaceAfter=4
+        )
+        self.body_style = self.styles["Normal"]
+        self.code_style = self.styles["Code"]
+        self._list_styles: dict[tuple[int, float], ParagraphStyle] = {}
+        self.title_spacer = Spacer(1, template.title_space_after)
+
+        width, height = template.page_size
+        self.frame_width = width - 2 * template.margin
+        frame = Frame(
+            template.margin,
+            template.margin,
+            self.frame_width,
+            height - 2 * template.margin,
+            id="normal",
+        )
+        self.page_templates = [
+            PageTemplate(id="report", frames=[frame], onPage=self._decorate_page)
+        ]
+        self._lock = threading.Lock()
+
+    def list_style(self, depth: int, marker: str = "•") -> ParagraphStyle:
+        """Hanging-indent body style for list items nested `depth` levels.
+
+        Items start with their `marker` inline, in the same text run: the first
+        line is pulled left by the width of the marker and a space, so the text
+        of every line starts at the same indent.
+        """
+        body = self.body_style
+        hang = pdfmetrics.stringWidth(f"{marker} ", body.fontName, body.fontSize)
+        style = self._list_styles.get((depth, hang))
+        if style is None:
+            style = ParagraphStyle(
+                f"ListStyle{depth}",
+                parent=body,
+                leftIndent=18 * (depth + 1),
+                firstLineIndent=-hang,
+            )
+            self._list_styles[depth, hang] = style
+        return style
+
+    def _decorate_page(self, canvas: Any, doc: BaseDocTemplate) -> None:
+        template = self.template
+        if not (template.header_text or template.footer_text):
+            return
+        width, height = template.page_size
+        canvas.saveState()
+        canvas.setFont("Helvetica", 8)
+        if template.header_text:
+            canvas.drawCentredString(
+                width / 2, height - template.margin / 2, template.header_text
+            )
+        if template.footer_text:
+            canvas.drawCentredString(
+                width / 2,
+                template.margin / 2,
+                template.footer_text.format(page=doc.page),
+            )
+        canvas.restoreState()
+
+    def title_flowables(self, **context: str) -> list[Flowable]:
+        """Return the title block for the given template context."""
+        context = {key: escape(value) for key, value in context.items()}
+        return [
+            Paragraph(self.template.title_format.format(**context), self.title_style),
+            self.title_spacer,
+        ]
+
+    def build(self, output: IO[bytes], story: Iterable[Flowable]) -> int:
+        """Lay out `story` into `output` using the cached page templates.
+
+        `story` may be a generator; flowables are pulled as layout reaches them.
+        Returns the number of pages laid out.
+        """
+        doc = StreamingDocTemplate(
+            output,
+            pagesize=self.template.page_size,
+            pageTemplates=self.page_templates,
+            leftMargin=self.template.margin,
+            rightMargin=self.template.margin,
+            topMargin=self.template.margin,
+            bottomMargin=self.template.margin,
+        )
+        with self._lock:
+            doc.build(story)
+        return doc.page
+
+
+StoryBuilder = Callable[[CompiledTemplate, str], Iterable[Flowable]]
+
+
+class TemplateEngine:
+    """Registry of named report templates, compiled lazily and cached."""
+
+    def __init__(self) -> None:
+        self._templates: dict[str, tuple[ReportTemplate, StoryBuilder]] = {}
+        self._compiled: dict[str, CompiledTemplate] = {}
+        self._lock = threading.Lock()
+
+    def register(self, template: ReportTemplate, story_builder: StoryBuilder) -> None:
+        """Register `template`; `story_builder` turns body text into flowables."""
+        with self._lock:
+            self._templates[template.name] = (template, story_builder)
+            self._compiled.pop(template.name, None)
+
+    def template(self, name: str) -> ReportTemplate:
+        return self._templates[name][0]
+
+    def get(self, name: str) -> CompiledTemplate:
+        """Return the compiled template, compiling it on first use."""
+        with self._lock:
+            compiled = self._compiled.get(name)
+            if compiled is None:
+                compiled = CompiledTemplate(self._templates[name][0])
+                self._compiled[name] = compiled
+            return compiled
+
+    def render_into(
+        self, name: str, body: str, output: IO[bytes], **context: str
+    ) -> int:
+        """Render `body` with template `name` into `output`.
+
+        Returns the number of pages rendered.
+        """
+        compiled = self.get(name)
+        story_builder = self._templates[name][1]
+        story = itertools.chain(
+            compiled.title_flowables(**context), story_builder(compiled, body)
+        )
+        return compiled.build(output, story)
+
+    def render(
+        self,
+        name: str,
+        body: str,
+        output: IO[bytes] | None = None,
+        **context: str,
+    ) -> bytes:
+        """Render `body` with template `name`.
+
+        Returns the PDF bytes when no `output` stream is given, otherwise
+        writes into `output` and returns an empty bytes object.
+        """
+        if output is not None:
+            self.render_into(name, body, output, **context)
+            return b""
+        buffer = BytesIO()
+        self.render_into(name, body, buffer, **context)
+        return buffer.getvalue()
@@ -0,0 +1,131 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import os
+
+from app.app_utils.pdf import (
+    SWOT_TEMPLATE,
+    pdf_object_path,
+    public_url,
+    render_swot_pdf_to_file,
+    render_swot_pdf_with_pages,
+    upload_pdf,
+)
+from app.app_utils.pdf_cache import content_key, get_pdf_cache
+from app.app_utils.render_service import get_render_service
+from app.app_utils.storage import get_storage_pool
+from app.app_utils.telemetry import (
+    pdf_pages,
+    pdf_size,
+    report_size,
+    stage_span,
+)
+from app.app_utils.upload_queue import get_upload_queue, upload_mode
+
+
+async def publish_swot_pdf(company_name: str, swot_analysis_text: str) -> str:
+    """Render a SWOT PDF, upload it to GCS and return its public URL.
+
+    Identical reports map to the same object, so an existing upload is reused
+    when dedup is enabled with `PDF_DEDUP=true`. Rendering runs in a worker
+    process; the upload runs here, on the pooled async filesystem of the
+    storage pool. Traced as a `swot.pdf.publish` span with consecutive
+    `swot.pdf.render` and `swot.pdf.upload` children.
+
+    With `PDF_UPLOAD_MODE=write-behind` the PDF is rendered into the local
+    upload spool instead and the URL is returned before the upload finishes
+    (see `app.app_utils.upload_queue`).
+
+    Raises:
+        RenderQueueFullError: If the render queue stays full.
+        Exception: If the upload fails.
+    """
+    render_service = get_render_service()
+    fs = get_storage_pool().filesystem()
+    pdf_cache = get_pdf_cache()
+    write_behind = upload_mode() == "write-behind"
+    attributes = {
+        "swot.company": company_name,
+        "swot.report.chars": len(swot_analysis_text),
+        "swot.upload.mode": upload_mode(),
+    }
+
+    with stage_span("pdf.publish", attributes) as span:
+        key = None
+        if pdf_cache is not None:
+            key = content_key(SWOT_TEMPLATE.version, company_name, swot_analysis_text)
+            full_path = pdf_object_path(company_name, key[:32])
+            cached = (
+                write_behind and get_upload_queue().is_pending(full_path)
+            ) or await render_service.upload(pdf_cache.lookup, fs, key, full_path)
+            span.set_attribute("swot.pdf.cache_hit", cached)
+            if cached:
+                return public_url(full_path)
+        else:
+            full_path = pdf_object_path(company_name)
+
+        if write_behind:
+            pages, size = await _render_to_spool(
+                full_path, key, swot_analysis_text, company_name
+            )
+        else:
+            pages, size = await _render_and_upload(
+                full_path, swot_analysis_text, company_name
+            )
+            if pdf_cache is not None and key is not None:
+                pdf_cache.put(key, full_path)
+        span.set_attributes({"swot.pdf.pages": pages, "swot.upload.bytes": size})
+        report_size.record(len(swot_analysis_text))
+        pdf_size.record(size)
+        pdf_pages.record(pages)
+        return public_url(full_path)
+
+
+async def _render_and_upload(
+    full_path: str, swot_analysis_text: str, company_name: str
+) -> tuple[int, int]:
+    with stage_span("pdf.render") as render_span:
+        pdf, pages = await get_render_service().run_render(
+            render_swot_pdf_with_pages, swot_analysis_text, company_name
+        )
+        render_span.set_attribute("swot.pdf.pages", pages)
+    with stage_span("pdf.upload", {"swot.upload.bytes": len(pdf)}):
+        await upload_pdf(await get_storage_pool().async_filesystem(), full_path, pdf)
+    return pages, len(pdf)
+
+
+async def _render_to_spool(
+    full_path: str, key: str | None, swot_analysis_text: str, company_name: str
+) -> tuple[int, int]:
+    # The dedup cache learns about the object once the upload has succeeded.
+    upload_queue = get_upload_queue()
+    job = upload_queue.new_job(full_path, dedup_key=key)
+    try:
+        with stage_span("pdf.render") as render_span:
+            pages = await get_render_service().run_render(
+                render_swot_pdf_to_file,
+                job.staging_file,
+                swot_analysis_text,
+                company_name,
+            )
+            render_span.set_attribute("swot.pdf.pages", pages)
+        # Once submitted, the upload thread may delete the spooled file.
+        size = os.path.getsize(job.staging_file)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(job.staging_file)
+        raise
+    upload_queue.submit(job)
+    return pages, size
@@ -0,0 +1,182 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.app_utils.pdf import render_swot_pdf
+
+T = TypeVar("T")
+
+_SLOT_POLL_INTERVAL = 0.05
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (its affinity mask, where supported)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_render_workers() -> int:
+    """One render process per CPU left to this worker, at most 4.
+
+    `NUM_WORKERS` (set by the deploy script) is the number of serving
+    processes expected per instance, each with its own render pool, so the
+    CPUs are split between them instead of every pool sizing itself to the
+    whole machine. It does not start any processes: on Agent Engine the
+    runtime decides how many serving processes an instance runs.
+    """
+    num_workers = max(1, int(os.environ.get("NUM_WORKERS", 1)))
+    return max(1, min(4, available_cpus() // num_workers))
+
+
+class RenderQueueFullError(RuntimeError):
+    """Raised when the render queue stays full for longer than the queue timeout."""
+
+
+class PdfRenderService:
+    """Runs PDF rendering in a process pool and uploads in a thread pool.
+
+    Rendering is CPU bound and holds the GIL, so running it inline on the
+    event loop stalls every other session served by the same container. The
+    service keeps the event loop free by handing renders to worker processes
+    and blocking I/O to worker threads. At most `max_pending` renders may be
+    queued or running at once; callers beyond that wait up to `queue_timeout`
+    seconds and then get a `RenderQueueFullError`.
+    """
+
+    def __init__(
+        self,
+        render_workers: int | None = None,
+        upload_workers: int | None = None,
+        max_pending: int | None = None,
+        queue_timeout: float | None = None,
+        render_fn: Callable[[str, str], bytes] = render_swot_pdf,
+        start_method: str | None = None,
+    ) -> None:
+        self.render_workers = render_workers or int(
+            os.environ.get("PDF_RENDER_WORKERS", default_render_workers())
+        )
+        self.upload_workers = upload_workers or int(
+            os.environ.get("PDF_UPLOAD_WORKERS", 8)
+        )
+        self.max_pending = max_pending or int(
+            os.environ.get("PDF_RENDER_MAX_PENDING", self.render_workers * 4)
+        )
+        self.queue_timeout = (
+            queue_timeout
+            if queue_timeout is not None
+            else float(os.environ.get("PDF_RENDER_QUEUE_TIMEOUT", 30))
+        )
+        self.render_fn = render_fn
+        self.start_method = start_method or os.environ.get(
+            "PDF_RENDER_START_METHOD", "spawn"
+        )
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._render_pool: ProcessPoolExecutor | None = None
+        self._upload_pool: ThreadPoolExecutor | None = None
+
+    @property
+    def render_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._render_pool is None:
+                self._render_pool = ProcessPoolExecutor(
+                    max_workers=self.render_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                )
+            return self._render_pool
+
+    @property
+    def upload_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._upload_pool is None:
+                self._upload_pool = ThreadPoolExecutor(
+                    max_workers=self.upload_workers,
+                    thread_name_prefix="pdf-upload",
+                )
+            return self._upload_pool
+
+    async def _acquire_slot(self) -> None:
+        # Poll instead of blocking a thread on the semaphore so a cancelled
+        # caller can never acquire a slot it will not release.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.queue_timeout
+        while not self._slots.acquire(blocking=False):
+            if loop.time() >= deadline:
+                raise RenderQueueFullError(
+                    f"PDF render queue is full ({self.max_pending} pending renders)"
+                )
+            await asyncio.sleep(_SLOT_POLL_INTERVAL)
+
+    async def render(self, swot_analysis_text: str, company_name: str) -> bytes:
+        """Render a SWOT PDF in the process pool without blocking the loop."""
+        return await self.run_render(self.render_fn, swot_analysis_text, company_name)
+
+    async def run_render(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a picklable render callable in the process pool.
+
+        Counts against the same pending-render limit as `render`.
+        """
+        await self._acquire_slot()
+        try:
+            return await self._run(self.render_pool, fn, *args)
+        finally:
+            self._slots.release()
+
+    async def upload(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a blocking upload callable in the I/O thread pool."""
+        return await self._run(self.upload_pool, fn, *args)
+
+    @staticmethod
+    async def _run(executor: Executor, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, fn, *args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down both pools. They are recreated lazily on next use."""
+        with self._lock:
+            render_pool, self._render_pool = self._render_pool, None
+            upload_pool, self._upload_pool = self._upload_pool, None
+        if render_pool is not None:
+            render_pool.shutdown(wait=wait)
+        if upload_pool is not None:
+            upload_pool.shutdown(wait=wait)
+
+
+_render_service: PdfRenderService | None = None
+_render_service_lock = threading.Lock()
+
+
+def get_render_service() -> PdfRenderService:
+    """Return the process-wide render service, creating it on first use."""
+    global _render_service
+    with _render_service_lock:
+        if _render_service is None:
+            _render_service = PdfRenderService()
+            logging.info(
+                "PDF render service: %d render workers, %d upload workers, "
+                "%d max pending",
+                _render_service.render_workers,
+                _render_service.upload_workers,
+                _render_service.max_pending,
+            )
+        return _render_service
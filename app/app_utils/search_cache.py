@@ -0,0 +1,285 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any, Protocol
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import (
+    InvocationContext,
+    new_invocation_context_id,
+)
+from google.adk.auth.credential_service.base_credential_service import (
+    BaseCredentialService,
+)
+from google.adk.plugins.plugin_manager import PluginManager
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import AgentTool, ToolContext
+from opentelemetry import trace
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search request so trivially different phrasings share a key."""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip("?.! ")
+
+
+@dataclass
+class CacheEntry:
+    """A cached search result and how long it originally took to produce."""
+
+    value: str
+    created_at: float
+    latency: float
+
+
+class SearchCacheBackend(Protocol):
+    def get(self, key: str) -> CacheEntry | None: ...
+
+    def set(self, key: str, entry: CacheEntry) -> None: ...
+
+
+class InMemorySearchCache:
+    """Per-process LRU search cache."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SqliteSearchCache:
+    """On-disk search cache that survives restarts and is shared by workers."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, value TEXT, created_at REAL, latency REAL)"
+            )
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, latency FROM search_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?)",
+                (key, entry.value, entry.created_at, entry.latency),
+            )
+
+
+@dataclass
+class SearchCacheStats:
+    """Hit-rate and latency-saved counters for the search cache."""
+
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    latency_saved: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / total if total else 0.0
+
+
+class CachedAgentTool(AgentTool):
+    """AgentTool that caches the wrapped agent's answers by normalized request.
+
+    Entries younger than `ttl` are served directly. Entries up to
+    `stale_ttl` seconds past that are still served, but trigger a background
+    refresh (stale-while-revalidate). Older entries are treated as misses.
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        cache: SearchCacheBackend,
+        ttl: float = 6 * 3600,
+        stale_ttl: float = 3600,
+        clock: Callable[[], float] = time.time,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(agent, **kwargs)
+        self.cache = cache
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = SearchCacheStats()
+        self._clock = clock
+        self._refreshing: dict[str, asyncio.Task[Any]] = {}
+
+    def cache_key(self, args: dict[str, Any]) -> str:
+        """Key of a request, namespaced by agent since backends can be shared."""
+        if set(args) == {"request"}:
+            return f"{self.agent.name}:{normalize_query(str(args['request']))}"
+        return f"{self.agent.name}:{json.dumps(args, sort_keys=True)}"
+
+    async def run_async(
+        self, *, args: dict[str, Any], tool_context: ToolContext
+    ) -> Any:
+        key = self.cache_key(args)
+        entry = self.cache.get(key)
+        # Annotates ADK's `execute_tool` span for this call.
+        span = trace.get_current_span()
+        if entry is not None:
+            age = self._clock() - entry.created_at
+            if age <= self.ttl:
+                self.stats.hits += 1
+                self.stats.latency_saved += entry.latency
+                span.set_attribute("swot.search.cache", "hit")
+                return entry.value
+            if age <= self.ttl + self.stale_ttl:
+                self.stats.stale_hits += 1
+                self.stats.latency_saved += entry.latency
+                span.set_attribute("swot.search.cache", "stale")
+                self._refresh(key, args, tool_context)
+                return entry.value
+        self.stats.misses += 1
+        span.set_attribute("swot.search.cache", "miss")
+        return await self._fetch(key, args, tool_context)
+
+    async def _fetch(
+        self, key: str, args: dict[str, Any], tool_context: ToolContext
+    ) -> Any:
+        start = time.perf_counter()
+        result = await super().run_async(args=args, tool_context=tool_context)
+        if isinstance(result, str) and result:
+            self.cache.set(
+                key, CacheEntry(result, self._clock(), time.perf_counter() - start)
+            )
+        return result
+
+    def _refresh(
+        self, key: str, args: dict[str, Any], tool_context: ToolContext
+    ) -> None:
+        if key in self._refreshing:
+            return
+        self.stats.refreshes += 1
+        parent = tool_context._invocation_context
+        task = asyncio.create_task(
+            self._fetch_detached(
+                key,
+                args,
+                app_name=parent.app_name,
+                user_id=parent.user_id,
+                credential_service=parent.credential_service,
+                plugin_manager=parent.plugin_manager,
+            )
+        )
+        self._refreshing[key] = task
+
+        def done(task: asyncio.Task[Any]) -> None:
+            self._refreshing.pop(key, None)
+            if not task.cancelled() and task.exception() is not None:
+                logging.warning(f"Search cache refresh failed: {task.exception()}")
+
+        task.add_done_callback(done)
+
+    async def _fetch_detached(
+        self,
+        key: str,
+        args: dict[str, Any],
+        app_name: str,
+        user_id: str,
+        credential_service: BaseCredentialService | None,
+        plugin_manager: PluginManager,
+    ) -> Any:
+        """Refresh `key` after the calling invocation may have finished.
+
+        Runs on a session of its own, keeping only the caller's app, user,
+        credentials and plugins, so the refresh neither reads nor writes the
+        state of an invocation that is no longer running.
+        """
+        session_service = InMemorySessionService()
+        session = await session_service.create_session(
+            app_name=app_name, user_id=user_id
+        )
+        ctx = InvocationContext(
+            session_service=session_service,
+            invocation_id=new_invocation_context_id(),
+            agent=self.agent,
+            session=session,
+            credential_service=credential_service,
+            plugin_manager=plugin_manager,
+        )
+        return await self._fetch(key, args, ToolContext(ctx))
+
+    def metrics(self) -> dict[str, Any]:
+        return {**asdict(self.stats), "hit_rate": self.stats.hit_rate}
+
+
+def build_search_cache() -> SearchCacheBackend | None:
+    """Build the search cache backend selected by `SEARCH_CACHE_BACKEND`.
+
+    One of `memory` (default), `sqlite` (at `SEARCH_CACHE_PATH`) or `none`.
+    """
+    backend = os.environ.get("SEARCH_CACHE_BACKEND", "memory").lower()
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SqliteSearchCache(
+            os.environ.get("SEARCH_CACHE_PATH", "/tmp/search_cache.sqlite3")
+        )
+    return InMemorySearchCache(int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", 1024)))
+
+
+def search_agent_tool(agent: BaseAgent) -> AgentTool:
+    """Wrap a search agent in a cached AgentTool when a cache is configured.
+
+    Also used for the research stage, whose request is the company name.
+    """
+    cache = build_search_cache()
+    if cache is None:
+        return AgentTool(agent)
+    return CachedAgentTool(
+        agent,
+        cache,
+        ttl=float(os.environ.get("SEARCH_CACHE_TTL", 6 * 3600)),
+        stale_ttl=float(os.environ.get("SEARCH_CACHE_STALE_TTL", 3600)),
+    )
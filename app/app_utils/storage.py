@@ -0,0 +1,222 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import threading
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import aiohttp
+import gcsfs
+import google.auth
+import requests
+from google.auth.transport.requests import AuthorizedSession
+
+DEFAULT_POOL_SIZE = int(os.environ.get("GCS_POOL_SIZE", 16))
+DEFAULT_KEEPALIVE_TIMEOUT = float(os.environ.get("GCS_KEEPALIVE_TIMEOUT", 60))
+
+
+@dataclass
+class ConnectionStats:
+    """Counts of HTTP connections opened vs. reused from a pool."""
+
+    opened: int = 0
+    reused: int = 0
+
+
+# Per-process counters for the aiohttp pools behind PooledGCSFileSystem.
+filesystem_connection_stats = ConnectionStats()
+
+
+def connection_trace_config(stats: ConnectionStats) -> aiohttp.TraceConfig:
+    """Build an aiohttp trace config that records connection reuse in `stats`."""
+
+    async def on_create(*_: Any) -> None:
+        stats.opened += 1
+
+    async def on_reuse(*_: Any) -> None:
+        stats.reused += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(on_create)
+    trace_config.on_connection_reuseconn.append(on_reuse)
+    return trace_config
+
+
+class PooledGCSFileSystem(gcsfs.GCSFileSystem):
+    """gcsfs filesystem with a sized, keep-alive aiohttp connection pool.
+
+    The connector has to be created inside the filesystem's event loop, so it
+    is injected when gcsfs first opens its session rather than at init.
+    """
+
+    session_kwargs: dict[str, Any]
+
+    def __init__(
+        self,
+        *args: Any,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+
+    async def _set_session(self) -> aiohttp.ClientSession:
+        if self._session is None and "connector" not in self.session_kwargs:
+            self.session_kwargs = {
+                **self.session_kwargs,
+                "connector": aiohttp.TCPConnector(
+                    limit=self.pool_size, keepalive_timeout=self.keepalive_timeout
+                ),
+                "trace_configs": [
+                    *self.session_kwargs.get("trace_configs", []),
+                    connection_trace_config(filesystem_connection_stats),
+                ],
+            }
+        return await super()._set_session()
+
+
+class StoragePool:
+    """Lazily created GCS clients shared by everything in the process.
+
+    Both the fsspec filesystem used for PDF uploads and the HTTP session of
+    the `google.cloud.storage` client used by the artifact service are
+    created on first use, authenticate once and keep their connections
+    alive, so requests after the first skip auth, session setup and TLS
+    handshakes.
+    """
+
+    def __init__(
+        self,
+        project: str | None = None,
+        credentials: Any = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+    ) -> None:
+        self._project = project
+        self._credentials = credentials
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self._lock = threading.Lock()
+        self._filesystem: PooledGCSFileSystem | None = None
+        self._async_filesystems: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, PooledGCSFileSystem
+        ] = weakref.WeakKeyDictionary()
+        self._adapter: requests.adapters.HTTPAdapter | None = None
+        self._session: AuthorizedSession | None = None
+
+    def _auth(self) -> tuple[Any, str]:
+        if self._credentials is None:
+            self._credentials, default_project = google.auth.default()
+            self._project = self._project or default_project
+        assert self._project is not None
+        return self._credentials, self._project
+
+    @property
+    def project(self) -> str:
+        with self._lock:
+            return self._auth()[1]
+
+    def _filesystem_kwargs(self) -> dict[str, Any]:
+        return {
+            "project": self._auth()[1],
+            "token": "google_default",
+            "pool_size": self.pool_size,
+            "keepalive_timeout": self.keepalive_timeout,
+        }
+
+    def filesystem(self) -> PooledGCSFileSystem:
+        """Return the shared synchronous gcsfs filesystem."""
+        with self._lock:
+            if self._filesystem is None:
+                self._filesystem = PooledGCSFileSystem(**self._filesystem_kwargs())
+            return self._filesystem
+
+    async def async_filesystem(self) -> PooledGCSFileSystem:
+        """Return a gcsfs filesystem bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            fs = self._async_filesystems.get(loop)
+            if fs is None:
+                fs = PooledGCSFileSystem(
+                    **self._filesystem_kwargs(),
+                    asynchronous=True,
+                    loop=loop,
+                    skip_instance_cache=True,
+                )
+                self._async_filesystems[loop] = fs
+        await fs._set_session()
+        return fs
+
+    def storage_client_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for a `storage.Client` on the shared HTTP pool."""
+        with self._lock:
+            credentials, project = self._auth()
+            if self._session is None:
+                self._adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=self.pool_size, pool_maxsize=self.pool_size
+                )
+                self._session = AuthorizedSession(credentials)
+                self._session.mount("https://", self._adapter)
+                self._session.mount("http://", self._adapter)
+            return {
+                "project": project,
+                "credentials": credentials,
+                "_http": self._session,
+            }
+
+    def storage_client_stats(self) -> ConnectionStats:
+        """Connections opened vs. reused by the storage client's pools."""
+        stats = ConnectionStats()
+        if self._adapter is None:
+            return stats
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            stats.opened += pool.num_connections
+            stats.reused += pool.num_requests - pool.num_connections
+        return stats
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Connection counters for every client in this process."""
+        return {
+            "filesystem": asdict(filesystem_connection_stats),
+            "storage_client": asdict(self.storage_client_stats()),
+        }
+
+
+_storage_pool: StoragePool | None = None
+_storage_pool_lock = threading.Lock()
+
+
+def get_storage_pool() -> StoragePool:
+    """Return the process-wide storage pool, creating it on first use."""
+    global _storage_pool
+    with _storage_pool_lock:
+        if _storage_pool is None:
+            _storage_pool = StoragePool()
+        return _storage_pool
+
+
+def build_artifact_service(bucket_name: str) -> Any:
+    """Build a `GcsArtifactService` on the shared credentials and HTTP pool."""
+    from google.adk.artifacts import GcsArtifactService
+
+    return GcsArtifactService(
+        bucket_name=bucket_name, **get_storage_pool().storage_client_kwargs()
+    )
@@ -14,6 +14,46 @@
 
 import logging
 import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins import BasePlugin
+from google.adk.tools import BaseTool, ToolContext
+from opentelemetry import metrics, trace
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+tracer = trace.get_tracer("app")
+meter = metrics.get_meter("app")
+
+stage_duration = meter.create_histogram(
+    "swot.stage.duration",
+    unit="s",
+    description="Duration of each stage of a SWOT request.",
+)
+report_size = meter.create_histogram(
+    "swot.report.size",
+    unit="{char}",
+    description="Length of the SWOT analyses rendered to PDF.",
+)
+pdf_size = meter.create_histogram(
+    "swot.pdf.size", unit="By", description="Size of the uploaded SWOT PDFs."
+)
+pdf_pages = meter.create_histogram(
+    "swot.pdf.pages", unit="{page}", description="Page count of the SWOT PDFs."
+)
+llm_tokens = meter.create_histogram(
+    "swot.llm.tokens", unit="{token}", description="Tokens per model call."
+)
 
 
 def setup_telemetry() -> str | None:
@@ -30,7 +70,6 @@ def setup_telemetry() -> str | None:
         )
         os.environ["OTEL_INSTRUMENTATION_GENAI_CAPTURE_MESSAGE_CONTENT"] = "NO_CONTENT"
         os.environ.setdefault("OTEL_INSTRUMENTATION_GENAI_UPLOAD_FORMAT", "jsonl")
-        os.environ.setdefault("OTEL_INSTRUMENTATION_GENAI_COMPLETION_HOOK", "upload")
         os.environ.setdefault(
             "OTEL_SEMCONV_STABILITY_OPT_IN", "gen_ai_latest_experimental"
         )
@@ -44,9 +83,181 @@ def setup_telemetry() -> str | None:
             "OTEL_INSTRUMENTATION_GENAI_UPLOAD_BASE_PATH",
             f"gs://{bucket}/{path}",
         )
+        setup_completion_upload()
     else:
         logging.info(
             "Prompt-response logging disabled (set LOGS_BUCKET_NAME=gs://your-bucket and OTEL_INSTRUMENTATION_GENAI_CAPTURE_MESSAGE_CONTENT=NO_CONTENT to enable)"
         )
 
     return bucket
+
+
+def setup_completion_upload() -> None:
+    """Choose how GenAI completion records are uploaded.
+
+    `GENAI_TELEMETRY_UPLOAD=batched` (default) samples completions and
+    uploads them as multi-record JSONL objects (see
+    `app.app_utils.genai_telemetry`); `per-completion` uses the stock
+    `upload` hook, which writes three objects per model call.
+    """
+    mode = os.environ.get("GENAI_TELEMETRY_UPLOAD", "batched")
+    if mode == "batched":
+        from app.app_utils.genai_telemetry import install_completion_uploader
+
+        base_path = os.environ["OTEL_INSTRUMENTATION_GENAI_UPLOAD_BASE_PATH"]
+        if install_completion_uploader(base_path) is not None:
+            return
+    elif mode != "per-completion":
+        raise ValueError(
+            f"GENAI_TELEMETRY_UPLOAD must be 'batched' or 'per-completion', got {mode!r}"
+        )
+    os.environ.setdefault("OTEL_INSTRUMENTATION_GENAI_COMPLETION_HOOK", "upload")
+
+
+@contextmanager
+def stage_span(
+    stage: str, attributes: dict[str, Any] | None = None
+) -> Iterator[trace.Span]:
+    """Trace `stage` as a `swot.<stage>` span and record its duration."""
+    labels = {"swot.stage": stage}
+    start = time.perf_counter()
+    with tracer.start_as_current_span(f"swot.{stage}", attributes=attributes) as span:
+        try:
+            yield span
+        except Exception as e:
+            labels["error.type"] = type(e).__name__
+            raise
+        finally:
+            stage_duration.record(time.perf_counter() - start, labels)
+
+
+class StageMetricsPlugin(BasePlugin):
+    """Record model-call and tool latencies and token counts as histograms.
+
+    ADK already traces every model call (`call_llm`) and tool call
+    (`execute_tool`, covering the search, research and PDF stages); this adds
+    the matching `swot.stage.duration` and `swot.llm.tokens` metrics, labelled
+    with the agent and the model that served the call. The plugin is
+    propagated to the agents run by `AgentTool`s.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(name="stage_metrics")
+        self._started: dict[tuple[str, ...], float] = {}
+        self._requests: dict[tuple[str, ...], LlmRequest] = {}
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        key = ("llm", callback_context.invocation_id, callback_context.agent_name)
+        self._started[key] = time.perf_counter()
+        # Routed models pick the serving model after this callback.
+        self._requests[key] = llm_request
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> LlmResponse | None:
+        if llm_response.partial:
+            return None
+        agent = callback_context.agent_name
+        key = ("llm", callback_context.invocation_id, agent)
+        start = self._started.pop(key, None)
+        llm_request = self._requests.pop(key, None)
+        labels = {"gen_ai.agent.name": agent}
+        if llm_request is not None and llm_request.model:
+            labels["gen_ai.request.model"] = llm_request.model
+        if start is not None:
+            stage_duration.record(
+                time.perf_counter() - start, {"swot.stage": "llm", **labels}
+            )
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            for token_type, count in (
+                ("input", usage.prompt_token_count),
+                ("output", usage.candidates_token_count),
+            ):
+                if count:
+                    llm_tokens.record(
+                        count, {**labels, "gen_ai.token.type": token_type}
+                    )
+        return None
+
+    async def on_model_error_callback(
+        self,
+        *,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+        error: Exception,
+    ) -> LlmResponse | None:
+        key = ("llm", callback_context.invocation_id, callback_context.agent_name)
+        self._started.pop(key, None)
+        self._requests.pop(key, None)
+        return None
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: dict[str, Any], tool_context: ToolContext
+    ) -> dict | None:
+        key = ("tool", tool_context.invocation_id, tool_context.function_call_id or "")
+        self._started[key] = time.perf_counter()
+        return None
+
+    def _record_tool(
+        self, tool: BaseTool, tool_context: ToolContext, error: Exception | None
+    ) -> None:
+        key = ("tool", tool_context.invocation_id, tool_context.function_call_id or "")
+        start = self._started.pop(key, None)
+        if start is None:
+            return
+        labels = {"swot.stage": "tool", "gen_ai.tool.name": tool.name}
+        if error is not None:
+            labels["error.type"] = type(error).__name__
+        stage_duration.record(time.perf_counter() - start, labels)
+
+    async def after_tool_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: dict[str, Any],
+        tool_context: ToolContext,
+        result: dict,
+    ) -> dict | None:
+        self._record_tool(tool, tool_context, None)
+        return None
+
+    async def on_tool_error_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: dict[str, Any],
+        tool_context: ToolContext,
+        error: Exception,
+    ) -> dict | None:
+        self._record_tool(tool, tool_context, error)
+        return None
+
+
+@cache
+def setup_local_telemetry() -> tuple["InMemorySpanExporter", "InMemoryMetricReader"]:
+    """Keep spans and metrics in memory instead of exporting them.
+
+    Installs global tracer and meter providers backed by an in-memory span
+    exporter and metric reader, for tests and local runs that inspect the
+    span tree. OpenTelemetry only accepts the first global provider, so this
+    is done once per process and the same exporters are returned after that.
+    """
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(tracer_provider)
+    reader = InMemoryMetricReader()
+    metrics.set_meter_provider(MeterProvider(metric_readers=[reader]))
+    return exporter, reader
@@ -0,0 +1,345 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Write-behind PDF uploads.
+
+With `PDF_UPLOAD_MODE=write-behind` the PDF tool returns the public URL as
+soon as the PDF is rendered, and an `UploadQueue` uploads it in the
+background. Rendered PDFs are kept in a local spool directory next to a JSON
+manifest, so uploads still pending when the process exits are picked up by
+the next queue started on the same disk. Failed uploads are retried with
+exponential backoff; the object name is fixed before the first attempt, so a
+retry overwrites the same object instead of creating another one.
+"""
+
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from app.app_utils.telemetry import meter, stage_span
+
+PDF_UPLOAD_MODES = ("streaming", "write-behind")
+
+pending_uploads = meter.create_up_down_counter(
+    "swot.upload.pending",
+    unit="{upload}",
+    description="Write-behind PDF uploads not yet completed.",
+)
+
+
+def upload_mode() -> str:
+    """The PDF upload mode from `PDF_UPLOAD_MODE` (default `streaming`)."""
+    mode = os.environ.get("PDF_UPLOAD_MODE", "streaming")
+    if mode not in PDF_UPLOAD_MODES:
+        raise ValueError(
+            f"PDF_UPLOAD_MODE must be one of {PDF_UPLOAD_MODES}, got {mode!r}"
+        )
+    return mode
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@dataclass
+class UploadJob:
+    """A rendered PDF waiting in the spool for upload to `full_path`."""
+
+    job_id: str
+    full_path: str
+    spool_dir: str
+    dedup_key: str | None = None
+    status: str = "pending"
+    attempts: int = 0
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    owner: int = field(default_factory=os.getpid)
+
+    @property
+    def spool_file(self) -> str:
+        return os.path.join(self.spool_dir, f"{self.job_id}.pdf")
+
+    @property
+    def staging_file(self) -> str:
+        """Where the PDF is rendered before `UploadQueue.submit` spools it."""
+        return f"{self.spool_file}.part"
+
+    @property
+    def manifest_file(self) -> str:
+        return os.path.join(self.spool_dir, f"{self.job_id}.json")
+
+    def to_status(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "full_path": self.full_path,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "age_s": round(time.time() - self.created_at, 3),
+        }
+
+
+class UploadQueue:
+    """Spooled background uploader for rendered PDFs.
+
+    Defaults come from `PDF_SPOOL_DIR`, `PDF_UPLOAD_QUEUE_WORKERS`,
+    `PDF_UPLOAD_MAX_ATTEMPTS` and `PDF_UPLOAD_RETRY_DELAY` (seconds before the
+    first retry, doubled for each further attempt). Jobs that used up their
+    attempts stay in the spool as failed and are retried by the next queue
+    that starts on it.
+    """
+
+    def __init__(
+        self,
+        filesystem: Callable[[], Any],
+        spool_dir: str | None = None,
+        workers: int | None = None,
+        max_attempts: int | None = None,
+        retry_delay: float | None = None,
+        on_uploaded: Callable[[UploadJob], None] | None = None,
+    ) -> None:
+        self.filesystem = filesystem
+        self.spool_dir = spool_dir or os.environ.get(
+            "PDF_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "pdf-spool")
+        )
+        self.workers = workers or int(os.environ.get("PDF_UPLOAD_QUEUE_WORKERS", 4))
+        self.max_attempts = max_attempts or int(
+            os.environ.get("PDF_UPLOAD_MAX_ATTEMPTS", 5)
+        )
+        self.retry_delay = (
+            retry_delay
+            if retry_delay is not None
+            else float(os.environ.get("PDF_UPLOAD_RETRY_DELAY", 2))
+        )
+        self.on_uploaded = on_uploaded
+        self.uploaded = 0
+        self._jobs: dict[str, UploadJob] = {}
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[UploadJob | None] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+    def start(self) -> "UploadQueue":
+        """Start the upload threads and resume spooled jobs of dead processes."""
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"pdf-write-behind-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        self._recover()
+        return self
+
+    def new_job(self, full_path: str, dedup_key: str | None = None) -> UploadJob:
+        """Allocate a job; render the PDF into its `staging_file`."""
+        return UploadJob(uuid.uuid4().hex, full_path, self.spool_dir, dedup_key)
+
+    def submit(self, job: UploadJob) -> None:
+        """Spool the rendered `job.staging_file` and queue its upload."""
+        os.replace(job.staging_file, job.spool_file)
+        self._write_manifest(job)
+        self._enqueue(job)
+
+    def is_pending(self, full_path: str) -> bool:
+        """Whether an upload to `full_path` is queued or being retried."""
+        with self._lock:
+            return any(
+                job.full_path == full_path and job.status != "failed"
+                for job in self._jobs.values()
+            )
+
+    def status(self) -> dict[str, Any]:
+        """Pending and failed uploads, plus the number completed."""
+        with self._lock:
+            jobs = [job.to_status() for job in self._jobs.values()]
+        return {
+            "pending": [job for job in jobs if job["status"] != "failed"],
+            "failed": [job for job in jobs if job["status"] == "failed"],
+            "uploaded": self.uploaded,
+        }
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until no job is pending; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.status()["pending"]:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self) -> None:
+        """Stop the upload threads; unfinished jobs stay in the spool."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def _enqueue(self, job: UploadJob) -> None:
+        with self._lock:
+            if job.job_id not in self._jobs:
+                pending_uploads.add(1)
+            self._jobs[job.job_id] = job
+        self._queue.put(job)
+
+    def _run(self) -> None:
+        while (job := self._queue.get()) is not None:
+            try:
+                self._upload(job)
+            except Exception:
+                job.status = "failed"
+                logging.exception(f"Upload to {job.full_path} failed")
+
+    def _upload(self, job: UploadJob) -> None:
+        job.status = "uploading"
+        job.attempts += 1
+        attributes = {
+            "swot.upload.job": job.job_id,
+            "swot.upload.attempt": job.attempts,
+        }
+        try:
+            with stage_span("pdf.upload", attributes) as span:
+                span.set_attribute("swot.upload.bytes", os.path.getsize(job.spool_file))
+                self.filesystem().put_file(job.spool_file, job.full_path)
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            if job.attempts < self.max_attempts:
+                job.status = "retrying"
+                delay = self.retry_delay * 2 ** (job.attempts - 1)
+                timer = threading.Timer(delay, self._queue.put, (job,))
+                timer.daemon = True
+                timer.start()
+            else:
+                job.status = "failed"
+                logging.error(
+                    f"Upload to {job.full_path} failed after {job.attempts} attempts: {job.error}"
+                )
+            self._write_manifest(job)
+            return
+        # The object is uploaded; leftover spool files only cause a harmless
+        # re-upload to the same object after a restart.
+        for path in (job.spool_file, job.manifest_file):
+            try:
+                os.remove(path)
+            except OSError:
+                logging.warning(f"Could not remove spooled file {path}", exc_info=True)
+        with self._lock:
+            del self._jobs[job.job_id]
+            self.uploaded += 1
+        pending_uploads.add(-1)
+        if self.on_uploaded is not None:
+            try:
+                self.on_uploaded(job)
+            except Exception:
+                logging.exception(f"Upload callback for {job.full_path} failed")
+
+    def _write_manifest(self, job: UploadJob) -> None:
+        tmp = f"{job.manifest_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(asdict(job), f)
+        os.replace(tmp, job.manifest_file)
+
+    def _read_manifest(self, path: str) -> UploadJob | None:
+        try:
+            with open(path) as f:
+                return UploadJob(**{**json.load(f), "spool_dir": self.spool_dir})
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError):
+            logging.exception(f"Skipping unreadable upload manifest {path}")
+            return None
+
+    def _claim(self, path: str) -> UploadJob | None:
+        """Take over the job of a dead process by renaming its manifest.
+
+        Several processes can share one spool (e.g. with `NUM_WORKERS` > 1),
+        and only one of them wins the rename. The winner checks the owner
+        again, since the manifest may have been rewritten by a live owner.
+        """
+        pid = os.getpid()
+        job = self._read_manifest(path)
+        if job is None or (job.owner != pid and _process_alive(job.owner)):
+            return None
+        claim = f"{job.manifest_file}.{pid}"
+        try:
+            os.rename(path, claim)
+        except FileNotFoundError:
+            return None
+        job = self._read_manifest(claim)
+        if job is not None and job.owner != pid and _process_alive(job.owner):
+            os.rename(claim, job.manifest_file)
+            return None
+        if job is None or not os.path.exists(job.spool_file):
+            os.remove(claim)
+            return None
+        job.owner, job.status, job.attempts = pid, "pending", 0
+        self._write_manifest(job)
+        os.remove(claim)
+        return job
+
+    def _recover(self) -> None:
+        for name in sorted(os.listdir(self.spool_dir)):
+            # Manifests, and claims left behind by processes that died
+            # while taking over a job.
+            stem, _, pid = name.rpartition(".")
+            stale_claim = (
+                stem.endswith(".json")
+                and pid.isdigit()
+                and not _process_alive(int(pid))
+            )
+            if not (name.endswith(".json") or stale_claim):
+                continue
+            job = self._claim(os.path.join(self.spool_dir, name))
+            if job is not None:
+                self._enqueue(job)
+                logging.info(f"Resuming spooled upload to {job.full_path}")
+
+
+def _remember_upload(job: UploadJob) -> None:
+    from app.app_utils.pdf_cache import get_pdf_cache
+
+    pdf_cache = get_pdf_cache()
+    if pdf_cache is not None and job.dedup_key:
+        pdf_cache.put(job.dedup_key, job.full_path)
+
+
+_upload_queue: UploadQueue | None = None
+_upload_queue_lock = threading.Lock()
+
+
+def get_upload_queue() -> UploadQueue:
+    """Return the process-wide write-behind queue, starting it on first use."""
+    global _upload_queue
+    with _upload_queue_lock:
+        if _upload_queue is None:
+            from app.app_utils.storage import get_storage_pool
+
+            _upload_queue = UploadQueue(
+                lambda: get_storage_pool().filesystem(), on_uploaded=_remember_upload
+            ).start()
+        return _upload_queue
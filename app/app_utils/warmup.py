@@ -0,0 +1,164 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Warm-up of the clients and pools a first request would otherwise create.
+
+`WARMUP_STEPS` (comma-separated, empty to disable) selects the steps, run in
+this order:
+
+* `models`: create the Gemini API client of every agent, including the
+  models behind routing and recording wrappers.
+* `storage`: authenticate and create the pooled GCS filesystem.
+* `render`: start every PDF render worker and render a throwaway PDF in
+  each, loading ReportLab and its fonts.
+* `connections` (off by default): open the TLS connections to GCS and
+  Vertex AI with a metadata request each.
+
+Steps are best effort: a failing step is logged and reported, and the
+remaining steps still run.
+"""
+
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models import BaseLlm, Gemini
+from google.adk.tools import AgentTool
+
+from app.app_utils.pdf import BUCKET_NAME, render_swot_pdf_with_pages
+from app.app_utils.render_service import get_render_service
+from app.app_utils.storage import get_storage_pool
+
+WARMUP_STEPS = ("models", "storage", "render", "connections")
+DEFAULT_WARMUP_STEPS = "models,storage,render"
+
+WARMUP_ANALYSIS = (
+    "### Strengths\n* Warm-up\n### Weaknesses\n* [Link](https://example.com)"
+)
+
+
+@dataclass
+class WarmupReport:
+    """Duration of every warm-up step that ran, and the errors of failed ones."""
+
+    durations: dict[str, float] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "durations_s": self.durations,
+            "errors": self.errors,
+            "total_s": self.total,
+        }
+
+
+def iter_models(agent: BaseAgent) -> Iterator[BaseLlm]:
+    """Yield each distinct model object used by `agent`, its sub-agents and
+    the agents behind its AgentTools."""
+    seen: set[int] = set()
+    pending = [agent]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, LlmAgent):
+            for model in unwrap_model(current.canonical_model):
+                if id(model) not in seen:
+                    seen.add(id(model))
+                    yield model
+            pending.extend(
+                tool.agent for tool in current.tools if isinstance(tool, AgentTool)
+            )
+        pending.extend(current.sub_agents)
+
+
+def unwrap_model(model: BaseLlm) -> Iterator[BaseLlm]:
+    """Yield `model` and the models it wraps (e.g. `RoutedLlm.heavy`,
+    `RecordingLlm.inner`), recursively."""
+    yield model
+    for value in vars(model).values():
+        if isinstance(value, BaseLlm):
+            yield from unwrap_model(value)
+
+
+def warm_models(agent: BaseAgent) -> None:
+    for model in iter_models(agent):
+        if isinstance(model, Gemini):
+            # The client resolves credentials and the endpoint when created.
+            _ = model.api_client
+
+
+def warm_storage() -> None:
+    get_storage_pool().filesystem()
+
+
+def warm_render_worker() -> int:
+    """Warm-up task run in a render worker; returns the rendered page count."""
+    _, pages = render_swot_pdf_with_pages(WARMUP_ANALYSIS, "Warm-up")
+    return pages
+
+
+def warm_render() -> None:
+    service = get_render_service()
+    futures = [
+        service.render_pool.submit(warm_render_worker)
+        for _ in range(service.render_workers)
+    ]
+    for future in futures:
+        future.result()
+
+
+def prime_connections(agent: BaseAgent) -> None:
+    get_storage_pool().filesystem().info(BUCKET_NAME)
+    for model in iter_models(agent):
+        if isinstance(model, Gemini):
+            model.api_client.models.get(model=model.model)
+
+
+def warm_up(agent: BaseAgent, steps: list[str] | None = None) -> WarmupReport:
+    """Run the warm-up `steps` (default: `WARMUP_STEPS` env) for `agent`."""
+    if steps is None:
+        steps = [
+            step.strip()
+            for step in os.environ.get("WARMUP_STEPS", DEFAULT_WARMUP_STEPS).split(",")
+            if step.strip()
+        ]
+    unknown = set(steps) - set(WARMUP_STEPS)
+    if unknown:
+        raise ValueError(f"Unknown warm-up steps {sorted(unknown)}; use {WARMUP_STEPS}")
+
+    actions: dict[str, Callable[[], None]] = {
+        "models": lambda: warm_models(agent),
+        "storage": warm_storage,
+        "render": warm_render,
+        "connections": lambda: prime_connections(agent),
+    }
+    report = WarmupReport()
+    for step in WARMUP_STEPS:
+        if step not in steps:
+            continue
+        start = time.perf_counter()
+        try:
+            actions[step]()
+        except Exception as e:
+            report.errors[step] = str(e)
+            logging.warning(f"Warm-up step {step!r} failed: {e}")
+        report.durations[step] = time.perf_counter() - start
+    return report
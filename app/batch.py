@@ -0,0 +1,288 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Batch SWOT mode: analyze a list of companies without the chat flow.
+
+Each company runs through research -> write -> render -> upload with a
+bounded number of companies in flight, a shared start-rate limit and per-item
+retries. Results stream back as manifest records in completion order.
+
+Run locally with:
+    uv run python -m app.batch companies.txt -o manifest.jsonl
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import asdict, dataclass
+from functools import cache
+from typing import IO, Any
+
+import click
+from google.adk.agents import Agent, BaseAgent, SequentialAgent
+from google.adk.models import BaseLlm
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.research import build_research_stage
+
+ANALYSIS_OUTPUT_KEY = "swot_analysis"
+
+
+def build_batch_pipeline(
+    model: str | BaseLlm,
+    tools: list[Any],
+    name: str = "swot_batch_pipeline",
+) -> SequentialAgent:
+    """Build the non-interactive research -> write pipeline for one company.
+
+    The company comes from the `company_name` session state key and the
+    finished markdown analysis is stored under `swot_analysis`.
+    """
+    writer = Agent(
+        name=f"{name}_writer",
+        model=model,
+        instruction=(
+            "You are a swot analysis agent that performs senior expert "
+            "analysis. Write the SWOT analysis of {company_name} from the "
+            "research below. Use a '### ' heading for each of Strengths, "
+            "Weaknesses, Opportunities and Threats, '* ' bullets for the "
+            "findings, and keep the reference links.\n\n{swot_research}"
+        ),
+        include_contents="none",
+        output_key=ANALYSIS_OUTPUT_KEY,
+    )
+    return SequentialAgent(
+        name=name,
+        sub_agents=[
+            build_research_stage(model, tools, name=f"{name}_research"),
+            writer,
+        ],
+    )
+
+
+@cache
+def default_batch_pipeline() -> SequentialAgent:
+    """The batch pipeline of the deployed agent, built on first use.
+
+    Kept out of `app.agent` so that cold starts of the chat agent do not
+    build it.
+    """
+    from google.adk.tools import google_search
+
+    from app.app_utils.model_tiers import build_agent_model
+
+    return build_batch_pipeline(
+        model=build_agent_model("swot_batch_pipeline"), tools=[google_search]
+    )
+
+
+class RateLimiter:
+    """Spaces out starts so that at most `rate` begin per second (0: off)."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_start = 0.0
+
+    async def acquire(self) -> None:
+        if not self._interval:
+            return
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+@dataclass
+class BatchResult:
+    """One manifest record: the outcome for one company of the batch."""
+
+    index: int
+    company: str
+    status: str
+    url: str | None
+    attempts: int
+    elapsed: float
+    error: str | None = None
+
+    def to_manifest(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class SwotBatch:
+    """Runs the SWOT pipeline over many companies with bounded concurrency.
+
+    At most `concurrency` companies are in flight (`SWOT_BATCH_CONCURRENCY`,
+    default 4), attempts start at no more than `rate_limit` per second
+    (`SWOT_BATCH_RATE_LIMIT`, default 2, 0 disables) and each company gets up
+    to `max_attempts` tries (`SWOT_BATCH_MAX_ATTEMPTS`, default 3) with
+    exponential backoff from `retry_backoff` seconds
+    (`SWOT_BATCH_RETRY_BACKOFF`, default 2). A finished analysis is kept
+    across attempts, so an upload failure does not redo the research.
+    """
+
+    def __init__(
+        self,
+        pipeline: BaseAgent,
+        publish: Callable[[str, str], Awaitable[str]],
+        concurrency: int | None = None,
+        max_attempts: int | None = None,
+        rate_limit: float | None = None,
+        retry_backoff: float | None = None,
+    ):
+        self.publish = publish
+        self.concurrency = concurrency or int(
+            os.environ.get("SWOT_BATCH_CONCURRENCY", 4)
+        )
+        self.max_attempts = max_attempts or int(
+            os.environ.get("SWOT_BATCH_MAX_ATTEMPTS", 3)
+        )
+        if rate_limit is None:
+            rate_limit = float(os.environ.get("SWOT_BATCH_RATE_LIMIT", 2))
+        if retry_backoff is None:
+            retry_backoff = float(os.environ.get("SWOT_BATCH_RETRY_BACKOFF", 2))
+        self.retry_backoff = retry_backoff
+        self._limiter = RateLimiter(rate_limit)
+        self._runner = InMemoryRunner(agent=pipeline, app_name="swot_batch")
+
+    async def analyze(self, company: str) -> str:
+        """Run the research and writing stages for one company."""
+        sessions = self._runner.session_service
+        session = await sessions.create_session(
+            app_name="swot_batch", user_id="batch", state={"company_name": company}
+        )
+        session_id = session.id
+        message = types.Content(role="user", parts=[types.Part.from_text(text=company)])
+        try:
+            async for _ in self._runner.run_async(
+                user_id="batch", session_id=session_id, new_message=message
+            ):
+                pass
+            finished = await sessions.get_session(
+                app_name="swot_batch", user_id="batch", session_id=session_id
+            )
+            text = finished.state.get(ANALYSIS_OUTPUT_KEY) if finished else None
+        finally:
+            await sessions.delete_session(
+                app_name="swot_batch", user_id="batch", session_id=session_id
+            )
+        if not text:
+            raise RuntimeError(f"No SWOT analysis was written for {company!r}")
+        return text
+
+    async def _process(
+        self, index: int, company: str, slots: asyncio.Semaphore
+    ) -> BatchResult:
+        start = time.perf_counter()
+        text = error = None
+        for attempt in range(1, self.max_attempts + 1):
+            async with slots:
+                await self._limiter.acquire()
+                try:
+                    if text is None:
+                        text = await self.analyze(company)
+                    url = await self.publish(company, text)
+                    return BatchResult(
+                        index, company, "ok", url, attempt, time.perf_counter() - start
+                    )
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    logging.warning(
+                        f"SWOT batch: {company!r} attempt {attempt} failed: {error}"
+                    )
+            if attempt < self.max_attempts:
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+        return BatchResult(
+            index,
+            company,
+            "failed",
+            None,
+            self.max_attempts,
+            time.perf_counter() - start,
+            error,
+        )
+
+    async def run(self, companies: Iterable[str]) -> AsyncIterator[BatchResult]:
+        """Yield one result per company as soon as it finishes."""
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.create_task(self._process(index, company, slots))
+            for index, company in enumerate(companies)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def read_companies(lines: Iterable[str]) -> list[str]:
+    """Company names, one per line; blank lines and `#` comments are skipped."""
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+async def write_manifest(batch: SwotBatch, companies: list[str], out: IO[str]) -> int:
+    """Stream the batch results to `out` as JSONL; returns the failure count."""
+    failed = 0
+    async for result in batch.run(companies):
+        failed += result.status != "ok"
+        out.write(json.dumps(result.to_manifest()) + "\n")
+        out.flush()
+    return failed
+
+
+@click.command()
+@click.argument("companies_file", type=click.File("r"))
+@click.option(
+    "--output",
+    "-o",
+    type=click.File("w"),
+    default="-",
+    help="JSONL manifest file (default: stdout).",
+)
+@click.option("--concurrency", type=int, help="Companies processed at once.")
+@click.option("--max-attempts", type=int, help="Tries per company.")
+@click.option("--rate-limit", type=float, help="Max attempts started per second.")
+def main(
+    companies_file: IO[str],
+    output: IO[str],
+    concurrency: int | None,
+    max_attempts: int | None,
+    rate_limit: float | None,
+) -> None:
+    """Analyze the companies listed in COMPANIES_FILE and write a manifest."""
+    from app.app_utils.publish import publish_swot_pdf
+
+    logging.basicConfig(level=logging.INFO)
+    companies = read_companies(companies_file)
+    batch = SwotBatch(
+        default_batch_pipeline(),
+        publish_swot_pdf,
+        concurrency=concurrency,
+        max_attempts=max_attempts,
+        rate_limit=rate_limit,
+    )
+    failed = asyncio.run(write_manifest(batch, companies, output))
+    logging.info(f"SWOT batch: {len(companies) - failed}/{len(companies)} succeeded")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from collections.abc import Callable
+from typing import Any
+
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm
+from google.adk.tools import AgentTool, BaseTool, FunctionTool, ToolContext
+
+from app.app_utils.analysis_store import resolve_analysis
+
+PDF_TOOL_MODES = ("direct", "agent")
+
+
+async def generate_and_upload_swot_pdf(
+    company_name: str, analysis_key: str, tool_context: ToolContext
+) -> str:
+    """Generates a PDF document of the SWOT analysis and uploads it to GCS.
+
+    The analysis is read from session state by key instead of being passed as
+    text. Rendering runs in a worker process that streams the PDF into a
+    chunked upload, so the event loop keeps serving other sessions while the
+    PDF is produced.
+
+    Args:
+        company_name (str): The name of the company for which the SWOT analysis was performed.
+        analysis_key (str): The key under which the presented SWOT analysis was saved.
+        tool_context (ToolContext): The tool context object.
+
+    Returns:
+        str: The public URL of the uploaded PDF file.
+    """
+    # ReportLab and gcsfs load on the first PDF request, not at startup.
+    from app.app_utils.publish import publish_swot_pdf
+    from app.app_utils.render_service import RenderQueueFullError
+
+    swot_analysis_text = resolve_analysis(tool_context.state, analysis_key)
+    if swot_analysis_text is None:
+        tool_context.state["error"] = f"No SWOT analysis stored under {analysis_key!r}"
+        return f"Error generating PDF: no SWOT analysis stored under {analysis_key!r}"
+
+    try:
+        return await publish_swot_pdf(company_name, swot_analysis_text)
+    except RenderQueueFullError as e:
+        tool_context.state["error"] = f"Failed to render PDF: {e}"
+        return f"Error generating PDF: {e}"
+    except Exception as e:
+        tool_context.state["error"] = f"Failed to upload PDF to GCS: {e}"
+        return f"Error uploading PDF: {e}"
+
+
+def build_pdf_tool(
+    pdf_function: Callable[..., Any],
+    model: str | BaseLlm,
+    mode: str | None = None,
+) -> BaseTool:
+    """Build the tool the root agent calls to produce the PDF.
+
+    `direct` (default) exposes `pdf_function` to the root agent as a
+    FunctionTool. `agent` wraps it in the `pdf_generator_agent` sub-agent,
+    which costs an extra model round trip that re-sends the whole analysis.
+    The mode comes from `PDF_TOOL_MODE` when not given.
+    """
+    mode = mode or os.environ.get("PDF_TOOL_MODE", "direct")
+    if mode == "direct":
+        return FunctionTool(pdf_function)
+    if mode == "agent":
+        pdf_generator_agent = Agent(
+            name="pdf_generator_agent",
+            model=model,
+            instruction="You are a PDF Generator tool which also uploads PDFs "
+            "to a Google Cloud Storage Bucket",
+            tools=[pdf_function],
+        )
+        return AgentTool(pdf_generator_agent)
+    raise ValueError(f"PDF_TOOL_MODE must be one of {PDF_TOOL_MODES}, got {mode!r}")
@@ -0,0 +1,190 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import weakref
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from typing import Any
+
+from google.adk.agents import (
+    BaseAgent,
+    LlmAgent,
+    ParallelAgent,
+    SequentialAgent,
+)
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import BaseLlm
+from google.genai import types
+
+
+@dataclass(frozen=True)
+class ResearchTopic:
+    """One independent research question of the SWOT research stage."""
+
+    key: str
+    title: str
+    focus: str
+
+    @property
+    def output_key(self) -> str:
+        return f"research_{self.key}"
+
+
+SWOT_TOPICS = (
+    ResearchTopic(
+        "strengths",
+        "Strengths",
+        "internal strengths: competitive advantages, assets, brand and capabilities",
+    ),
+    ResearchTopic(
+        "weaknesses",
+        "Weaknesses",
+        "internal weaknesses: gaps, liabilities, costs and operational issues",
+    ),
+    ResearchTopic(
+        "opportunities",
+        "Opportunities",
+        "external opportunities: market trends, expansion areas and partnerships",
+    ),
+    ResearchTopic(
+        "threats",
+        "Threats",
+        "external threats: competition, regulation and macroeconomic risks",
+    ),
+)
+
+EXTRA_TOPICS = {
+    "competitors": ResearchTopic(
+        "competitors",
+        "Competitors",
+        "main competitors and how the company compares to them",
+    ),
+    "news": ResearchTopic(
+        "news",
+        "Recent News",
+        "the most important news about the company from the last 12 months",
+    ),
+}
+
+
+class ConcurrencyLimit:
+    """Caps how many researchers of one stage run at once per invocation.
+
+    Each invocation gets its own semaphore, which is dropped once no
+    researcher of that invocation holds or waits for it.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._semaphores: weakref.WeakValueDictionary[str, asyncio.Semaphore] = (
+            weakref.WeakValueDictionary()
+        )
+
+    def semaphore(self, invocation_id: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(invocation_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limit)
+            self._semaphores[invocation_id] = semaphore
+        return semaphore
+
+
+class ResearchAgent(LlmAgent):
+    """Researcher that waits for a slot of its stage's `ConcurrencyLimit`."""
+
+    limit: ConcurrencyLimit
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        async with self.limit.semaphore(ctx.invocation_id):
+            async for event in super()._run_async_impl(ctx):
+                yield event
+
+
+class ResearchMergeAgent(BaseAgent):
+    """Merges the per-topic research from session state into one context."""
+
+    topics: list[ResearchTopic]
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        merged = "\n\n".join(
+            f"## {topic.title}\n{ctx.session.state.get(topic.output_key, '')}"
+            for topic in self.topics
+        )
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=merged)]),
+            actions=EventActions(state_delta={"swot_research": merged}),
+        )
+
+
+def build_research_stage(
+    model: str | BaseLlm,
+    tools: list[Any],
+    concurrency: int | None = None,
+    extra_topics: list[str] | None = None,
+    name: str = "swot_research_agent",
+) -> SequentialAgent:
+    """Build the research stage that fans out one agent per SWOT topic.
+
+    All topics start in parallel, and at most `concurrency` of them
+    (`SWOT_RESEARCH_CONCURRENCY`, default: all topics) research at a time; a
+    concurrency of 1 reproduces the sequential flow. `extra_topics` adds
+    optional topics from `EXTRA_TOPICS` (`SWOT_RESEARCH_EXTRA_TOPICS`,
+    comma-separated). The merged research is returned as the final response
+    and stored in the `swot_research` state key.
+    """
+    if extra_topics is None:
+        extra_topics = [
+            topic
+            for topic in os.environ.get("SWOT_RESEARCH_EXTRA_TOPICS", "").split(",")
+            if topic.strip()
+        ]
+    topics = [*SWOT_TOPICS, *(EXTRA_TOPICS[t.strip()] for t in extra_topics)]
+    limit = ConcurrencyLimit(
+        concurrency or int(os.environ.get("SWOT_RESEARCH_CONCURRENCY", len(topics)))
+    )
+
+    researchers: list[BaseAgent] = [
+        ResearchAgent(
+            name=f"{topic.key}_researcher",
+            model=model,
+            instruction=(
+                "You are a senior business analyst. Research the "
+                f"{topic.focus} of the company named in the request. Use the "
+                "search tool, keep the findings concise and factual, and "
+                "include reference links."
+            ),
+            tools=tools,
+            output_key=topic.output_key,
+            limit=limit,
+        )
+        for topic in topics
+    ]
+    return SequentialAgent(
+        name=name,
+        description="Researches the Strengths, Weaknesses, Opportunities and "
+        "Threats of a company in parallel. The request is the company name.",
+        sub_agents=[
+            ParallelAgent(name=f"{name}_topics", sub_agents=researchers),
+            ResearchMergeAgent(name=f"{name}_merge", topics=topics),
+        ],
+    )
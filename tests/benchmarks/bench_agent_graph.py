@@ -0,0 +1,99 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark: the full root_agent -> sub-agent -> tool graph from a cassette.
+
+Replays recorded Gemini exchanges (including Google Search grounding) through
+the real `app.agent.root_agent`, so orchestration, callbacks and the PDF
+pipeline run as deployed while the model is served locally. PDFs are
+rendered in-process and written to an in-memory filesystem.
+
+Record the cassette once with credentials:
+    MODEL_BACKEND=record uv run python -m tests.benchmarks.bench_agent_graph
+
+Then replay it anywhere, optionally overriding the recorded latency:
+    MODEL_REPLAY_LATENCY=0.2 uv run python -m tests.benchmarks.bench_agent_graph
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import Callable
+from typing import cast
+
+import fsspec
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.app_utils import publish
+from app.app_utils.render_service import PdfRenderService
+from app.app_utils.storage import StoragePool
+from tests.fakes import InlineRenderService, MemoryStoragePool
+
+TURNS = ("Analyze Acme Corp", "Yes, create the PDF")
+
+
+def offline_publish() -> None:
+    """Route PDF uploads to the memory filesystem, rendering in-process."""
+    memory_fs = fsspec.filesystem("memory")
+    publish.get_storage_pool = lambda: cast(StoragePool, MemoryStoragePool(memory_fs))
+    publish.get_render_service = cast(
+        Callable[[], PdfRenderService], InlineRenderService
+    )
+    publish.get_pdf_cache = lambda: None
+
+
+async def run_session(runner: InMemoryRunner) -> tuple[list[float], int]:
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="bench"
+    )
+    turn_times, tokens = [], 0
+    for text in TURNS:
+        message = types.Content(role="user", parts=[types.Part.from_text(text=text)])
+        start = time.perf_counter()
+        async for event in runner.run_async(
+            user_id="bench", session_id=session.id, new_message=message
+        ):
+            if event.usage_metadata and event.usage_metadata.total_token_count:
+                tokens += event.usage_metadata.total_token_count
+        turn_times.append(time.perf_counter() - start)
+    return turn_times, tokens
+
+
+async def main(sessions: int) -> None:
+    os.environ.setdefault("MODEL_BACKEND", "replay")
+    offline_publish()
+    from app.agent import root_agent  # Reads MODEL_BACKEND at import.
+
+    runner = InMemoryRunner(agent=root_agent, app_name="bench")
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_session(runner) for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{os.environ['MODEL_BACKEND']}: {sessions} sessions in {elapsed:.2f} s")
+    for i, text in enumerate(TURNS):
+        times = [turn_times[i] for turn_times, _ in results]
+        print(
+            f"{text!r:>24}: median {statistics.median(times) * 1000:8.1f} ms  "
+            f"max {max(times) * 1000:8.1f} ms"
+        )
+    print(f"tokens per session: {statistics.mean(t for _, t in results):.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=1)
+    asyncio.run(main(parser.parse_args().sessions))
@@ -0,0 +1,167 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark: per-request overhead of GenAI completion telemetry upload.
+
+Concurrent requests each make a series of stubbed model calls and report
+every completion to a completion hook, as the google-genai instrumentation
+does. Compares telemetry off, the stock hook's pattern (three JSON objects
+per completion, uploaded from a thread pool), and the batched uploader at
+full and reduced head sampling. Storage is an in-memory filesystem that
+takes a fixed time per object write, standing in for GCS.
+
+Run with:
+    uv run python -m tests.benchmarks.bench_genai_telemetry
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import fsspec
+
+from app.app_utils.genai_telemetry import BatchedCompletionUploader
+from tests.fakes import swot_markdown
+
+REQUESTS = 200
+CONCURRENCY = 20
+CALLS_PER_REQUEST = 8
+MODEL_LATENCY = 0.02
+WRITE_LATENCY = 0.03
+
+
+@dataclass
+class Text:
+    content: str
+    type: str = "text"
+
+
+@dataclass
+class Message:
+    role: str
+    parts: list[Text] = field(default_factory=list)
+    finish_reason: str = "stop"
+
+
+class SlowStorage:
+    """In-memory filesystem where every object write takes `latency` seconds."""
+
+    def __init__(self, latency: float) -> None:
+        self.fs = fsspec.filesystem("memory")
+        self.latency = latency
+        self.objects = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open(self, path: str, mode: str = "w") -> Iterator[Any]:
+        with self.fs.open(path, mode) as f:
+            yield f
+        time.sleep(self.latency)
+        with self._lock:
+            self.objects += 1
+
+    def unstrip_protocol(self, path: str) -> str:
+        return self.fs.unstrip_protocol(path)
+
+
+class PerCompletionUploader:
+    """The stock `upload` hook's pattern: three objects per completion."""
+
+    def __init__(self, storage: SlowStorage, base_path: str) -> None:
+        self.storage = storage
+        self.base_path = base_path
+        self._executor = ThreadPoolExecutor(20)
+
+    def on_completion(self, **completion: Any) -> None:
+        name = uuid.uuid4().hex
+        for key in ("inputs", "outputs", "system_instruction"):
+            self._executor.submit(
+                self._upload, f"{self.base_path}/{name}_{key}.json", completion[key]
+            )
+
+    def _upload(self, path: str, messages: list[Any]) -> None:
+        with self.storage.open(path) as f:
+            f.write(json.dumps([asdict(m) for m in messages]))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+async def request(hook: Any, analysis: str) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS_PER_REQUEST):
+        await asyncio.sleep(MODEL_LATENCY)
+        if hook is not None:
+            hook.on_completion(
+                inputs=[Message("user", [Text("Analyze Acme")])],
+                outputs=[Message("assistant", [Text(analysis)])],
+                system_instruction=[Text("You are a SWOT analysis agent.")],
+                span=None,
+            )
+    return time.perf_counter() - start
+
+
+async def run(hook: Any) -> tuple[float, float]:
+    analysis = swot_markdown(10)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def limited() -> float:
+        async with semaphore:
+            return await request(hook, analysis)
+
+    cpu = time.process_time()
+    latencies = await asyncio.gather(*(limited() for _ in range(REQUESTS)))
+    if hook is not None:
+        hook.close()
+    cpu_per_request = (time.process_time() - cpu) / REQUESTS
+    return sum(latencies) / len(latencies), cpu_per_request
+
+
+def main() -> None:
+    print(
+        f"{REQUESTS} requests x {CALLS_PER_REQUEST} model calls, "
+        f"{WRITE_LATENCY * 1000:.0f} ms per object write"
+    )
+    modes: dict[str, Any] = {
+        "off": lambda storage: None,
+        "per-completion": lambda storage: PerCompletionUploader(storage, "/stock"),
+        "batched": lambda storage: BatchedCompletionUploader(
+            "/batched", fs=storage, batch_size=100
+        ),
+        "batched 10%": lambda storage: BatchedCompletionUploader(
+            "/sampled", fs=storage, batch_size=100, head_sample_rate=0.1
+        ),
+    }
+    baseline = None
+    for name, build in modes.items():
+        storage = SlowStorage(WRITE_LATENCY)
+        latency, cpu = asyncio.run(run(build(storage)))
+        baseline = baseline or (latency, cpu)
+        print(
+            f"{name:>15}: {latency * 1000:7.1f} ms/request "
+            f"(+{(latency - baseline[0]) * 1000:5.1f})  "
+            f"{cpu * 1000:6.2f} ms CPU/request (+{(cpu - baseline[1]) * 1000:5.2f})  "
+            f"{storage.objects:5d} objects"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark: Markdown compiler vs. the previous line-by-line parser.
+
+Reports story build time, flowable count and full PDF render time for
+generated SWOT documents of 1k-50k lines. "plain" documents have no inline
+markup, so both parsers produce the same text; "rich" documents add bold,
+links and `&`, which the old parser left as raw Markdown. Neither contains a
+raw `<`, which breaks the old parser outright.
+
+For rich documents the "line+markup" row runs the old parser over the same
+inline markup the compiler produces, so it renders the same bold text and link
+annotations; the plain "line parser" row renders less, and writing link
+annotations alone makes up most of its lead in render time.
+
+Run with:
+    uv run python -m tests.benchmarks.bench_markdown
+"""
+
+import time
+from collections.abc import Callable, Iterable
+from io import BytesIO
+from typing import Any
+
+from reportlab.platypus import Paragraph
+
+from app.app_utils.markdown import inline_markup, markdown_story
+from app.app_utils.pdf import SWOT_TEMPLATE, get_template_engine
+from app.app_utils.pdf_templates import CompiledTemplate
+
+SECTIONS = ("Strengths", "Weaknesses", "Opportunities", "Threats")
+
+StoryBuilder = Callable[[CompiledTemplate, str], Iterable[Any]]
+
+
+def legacy_swot_story(template: CompiledTemplate, swot_analysis_text: str) -> list[Any]:
+    """The one-Paragraph-per-line parser the compiler replaced."""
+    story: list[Any] = []
+    for line in swot_analysis_text.split("\n"):
+        if line.startswith("### "):
+            story.append(Paragraph(line[4:].strip(), template.heading_style))
+        elif line.startswith("* "):
+            story.append(Paragraph(f"• {line[2:].strip()}", template.body_style))
+        elif line.strip():
+            story.append(Paragraph(line.strip(), template.body_style))
+    return story
+
+
+def legacy_markup_story(
+    template: CompiledTemplate, swot_analysis_text: str
+) -> list[Any]:
+    """The old parser, emitting the markup the compiler renders."""
+    story: list[Any] = []
+    for line in swot_analysis_text.split("\n"):
+        if line.startswith("### "):
+            text = inline_markup(line[4:].strip())
+            story.append(Paragraph(text, template.heading_style))
+        elif line.startswith("* "):
+            text = inline_markup(line[2:].strip())
+            story.append(Paragraph(f"• {text}", template.body_style))
+        elif line.strip():
+            story.append(Paragraph(inline_markup(line.strip()), template.body_style))
+    return story
+
+
+def swot_document(lines: int, rich: bool = True) -> str:
+    out: list[str] = []
+    while len(out) < lines:
+        section = SECTIONS[len(out) // 50 % len(SECTIONS)]
+        out.append(f"### {section}")
+        out.extend(
+            f"* **{section} {i}**: R&D and M&A notes, see "
+            f"[source](https://example.com/{i}?a=1&b=2)"
+            if rich
+            else f"* {section} {i}: research and development notes"
+            for i in range(30)
+        )
+        out.extend(
+            f"Summary sentence {i} about the {section.lower()} of the company."
+            for i in range(18)
+        )
+        out.append("")
+    return "\n".join(out[:lines])
+
+
+def measure(
+    story_builder: StoryBuilder,
+    template: CompiledTemplate,
+    text: str,
+) -> tuple[float, int, float]:
+    start = time.perf_counter()
+    story = list(story_builder(template, text))
+    built = time.perf_counter() - start
+    count = len(story)
+    start = time.perf_counter()
+    template.build(BytesIO(), story)
+    return built, count, time.perf_counter() - start
+
+
+def main() -> None:
+    template = get_template_engine().get(SWOT_TEMPLATE.name)
+    for lines in (1_000, 10_000, 50_000):
+        for kind, rich in (("plain", False), ("rich", True)):
+            text = swot_document(lines, rich)
+            story_builders: list[tuple[str, StoryBuilder]] = [
+                ("line parser", legacy_swot_story)
+            ]
+            if rich:
+                story_builders.append(("line+markup", legacy_markup_story))
+            story_builders.append(("compiler", markdown_story))
+            for name, story_builder in story_builders:
+                built, count, rendered = measure(story_builder, template, text)
+                print(
+                    f"{lines:6d} lines {kind:>5}, {name:>11}: "
+                    f"build {built * 1000:8.1f} ms  {count:6d} flowables  "
+                    f"render {rendered:6.2f} s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Micro-benchmark: compiled template engine vs. rebuilding styles per render.
+
+Renders alternate between the two paths so that drift in machine load hits
+both alike; `test_template_engine_beats_legacy` fails when the template
+engine is not the faster one.
+
+Run with:
+    uv run python -m tests.benchmarks.bench_pdf_templates
+"""
+
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from io import BytesIO
+from typing import Any
+
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from app.app_utils.pdf import render_swot_pdf
+
+SWOT_TEXT = "\n".join(
+    f"### {section}\n" + "\n".join(f"* {section} point {i}" for i in range(5))
+    for section in ("Strengths", "Weaknesses", "Opportunities", "Threats")
+)
+
+
+def legacy_render_swot_pdf(swot_analysis_text: str, company_name: str) -> bytes:
+    """The per-call style rebuilding path the template engine replaced."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        "TitleStyle", parent=styles["h1"], alignment=TA_CENTER, spaceAfter=14
+    )
+    heading_style = ParagraphStyle(
+        "HeadingStyle", parent=styles["h2"], spaceBefore=12, spaceAfter=6
+    )
+    story: list[Any] = [
+        Paragraph(f"SWOT Analysis for {company_name}", title_style),
+        Spacer(1, 0.2 * 0.4 * letter[1]),
+    ]
+    for line in swot_analysis_text.split("\n"):
+        if line.startswith("### "):
+            story.append(Paragraph(line[4:].strip(), heading_style))
+        elif line.startswith("* "):
+            story.append(Paragraph(f"• {line[2:].strip()}", styles["Normal"]))
+        elif line.strip():
+            story.append(Paragraph(line.strip(), styles["Normal"]))
+    doc.build(story)
+    pdf_content = buffer.getvalue()
+    buffer.close()
+    return pdf_content
+
+
+RENDERS: dict[str, Callable[[str, str], bytes]] = {
+    "legacy": legacy_render_swot_pdf,
+    "template_engine": render_swot_pdf,
+}
+
+
+def render_times(rounds: int) -> dict[str, list[float]]:
+    """Seconds per render of each path in `RENDERS`, rendered alternately."""
+    for render in RENDERS.values():
+        render(SWOT_TEXT, "Warmup")
+    timings: dict[str, list[float]] = {name: [] for name in RENDERS}
+    for _ in range(rounds):
+        for name, render in RENDERS.items():
+            start = time.perf_counter()
+            render(SWOT_TEXT, "Acme Corp")
+            timings[name].append(time.perf_counter() - start)
+    return timings
+
+
+def memory(render: Callable[[str, str], bytes]) -> dict[str, float]:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    render(SWOT_TEXT, "Acme Corp")
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(
+        stat.size_diff
+        for stat in after.compare_to(before, "filename")
+        if stat.size_diff > 0
+    )
+    return {"peak_kib": peak / 1024, "retained_kib": allocated / 1024}
+
+
+def main(rounds: int = 50) -> None:
+    timings = render_times(rounds)
+    for name, render in RENDERS.items():
+        result = memory(render)
+        print(
+            f"{name:>16}: {statistics.median(timings[name]) * 1000:8.2f} ms/render "
+            f"(best {min(timings[name]) * 1000:6.2f})  "
+            f"peak {result['peak_kib']:8.1f} KiB  "
+            f"retained {result['retained_kib']:8.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
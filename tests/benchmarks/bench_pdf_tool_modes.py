@@ -0,0 +1,127 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark: cost of the "make the PDF" turn per PDF tool topology.
+
+Compares the direct FunctionTool with the pdf_generator_agent sub-agent hop,
+and passing the analysis by value (as tool-call text) with passing it by
+reference (a session-state key). A stubbed model with a fixed per-call
+latency scripts the conversation and estimates token usage from
+request/response sizes.
+
+Run with:
+    uv run python -m tests.benchmarks.bench_pdf_tool_modes
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from google.adk.agents import Agent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from app.app_utils.analysis_store import resolve_analysis, store_analysis
+from app.pdf_tool import PDF_TOOL_MODES, build_pdf_tool
+from tests.fakes import (
+    StubLlm,
+    pdf_request_script,
+    swot_markdown,
+    swot_research_agent,
+)
+
+MODEL_LATENCY = 0.3
+PDF_URL = "https://storage.cloud.google.com/bucket/x.pdf"
+
+
+def pdf_function(by_reference: bool) -> Callable[..., Any]:
+    if by_reference:
+
+        async def generate_and_upload_swot_pdf(
+            company_name: str, analysis_key: str, tool_context: ToolContext
+        ) -> str:
+            resolve_analysis(tool_context.state, analysis_key)
+            return PDF_URL
+
+    else:
+
+        async def generate_and_upload_swot_pdf(
+            swot_analysis_text: str, company_name: str, tool_context: ToolContext
+        ) -> str:
+            return PDF_URL
+
+    return generate_and_upload_swot_pdf
+
+
+async def send(runner: InMemoryRunner, session_id: str, text: str) -> None:
+    message = types.Content(role="user", parts=[types.Part.from_text(text=text)])
+    async for _ in runner.run_async(
+        user_id="bench", session_id=session_id, new_message=message
+    ):
+        pass
+
+
+async def run_pdf_turn(
+    mode: str, by_reference: bool, analysis: str
+) -> tuple[float, StubLlm]:
+    """Present the analysis, then measure only the PDF request turn."""
+    if by_reference:
+        pdf_args = {"company_name": "Acme", "analysis_key": "swot_analysis_1"}
+    else:
+        pdf_args = {"company_name": "Acme", "swot_analysis_text": analysis}
+    model = StubLlm(
+        latency=MODEL_LATENCY, respond=pdf_request_script(pdf_args, analysis)
+    )
+    root_agent = Agent(
+        name="swot_agent",
+        model=model,
+        tools=[
+            swot_research_agent,
+            build_pdf_tool(pdf_function(by_reference), model=model, mode=mode),
+        ],
+        after_model_callback=store_analysis,
+    )
+    runner = InMemoryRunner(agent=root_agent, app_name="bench")
+    session = await runner.session_service.create_session(
+        app_name="bench", user_id="bench"
+    )
+    await send(runner, session.id, "Analyze Acme")
+    model.calls = model.prompt_tokens = model.output_tokens = 0
+
+    start = time.perf_counter()
+    await send(runner, session.id, "Yes, create the PDF")
+    return time.perf_counter() - start, model
+
+
+async def main() -> None:
+    print(f"stub model latency: {MODEL_LATENCY * 1000:.0f} ms per call")
+    await run_pdf_turn("direct", True, swot_markdown(1))  # Warm up the runner.
+    for bullets in (5, 50):
+        analysis = swot_markdown(bullets)
+        for mode in PDF_TOOL_MODES:
+            for by_reference in (False, True):
+                elapsed, model = await run_pdf_turn(mode, by_reference, analysis)
+                passing = "by ref" if by_reference else "by value"
+                print(
+                    f"{len(analysis):6d} chars, {mode:>6}, {passing:>8}: "
+                    f"{elapsed * 1000:7.1f} ms  {model.calls} model calls  "
+                    f"{model.prompt_tokens:6d} prompt tokens  "
+                    f"{model.output_tokens:6d} output tokens"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
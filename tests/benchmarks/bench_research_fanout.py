@@ -0,0 +1,68 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark: parallel fan-out SWOT research vs. the sequential flow.
+
+Each research hop is served by a stubbed model with a fixed latency, so the
+numbers show orchestration wall-clock time only. Concurrency 1 corresponds to
+the previous one-search-at-a-time flow.
+
+Run with:
+    uv run python -m tests.benchmarks.bench_research_fanout
+"""
+
+import asyncio
+import time
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.research import build_research_stage
+from tests.fakes import StubLlm
+
+MODEL_LATENCY = 0.5
+
+
+async def run_research(concurrency: int, extra_topics: list[str]) -> float:
+    stage = build_research_stage(
+        model=StubLlm(latency=MODEL_LATENCY),
+        tools=[],
+        concurrency=concurrency,
+        extra_topics=extra_topics,
+    )
+    runner = InMemoryRunner(agent=stage, app_name="bench")
+    session = await runner.session_service.create_session(
+        app_name="bench", user_id="bench"
+    )
+    message = types.Content(role="user", parts=[types.Part.from_text(text="Acme")])
+    start = time.perf_counter()
+    async for _ in runner.run_async(
+        user_id="bench", session_id=session.id, new_message=message
+    ):
+        pass
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    print(f"stub model latency: {MODEL_LATENCY * 1000:.0f} ms per hop")
+    for extra_topics in ([], ["competitors", "news"]):
+        topics = 4 + len(extra_topics)
+        for concurrency in sorted({1, 2, topics}):
+            elapsed = await run_research(concurrency, extra_topics)
+            label = "sequential" if concurrency == 1 else f"concurrency {concurrency}"
+            print(f"{topics} topics, {label:>14}: {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
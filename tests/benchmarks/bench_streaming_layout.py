@@ -0,0 +1,89 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Memory benchmark: streaming layout from a generator vs. a materialized story.
+
+Renders synthetic reports of 10/100/1000 pages (sections, findings and a
+cited-sources appendix). "list" builds the whole story first, as
+`SimpleDocTemplate.build(story)` requires; "generator" feeds the same
+flowables lazily to the streaming doc template. Each case runs in a fresh
+process and reports the tracemalloc peak and the process max RSS.
+
+Run with:
+    uv run python -m tests.benchmarks.bench_streaming_layout
+"""
+
+import multiprocessing
+import resource
+import time
+import tracemalloc
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from reportlab.platypus import Paragraph
+
+from app.app_utils.pdf import SWOT_TEMPLATE, get_template_engine
+from app.app_utils.pdf_templates import CompiledTemplate
+
+# Roughly one page of body text per section at the default page size.
+PARAGRAPHS_PER_PAGE = 14
+
+
+def synthetic_report(template: CompiledTemplate, pages: int) -> Iterator[Any]:
+    for page in range(pages):
+        if page == pages * 9 // 10:
+            yield Paragraph("Appendix: Cited Sources", template.heading_style)
+        yield Paragraph(f"Section {page}", template.heading_style)
+        for i in range(PARAGRAPHS_PER_PAGE):
+            yield Paragraph(
+                f"Finding {page}.{i}: revenue grew in R&amp;D heavy segments "
+                f'while <a href="https://example.com/{page}/{i}" color="blue">'
+                "source</a> notes rising costs. " * 2,
+                template.body_style,
+            )
+
+
+class _NullOutput:
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+def run_case(mode: str, pages: int) -> tuple[float, float, float]:
+    template = get_template_engine().get(SWOT_TEMPLATE.name)
+    tracemalloc.start()
+    start = time.perf_counter()
+    story = synthetic_report(template, pages)
+    template.build(_NullOutput(), list(story) if mode == "list" else story)  # type: ignore[arg-type]
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    max_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, peak / 2**20, max_rss_kib / 1024
+
+
+def main() -> None:
+    context = multiprocessing.get_context("spawn")
+    for pages in (10, 100, 1000):
+        for mode in ("list", "generator"):
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                elapsed, peak_mib, rss_mib = pool.submit(run_case, mode, pages).result()
+            print(
+                f"{pages:5d} pages, {mode:>9}: {elapsed:6.2f} s  "
+                f"tracemalloc peak {peak_mib:7.1f} MiB  max RSS {rss_mib:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
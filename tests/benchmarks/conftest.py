@@ -0,0 +1,115 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Fixtures for the offline PDF pipeline benchmarks.
+
+Run with:
+    make benchmark           # check sizes and memory against the stored baselines
+    make benchmark-baseline  # record new ones, and a local timing baseline
+    make benchmark BENCHMARK_COMPARE=0001  # also compare timings against it
+
+Timing baselines depend on the machine, so they are kept in the untracked
+`.benchmarks` directory rather than committed.
+"""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import fsspec
+import pytest
+from fsspec.implementations.memory import MemoryFileSystem
+
+from app.app_utils import publish
+from tests.fakes import InlineRenderService, MemoryStoragePool, swot_markdown
+
+BASELINES = Path(__file__).parent / "baselines" / "pipeline.json"
+# Allowed growth over the recorded value before a metric counts as regressed.
+TOLERANCE = 1.25
+
+# Findings per SWOT section for each input size.
+SWOT_SIZES = {"small": 5, "medium": 50, "large": 200}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--update-baselines",
+        action="store_true",
+        help="Record byte and peak-memory baselines instead of checking them.",
+    )
+
+
+class Baselines:
+    """Stored non-timing metrics (bytes, peak memory) of the benchmark suite.
+
+    Timings are compared by pytest-benchmark itself; these are metrics it
+    does not track.
+    """
+
+    def __init__(self, path: Path, update: bool) -> None:
+        self.path = path
+        self.update = update
+        self.values: dict[str, float] = (
+            json.loads(path.read_text()) if path.exists() else {}
+        )
+
+    def check(self, key: str, value: float) -> None:
+        if self.update:
+            self.values[key] = value
+            return
+        expected = self.values.get(key)
+        assert expected is not None, f"No baseline for {key}; run --update-baselines"
+        assert value <= expected * TOLERANCE, (
+            f"{key} regressed: {value:.0f} > {expected:.0f} * {TOLERANCE}"
+        )
+
+    def save(self) -> None:
+        if self.update:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self.values, indent=2, sort_keys=True))
+
+
+@pytest.fixture(scope="session")
+def baselines(request: pytest.FixtureRequest) -> Iterator[Baselines]:
+    store = Baselines(
+        BASELINES, update=request.config.getoption("--update-baselines", False)
+    )
+    yield store
+    store.save()
+
+
+@pytest.fixture(params=list(SWOT_SIZES))
+def swot_input(request: pytest.FixtureRequest) -> tuple[str, str]:
+    """(size name, generated SWOT Markdown) for each input size."""
+    return request.param, swot_markdown(SWOT_SIZES[request.param])
+
+
+@pytest.fixture
+def memory_fs() -> Iterator[MemoryFileSystem]:
+    fs = fsspec.filesystem("memory")
+    yield fs
+    fs.store.clear()
+
+
+@pytest.fixture
+def offline_storage(
+    monkeypatch: pytest.MonkeyPatch, memory_fs: MemoryFileSystem
+) -> MemoryFileSystem:
+    """Route `publish_swot_pdf` to the memory filesystem, rendering in-process."""
+    monkeypatch.setattr(
+        publish, "get_storage_pool", lambda: MemoryStoragePool(memory_fs)
+    )
+    monkeypatch.setattr(publish, "get_render_service", InlineRenderService)
+    monkeypatch.setattr(publish, "get_pdf_cache", lambda: None)
+    return memory_fs
@@ -0,0 +1,112 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Startup profile: import-time breakdown of the agent entrypoints.
+
+Imports each module in a fresh interpreter with `python -X importtime` and
+reports the total import time, the packages that contribute most and the
+slowest individual modules, so cold-start regressions can be traced to the
+import that caused them.
+
+Run with:
+    uv run python -m tests.benchmarks.startup_profile [module ...]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+DEFAULT_MODULES = ("app.agent_engine_app", "app.agent")
+
+# Packages reported by their first two name segments.
+NAMESPACE_PACKAGES = ("google", "opentelemetry")
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass(frozen=True)
+class ImportProfile:
+    module: str
+    wall_s: float
+    timings: list[ImportTiming]
+
+    @property
+    def total_us(self) -> int:
+        return sum(timing.self_us for timing in self.timings)
+
+    def by_package(self) -> dict[str, int]:
+        packages: dict[str, int] = defaultdict(int)
+        for timing in self.timings:
+            parts = timing.module.split(".")
+            depth = 2 if parts[0] in NAMESPACE_PACKAGES else 1
+            packages[".".join(parts[:depth])] += timing.self_us
+        return dict(packages)
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        timings.append(ImportTiming(module.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def profile_import(module: str) -> ImportProfile:
+    """Import `module` in a fresh interpreter and collect its import timings."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_s = time.perf_counter() - start
+    return ImportProfile(module, wall_s, parse_importtime(result.stderr))
+
+
+def report(profile: ImportProfile, top: int) -> None:
+    print(
+        f"{profile.module}: {profile.total_us / 1e6:.2f} s importing "
+        f"{len(profile.timings)} modules ({profile.wall_s:.2f} s wall)"
+    )
+    print("  by package:")
+    packages = sorted(profile.by_package().items(), key=lambda p: -p[1])
+    for package, us in packages[:top]:
+        print(f"    {us / 1e3:9.1f} ms  {package}")
+    print("  slowest modules (self time):")
+    for timing in sorted(profile.timings, key=lambda t: -t.self_us)[:top]:
+        print(f"    {timing.self_us / 1e3:9.1f} ms  {timing.module}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    for module in args.modules:
+        report(profile_import(module), args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Cold-start benchmarks of the agent entrypoints.
+
+Import time in a fresh interpreter is timed by pytest-benchmark; the number
+of imported modules is checked against `baselines/pipeline.json`, which
+catches a heavy import creeping back into startup on any machine.
+"""
+
+from typing import Any
+
+import pytest
+
+from tests.benchmarks.conftest import Baselines
+from tests.benchmarks.startup_profile import DEFAULT_MODULES, profile_import
+
+ROUNDS = 3
+
+
+@pytest.mark.parametrize("module", DEFAULT_MODULES)
+def test_import(benchmark: Any, module: str, baselines: Baselines) -> None:
+    profile = benchmark.pedantic(profile_import, args=(module,), rounds=ROUNDS)
+
+    benchmark.extra_info.update(
+        modules=len(profile.timings), import_ms=profile.total_us / 1e3
+    )
+    baselines.check(f"cold_start[{module}].modules", len(profile.timings))
@@ -0,0 +1,93 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Offline benchmarks of the PDF render and upload pipeline.
+
+Render time, upload time and the full `generate_and_upload_swot_pdf` call are
+timed separately by pytest-benchmark; PDF size and render peak memory are
+checked against `baselines/pipeline.json`.
+"""
+
+import asyncio
+import tracemalloc
+from typing import Any, cast
+
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+from fsspec.implementations.memory import MemoryFileSystem
+from google.adk.tools import ToolContext
+
+from app.app_utils.analysis_store import LATEST_ANALYSIS_KEY
+from app.app_utils.pdf import render_swot_pdf, upload_pdf
+from app.pdf_tool import generate_and_upload_swot_pdf
+from tests.benchmarks.conftest import Baselines
+from tests.fakes import FakeToolContext
+
+ROUNDS = 5
+
+
+def upload(fs: MemoryFileSystem, full_path: str, pdf: bytes) -> None:
+    asyncio.run(upload_pdf(AsyncFileSystemWrapper(fs), full_path, pdf))
+
+
+def test_render(
+    benchmark: Any, swot_input: tuple[str, str], baselines: Baselines
+) -> None:
+    size, text = swot_input
+    pdf = benchmark.pedantic(
+        render_swot_pdf, args=(text, "Acme"), rounds=ROUNDS, warmup_rounds=1
+    )
+
+    tracemalloc.start()
+    render_swot_pdf(text, "Acme")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    benchmark.extra_info.update(bytes=len(pdf), peak_kib=peak / 1024)
+    assert pdf.startswith(b"%PDF")
+    baselines.check(f"render[{size}].bytes", len(pdf))
+    baselines.check(f"render[{size}].peak_kib", peak / 1024)
+
+
+def test_upload(
+    benchmark: Any, swot_input: tuple[str, str], memory_fs: MemoryFileSystem
+) -> None:
+    _, text = swot_input
+    pdf = render_swot_pdf(text, "Acme")
+    full_path = "/bucket/pdfs/SWOT_Acme.pdf"
+
+    benchmark.pedantic(
+        upload, args=(memory_fs, full_path, pdf), rounds=ROUNDS, warmup_rounds=1
+    )
+
+    benchmark.extra_info["bytes"] = len(pdf)
+    assert memory_fs.cat_file(full_path) == pdf
+
+
+def test_generate_and_upload_swot_pdf(
+    benchmark: Any, swot_input: tuple[str, str], offline_storage: MemoryFileSystem
+) -> None:
+    _, text = swot_input
+    state = {"swot_analysis_1": text, LATEST_ANALYSIS_KEY: "swot_analysis_1"}
+
+    def run() -> str:
+        return asyncio.run(
+            generate_and_upload_swot_pdf(
+                "Acme", "swot_analysis_1", cast(ToolContext, FakeToolContext(state))
+            )
+        )
+
+    url = benchmark.pedantic(run, rounds=ROUNDS, warmup_rounds=1)
+
+    assert url.startswith("https://storage.cloud.google.com/")
+    assert offline_storage.find("/")
@@ -0,0 +1,30 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Guard: the compiled template engine must stay faster than the legacy path.
+"""
+
+from tests.benchmarks.bench_pdf_templates import render_times
+
+ROUNDS = 100
+
+
+def test_template_engine_beats_legacy() -> None:
+    # The fastest of many alternating renders is the least noisy estimate.
+    best = {name: min(times) for name, times in render_times(ROUNDS).items()}
+
+    assert best["template_engine"] < best["legacy"], (
+        f"template engine {best['template_engine'] * 1000:.2f} ms/render is not "
+        f"faster than legacy {best['legacy'] * 1000:.2f} ms/render"
+    )
@@ -0,0 +1,242 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Offline stand-ins shared by unit tests and benchmarks.
+"""
+
+import asyncio
+import re
+from collections.abc import AsyncGenerator, Callable
+from typing import Any, TypeVar
+
+from fsspec import AbstractFileSystem
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+from app.app_utils.analysis_store import RESEARCH_TOOL, estimate_tokens
+
+T = TypeVar("T")
+
+SWOT_SECTIONS = ("Strengths", "Weaknesses", "Opportunities", "Threats")
+
+
+def swot_markdown(bullets: int) -> str:
+    """Generated SWOT analysis with `bullets` findings per section."""
+    return "\n".join(
+        f"### {section}\n"
+        + "\n".join(
+            f"* {section} finding {i} with supporting detail, see "
+            f"[source {i}](https://example.com/{section.lower()}/{i})"
+            for i in range(bullets)
+        )
+        for section in SWOT_SECTIONS
+    )
+
+
+class FakeToolContext:
+    """Stand-in for `ToolContext` exposing only the session `state`."""
+
+    def __init__(self, state: dict[str, Any] | None = None) -> None:
+        self.state = dict(state or {})
+
+
+class MemoryStoragePool:
+    """Stand-in for `StoragePool` serving one in-memory fsspec filesystem."""
+
+    def __init__(self, fs: AbstractFileSystem) -> None:
+        self.fs = fs
+
+    def filesystem(self) -> AbstractFileSystem:
+        return self.fs
+
+    async def async_filesystem(self) -> AsyncFileSystemWrapper:
+        return AsyncFileSystemWrapper(self.fs)
+
+
+class InlineRenderService:
+    """Render service that runs renders and uploads on threads of this process."""
+
+    async def run_render(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.to_thread(fn, *args)
+
+    async def upload(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.to_thread(fn, *args)
+
+
+def swot_research_agent(request: str) -> str:
+    """Research the company for a SWOT analysis."""
+    return swot_markdown(1)
+
+
+def last_user_text(llm_request: LlmRequest) -> str:
+    for content in reversed(llm_request.contents):
+        if content.role == "user" and content.parts:
+            return "".join(part.text or "" for part in content.parts)
+    return ""
+
+
+def request_tokens(llm_request: LlmRequest) -> int:
+    text = str(llm_request.config.system_instruction or "")
+    text += "".join(
+        content.model_dump_json(exclude_none=True) for content in llm_request.contents
+    )
+    return estimate_tokens(text)
+
+
+class StubLlm(BaseLlm):
+    """Model that answers after a fixed delay without any network calls.
+
+    `respond` returns either plain text or a full `Content` (e.g. a function
+    call). Token usage is estimated from the request and response size.
+    """
+
+    model: str = "stub"
+    latency: float = 0.0
+    respond: Callable[[LlmRequest], str | types.Content] = last_user_text
+    calls: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        response = self.respond(llm_request)
+        if isinstance(response, str):
+            response = types.Content(
+                role="model", parts=[types.Part.from_text(text=response)]
+            )
+        prompt_tokens = request_tokens(llm_request)
+        output_tokens = estimate_tokens(response.model_dump_json(exclude_none=True))
+        self.prompt_tokens += prompt_tokens
+        self.output_tokens += output_tokens
+        yield LlmResponse(
+            content=response,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+
+def last_function_response(llm_request: LlmRequest) -> types.FunctionResponse | None:
+    last = llm_request.contents[-1] if llm_request.contents else None
+    return last.parts[0].function_response if last and last.parts else None
+
+
+def has_function_response(llm_request: LlmRequest) -> bool:
+    return last_function_response(llm_request) is not None
+
+
+def pdf_request_script(
+    pdf_args: dict[str, Any], analysis: str = ""
+) -> Callable[[LlmRequest], str | types.Content]:
+    """Script a SWOT conversation: present `analysis`, then make the PDF.
+
+    A user message starting with "Analyze" calls `swot_research_agent` and
+    its result is answered with `analysis`; any other request makes the root
+    agent call whichever PDF tool it was given and the `pdf_generator_agent`
+    sub-agent forward `pdf_args` to the PDF function, so both PDF tool
+    topologies are covered.
+    """
+
+    def respond(llm_request: LlmRequest) -> str | types.Content:
+        response = last_function_response(llm_request)
+        if response is not None:
+            if response.name == RESEARCH_TOOL:
+                return analysis
+            return "Your PDF is ready: https://storage.cloud.google.com/bucket/x.pdf"
+        if last_user_text(llm_request).startswith("Analyze"):
+            name, args = RESEARCH_TOOL, {"request": last_user_text(llm_request)}
+        elif "generate_and_upload_swot_pdf" in llm_request.tools_dict:
+            name, args = "generate_and_upload_swot_pdf", pdf_args
+        else:
+            name = "pdf_generator_agent"
+            args = {"request": f"Create the SWOT PDF for {pdf_args}"}
+        return types.Content(
+            role="model",
+            parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+        )
+
+    return respond
+
+
+def swot_agent_script(
+    bullets: int = 10,
+) -> Callable[[LlmRequest], str | types.Content]:
+    """Script every agent of `app.agent` through a full SWOT conversation.
+
+    The root agent asks for a company on a greeting, calls the research
+    stage for any other first request, presents a `swot_markdown(bullets)`
+    analysis and calls the PDF tool once the user asks for it. Researchers
+    answer with short findings.
+    """
+
+    def call(name: str, **args: Any) -> types.Content:
+        return types.Content(
+            role="model",
+            parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+        )
+
+    def respond(llm_request: LlmRequest) -> str | types.Content:
+        tools = llm_request.tools_dict
+        if "swot_research_agent" not in tools:
+            if "generate_and_upload_swot_pdf" in tools:  # pdf_generator_agent
+                if has_function_response(llm_request):
+                    return "The PDF was uploaded."
+                return call(
+                    "generate_and_upload_swot_pdf",
+                    company_name="Acme",
+                    analysis_key="swot_analysis_1",
+                )
+            return "\n".join(
+                f"* Finding {i} with a source: https://example.com/{i}"
+                for i in range(bullets)
+            )
+
+        response = last_function_response(llm_request)
+        if response is not None:
+            if response.name == "swot_research_agent":
+                return f"{swot_markdown(bullets)}\n\nShall I create a PDF?"
+            return f"Your PDF is ready: {(response.response or {}).get('result')}"
+
+        companies = [
+            part.function_call.args["request"]
+            for content in llm_request.contents
+            for part in content.parts or []
+            if part.function_call
+            and part.function_call.name == "swot_research_agent"
+            and part.function_call.args
+        ]
+        text = last_user_text(llm_request)
+        if not companies:
+            if text.strip(" !.").lower() in ("hi", "hello", "hey"):
+                return "Which company would you like me to analyze?"
+            return call("swot_research_agent", request=text)
+        instruction = str(llm_request.config.system_instruction)
+        key = re.search(r"swot_analysis_\d+", instruction)
+        if "generate_and_upload_swot_pdf" in tools:
+            return call(
+                "generate_and_upload_swot_pdf",
+                company_name=companies[-1],
+                analysis_key=key.group() if key else "",
+            )
+        return call(
+            "pdf_generator_agent", request=f"Create the PDF for {companies[-1]}"
+        )
+
+    return respond
@@ -0,0 +1,393 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Capacity tuner: sweep instance shapes against the local load-test target.
+
+For every combination of `--cpus` and `--concurrency`, starts
+`local_server.py` (stub model, in-memory PDF storage) as one serving
+process pinned to that many CPUs, and keeps `concurrency` SWOT
+conversations in flight against it for `--duration` seconds. Each run
+reports completed conversations per second, p50/p95 conversation latency,
+and the peak memory of the server's process tree (the server and its PDF
+render processes).
+
+The fastest shape per CPU whose p95 stays within `--max-p95` (by default
+1.5x the lowest p95 measured) becomes the recommended `deploy.py` flags:
+`--cpu`, `--memory` (peak memory plus headroom) and
+`--container-concurrency`, plus `--max-instances` for `--target-rps`.
+
+The number of serving processes is not swept: the Agent Engine runtime
+decides how many an instance runs, and `--num-workers` (`NUM_WORKERS`) only
+splits the instance's CPUs between their render pools.
+
+Memory and CPU figures are read from /proc and are only reported on Linux.
+
+Run with:
+    uv run python -m tests.load_test.capacity_tuner \\
+        --cpus 2,4 --concurrency 4,9,16 --model-latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+import aiohttp
+
+from app.app_utils.render_service import available_cpus
+from tests.load_test.local_server import ENGINE_PATH
+from tests.load_test.scenario import SWOT_SCENARIO
+
+# Resource limits Agent Engine accepts for `--cpu` and `--memory` (GiB).
+CPU_OPTIONS = (1, 2, 4, 6, 8)
+MEMORY_OPTIONS = (1, 2, 4, 8, 16, 32)
+MEMORY_HEADROOM = 1.3
+LATENCY_SLACK = 1.5
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+@dataclass
+class Measurement:
+    """Result of one load run against one instance shape."""
+
+    cpus: int
+    concurrency: int
+    completed: int
+    errors: int
+    duration: float
+    p50: float
+    p95: float
+    peak_rss_bytes: int | None = None
+    cpu_seconds: float | None = None
+
+    @property
+    def throughput(self) -> float:
+        """Completed conversations per second."""
+        return self.completed / self.duration
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile; NaN for no values."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class ProcessTreeSampler:
+    """Samples the summed RSS and CPU time of a process and its descendants."""
+
+    def __init__(self, pid: int, interval: float = 0.5) -> None:
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss_bytes: int | None = None
+        self._cpu_start: float | None = None
+        self._cpu_end: float | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _read_stat(pid: int) -> tuple[int, float, int] | None:
+        """(parent pid, CPU seconds, RSS bytes) from /proc/<pid>/stat."""
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # Fields after the parenthesized command name, which may hold spaces.
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            return None
+        cpu = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+        return int(fields[1]), cpu, int(fields[21]) * _PAGE_SIZE
+
+    def sample(self) -> tuple[float, int] | None:
+        """Total CPU seconds and RSS bytes of the tree, or None off Linux."""
+        if not os.path.isdir("/proc"):
+            return None
+        stats: dict[int, tuple[int, float, int]] = {}
+        for entry in os.listdir("/proc"):
+            if entry.isdigit() and (stat := self._read_stat(int(entry))):
+                stats[int(entry)] = stat
+        tree: set[int] = set()
+        frontier = {self.pid}
+        while frontier:
+            tree |= frontier
+            frontier = {
+                pid for pid, (ppid, _, _) in stats.items() if ppid in frontier
+            } - tree
+        members = [stats[pid] for pid in tree if pid in stats]
+        if not members:
+            return None
+        return sum(cpu for _, cpu, _ in members), sum(rss for _, _, rss in members)
+
+    def start(self) -> "ProcessTreeSampler":
+        if sample := self.sample():
+            self._cpu_start = sample[0]
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def cpu_seconds(self) -> float | None:
+        if self._cpu_start is None or self._cpu_end is None:
+            return None
+        return self._cpu_end - self._cpu_start
+
+    def _run(self) -> None:
+        while True:
+            if sample := self.sample():
+                self._cpu_end = sample[0]
+                self.peak_rss_bytes = max(self.peak_rss_bytes or 0, sample[1])
+            if self._stop.wait(self.interval):
+                return
+
+
+async def stream_turn(
+    session: aiohttp.ClientSession, base_url: str, session_id: str, message: str
+) -> None:
+    data = {
+        "class_method": "async_stream_query",
+        "input": {"user_id": "tuner", "session_id": session_id, "message": message},
+    }
+    async with session.post(
+        f"{base_url}{ENGINE_PATH}:streamQuery", json=data
+    ) as response:
+        response.raise_for_status()
+        async for line in response.content:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            # Tools report failures through the session state.
+            error = event.get("actions", {}).get("state_delta", {}).get("error")
+            if event.get("code", 0) >= 400 or error:
+                raise RuntimeError(error or event.get("message", "Unknown error"))
+
+
+async def conversation(session: aiohttp.ClientSession, base_url: str) -> None:
+    """One SWOT conversation in a new session."""
+    data = {"class_method": "async_create_session", "input": {"user_id": "tuner"}}
+    async with session.post(f"{base_url}{ENGINE_PATH}:query", json=data) as response:
+        response.raise_for_status()
+        session_id = (await response.json())["output"]["id"]
+    for _, message in SWOT_SCENARIO:
+        await stream_turn(session, base_url, session_id, message)
+
+
+async def run_load(
+    base_url: str, concurrency: int, duration: float
+) -> tuple[list[float], int, float]:
+    """Keep `concurrency` conversations in flight for `duration` seconds.
+
+    Returns the latencies of completed conversations, the error count and
+    the elapsed time.
+    """
+    latencies: list[float] = []
+    errors = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=600)
+
+    async def client() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            began = time.perf_counter()
+            try:
+                await conversation(session, base_url)
+            except (aiohttp.ClientError, RuntimeError, KeyError, ValueError):
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - began)
+
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def wait_ready(base_url: str, timeout: float = 180) -> None:
+    """Wait until the server answers `/healthz` as ready."""
+
+    async def poll() -> None:
+        deadline = time.monotonic() + timeout
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.get(f"{base_url}/healthz") as response:
+                        if (await response.json()).get("ready"):
+                            return
+                except aiohttp.ClientError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{base_url} not ready")
+                await asyncio.sleep(0.5)
+
+    asyncio.run(poll())
+
+
+def measure(args: argparse.Namespace, cpus: int) -> list[Measurement]:
+    """Start the local target in one shape and load it at each concurrency."""
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "tests.load_test.local_server",
+            f"--host={args.host}",
+            f"--port={args.port}",
+            "--workers=1",
+            f"--cpus={cpus}",
+            f"--model-latency={args.model_latency}",
+            f"--bullets={args.bullets}",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://{args.host}:{args.port}"
+    results = []
+    try:
+        wait_ready(base_url)
+        for concurrency in args.concurrency:
+            sampler = ProcessTreeSampler(server.pid).start()
+            latencies, errors, elapsed = asyncio.run(
+                run_load(base_url, concurrency, args.duration)
+            )
+            sampler.stop()
+            result = Measurement(
+                cpus=cpus,
+                concurrency=concurrency,
+                completed=len(latencies),
+                errors=errors,
+                duration=elapsed,
+                p50=percentile(latencies, 0.5),
+                p95=percentile(latencies, 0.95),
+                peak_rss_bytes=sampler.peak_rss_bytes,
+                cpu_seconds=sampler.cpu_seconds,
+            )
+            print(format_row(result), flush=True)
+            results.append(result)
+    finally:
+        server.terminate()
+        server.wait(30)
+    return results
+
+
+def recommend(
+    results: list[Measurement],
+    max_p95: float | None = None,
+    target_rps: float | None = None,
+) -> tuple[Measurement, dict[str, str]] | None:
+    """Pick the shape to deploy and the `deploy.py` flags for it.
+
+    Among error-free runs whose p95 is within `max_p95` (default: the lowest
+    p95 measured times `LATENCY_SLACK`), takes the most conversations per
+    second per CPU, then the most per second. Returns None if no run
+    qualifies.
+    """
+    usable = [r for r in results if r.completed and not r.errors]
+    if not usable:
+        return None
+    budget = max_p95 or LATENCY_SLACK * min(r.p95 for r in usable)
+    candidates = [r for r in usable if r.p95 <= budget]
+    if not candidates:
+        return None
+    best = max(candidates, key=lambda r: (r.throughput / r.cpus, r.throughput))
+    flags = {
+        "cpu": str(next((c for c in CPU_OPTIONS if c >= best.cpus), CPU_OPTIONS[-1]))
+    }
+    if best.peak_rss_bytes is not None:
+        needed = best.peak_rss_bytes * MEMORY_HEADROOM / 2**30
+        memory = next((m for m in MEMORY_OPTIONS if m >= needed), MEMORY_OPTIONS[-1])
+        flags["memory"] = f"{memory}Gi"
+    flags["container-concurrency"] = str(best.concurrency)
+    if target_rps:
+        flags["max-instances"] = str(math.ceil(target_rps / best.throughput))
+    return best, flags
+
+
+def format_row(result: Measurement) -> str:
+    rss = (
+        f"{result.peak_rss_bytes / 2**20:7.0f}"
+        if result.peak_rss_bytes is not None
+        else f"{'n/a':>7}"
+    )
+    cpu = (
+        f"{result.cpu_seconds / result.duration:5.2f}"
+        if result.cpu_seconds is not None
+        else f"{'n/a':>5}"
+    )
+    return (
+        f"{result.cpus:>4} {result.concurrency:>11} "
+        f"{result.throughput:8.3f} {result.p50:7.2f} {result.p95:7.2f} "
+        f"{result.errors:>6} {rss} {cpu}"
+    )
+
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8190)
+    parser.add_argument("--cpus", type=int_list, default=[4])
+    parser.add_argument("--concurrency", type=int_list, default=[4, 9, 16])
+    parser.add_argument(
+        "--duration", type=float, default=30, help="Seconds of load per run"
+    )
+    parser.add_argument(
+        "--model-latency", type=float, default=0.5, help="Stub seconds per call"
+    )
+    parser.add_argument(
+        "--bullets", type=int, default=10, help="Stub findings per SWOT section"
+    )
+    parser.add_argument("--max-p95", type=float, help="p95 latency budget (seconds)")
+    parser.add_argument(
+        "--target-rps", type=float, help="Peak conversations per second to serve"
+    )
+    args = parser.parse_args()
+    if max(args.cpus) > available_cpus():
+        print(f"Warning: only {available_cpus()} CPUs available to pin the server to")
+
+    print(
+        f"{'cpus':>4} {'concurrency':>11} {'conv/s':>8} "
+        f"{'p50 s':>7} {'p95 s':>7} {'errors':>6} {'RSS MiB':>7} {'cores':>5}"
+    )
+    results = []
+    for cpus in args.cpus:
+        results += measure(args, cpus)
+
+    recommendation = recommend(results, args.max_p95, args.target_rps)
+    if recommendation is None:
+        print("\nNo run finished without errors within the latency budget.")
+        return
+    best, flags = recommendation
+    print(
+        f"\nRecommended: {best.cpus} CPUs, "
+        f"{best.concurrency} concurrent requests "
+        f"({best.throughput:.3f} conversations/s, p95 {best.p95:.2f} s)"
+    )
+    deploy_args = " ".join(f"--{name}={value}" for name, value in flags.items())
+    print(f'make deploy DEPLOY_ARGS="{deploy_args}"')
+
+
+if __name__ == "__main__":
+    main()
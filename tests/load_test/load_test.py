@@ -12,12 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import itertools
 import json
 import logging
 import os
 import time
+from typing import Any, cast
+from urllib.parse import urlsplit
 
-from locust import HttpUser, between, task
+import requests
+from locust import HttpUser, between, events, task
+from locust.clients import ResponseContextManager
+
+# locust puts the working directory (the repository root) on sys.path.
+from tests.load_test.scenario import SWOT_SCENARIO
 
 # Configure logging
 logging.basicConfig(
@@ -25,24 +33,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Vertex AI and load agent config
-with open("deployment_metadata.json", encoding="utf-8") as f:
-    remote_agent_engine_id = json.load(f)["remote_agent_engine_id"]
+# A local target (see local_server.py) replaces the deployed Agent Engine.
+LOCAL_AGENT_URL = os.environ.get("LOCAL_AGENT_URL")
 
-parts = remote_agent_engine_id.split("/")
-project_id = parts[1]
-location = parts[3]
-engine_id = parts[5]
+if LOCAL_AGENT_URL:
+    remote_agent_engine_id = "projects/local/locations/local/reasoningEngines/local"
+    base_url = LOCAL_AGENT_URL
+else:
+    # Initialize Vertex AI and load agent config
+    with open("deployment_metadata.json", encoding="utf-8") as f:
+        remote_agent_engine_id = json.load(f)["remote_agent_engine_id"]
+    parts = remote_agent_engine_id.split("/")
+    location = parts[3]
+    # Convert remote agent engine ID to streaming URL.
+    base_url = f"https://{location}-aiplatform.googleapis.com"
 
-# Convert remote agent engine ID to streaming URL.
-base_url = f"https://{location}-aiplatform.googleapis.com"
-url_path = f"/v1/projects/{project_id}/locations/{location}/reasoningEngines/{engine_id}:streamQuery"
+url_path = f"/v1/{remote_agent_engine_id}:streamQuery"
+query_path = f"/v1/{remote_agent_engine_id}:query"
 
 logger.info("Using remote agent engine ID: %s", remote_agent_engine_id)
 logger.info("Using base URL: %s", base_url)
 logger.info("Using URL path: %s", url_path)
 
 
+def request_headers() -> dict[str, str]:
+    headers = {"Content-Type": "application/json"}
+    if not LOCAL_AGENT_URL:
+        headers["Authorization"] = f"Bearer {os.environ['_AUTH_TOKEN']}"
+    return headers
+
+
 class ChatStreamUser(HttpUser):
     """Simulates a user interacting with the chat stream API."""
 
@@ -52,8 +72,7 @@ class ChatStreamUser(HttpUser):
     @task
     def chat_stream(self) -> None:
         """Simulates a chat stream interaction."""
-        headers = {"Content-Type": "application/json"}
-        headers["Authorization"] = f"Bearer {os.environ['_AUTH_TOKEN']}"
+        headers = request_headers()
 
         data = {
             "class_method": "async_stream_query",
@@ -64,14 +83,17 @@ class ChatStreamUser(HttpUser):
         }
 
         start_time = time.time()
-        with self.client.post(
-            url_path,
-            headers=headers,
-            json=data,
-            catch_response=True,
-            name="/streamQuery async_stream_query",
-            stream=True,
-            params={"alt": "sse"},
+        with cast(
+            ResponseContextManager,
+            self.client.post(
+                url_path,
+                headers=headers,
+                json=data,
+                catch_response=True,
+                name="/streamQuery async_stream_query",
+                stream=True,
+                params={"alt": "sse"},
+            ),
         ) as response:
             if response.status_code == 200:
                 events = []
@@ -126,3 +148,138 @@ class ChatStreamUser(HttpUser):
                     )
             else:
                 response.failure(f"Unexpected status code: {response.status_code}")
+
+
+scenario_stats = {"workers": 1, "completed": 0, "start": 0.0}
+
+
+@events.test_start.add_listener
+def on_test_start(environment: Any, **kwargs: Any) -> None:
+    """Look up how many workers the local target runs."""
+    scenario_stats["start"] = time.time()
+    if LOCAL_AGENT_URL:
+        health = requests.get(f"{LOCAL_AGENT_URL}/healthz", timeout=30).json()
+        scenario_stats["workers"] = health["workers"]
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment: Any, **kwargs: Any) -> None:
+    """Report completed SWOT conversations per second and per worker."""
+    elapsed = max(time.time() - scenario_stats["start"], 1e-9)
+    throughput = scenario_stats["completed"] / elapsed
+    logger.info(
+        "SWOT scenarios: %d completed in %.1f s, %.3f/s, %.3f/s per worker (%d)",
+        scenario_stats["completed"],
+        elapsed,
+        throughput,
+        throughput / scenario_stats["workers"],
+        scenario_stats["workers"],
+    )
+
+
+class SwotScenarioUser(HttpUser):
+    """Runs a full SWOT conversation: greeting, company analysis and PDF.
+
+    Each stage reports its time to first event and its total latency.
+    """
+
+    wait_time = between(1, 3)
+    host = base_url
+    user_numbers = itertools.count()
+
+    def on_start(self) -> None:
+        if LOCAL_AGENT_URL:
+            # Local sessions live in one worker's memory; stay on that worker.
+            worker = next(self.user_numbers) % scenario_stats["workers"]
+            url = urlsplit(LOCAL_AGENT_URL)
+            self.client.base_url = (
+                f"{url.scheme}://{url.hostname}:{(url.port or 80) + worker}"
+            )
+
+    @task
+    def swot_conversation(self) -> None:
+        """Simulates one SWOT conversation in a new session."""
+        data = {"class_method": "async_create_session", "input": {"user_id": "test"}}
+        with cast(
+            ResponseContextManager,
+            self.client.post(
+                query_path,
+                headers=request_headers(),
+                json=data,
+                catch_response=True,
+                name="/query async_create_session",
+            ),
+        ) as response:
+            if response.status_code != 200:
+                response.failure(f"Unexpected status code: {response.status_code}")
+                return
+            session_id = response.json()["output"]["id"]
+
+        for stage, message in SWOT_SCENARIO:
+            if not self.stream_turn(stage, session_id, message):
+                return
+        scenario_stats["completed"] += 1
+
+    def stream_turn(self, stage: str, session_id: str, message: str) -> bool:
+        data = {
+            "class_method": "async_stream_query",
+            "input": {"user_id": "test", "session_id": session_id, "message": message},
+        }
+        start_time = time.time()
+        first_event_time = None
+        events_received = 0
+        with cast(
+            ResponseContextManager,
+            self.client.post(
+                url_path,
+                headers=request_headers(),
+                json=data,
+                catch_response=True,
+                name=f"/streamQuery {stage}",
+                stream=True,
+                params={"alt": "sse"},
+            ),
+        ) as response:
+            if response.status_code != 200:
+                response.failure(f"Unexpected status code: {response.status_code}")
+                return False
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                line_str = line.decode("utf-8").removeprefix("data: ")
+                if first_event_time is None:
+                    first_event_time = time.time()
+                events_received += 1
+                try:
+                    event_data = json.loads(line_str)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(event_data, dict):
+                    continue
+                # Tools report failures through the session state.
+                error = (
+                    event_data.get("actions", {}).get("state_delta", {}).get("error")
+                )
+                if event_data.get("code", 0) >= 400 or error:
+                    response.failure(
+                        f"Error in {stage}: "
+                        f"{error or event_data.get('message', 'Unknown error')}"
+                    )
+                    return False
+            if first_event_time is None:
+                response.failure(f"No events in {stage}")
+                return False
+
+        for name, elapsed in (
+            (f"{stage} time to first event", first_event_time - start_time),
+            (f"{stage} complete", time.time() - start_time),
+        ):
+            self.environment.events.request.fire(
+                request_type="SSE",
+                name=name,
+                response_time=elapsed * 1000,
+                response_length=events_received,
+                response=response,
+                context={},
+            )
+        return True
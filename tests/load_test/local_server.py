@@ -0,0 +1,233 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Local load-test target: `AgentEngineApp` behind an SSE HTTP server.
+
+Serves the Agent Engine `:query` and `:streamQuery` endpoints for the real
+agent graph, with a stub model of fixed latency (or a replayed cassette,
+see `app.app_utils.model_backend`) and PDFs uploaded to an in-memory
+filesystem, so load tests run without credentials or deployments.
+
+Each worker is a separate serving process listening on `--port` + its
+index, and `NUM_WORKERS` is set to the worker count so each sizes its PDF
+render pool as it would on an instance with that many serving processes
+(the Agent Engine runtime, not `NUM_WORKERS`, decides how many an instance
+actually runs). Sessions live in worker memory, so clients keep a
+conversation on one worker;
+`GET /healthz` reports the worker count. `--cpus` pins the server to that
+many CPUs, standing in for the instance's `--cpu` limit.
+
+Run with:
+    uv run python -m tests.load_test.local_server --workers 2 --model-latency 0.5
+"""
+
+import argparse
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+from typing import Any, cast
+
+import fsspec
+from aiohttp import web
+
+from app.app_utils.render_service import get_render_service
+from tests.fakes import MemoryStoragePool, StubLlm, swot_agent_script
+
+ENGINE_PATH = "/v1/projects/local/locations/local/reasoningEngines/local"
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLogger:
+    """Stand-in for the Cloud Logging logger used by `register_feedback`."""
+
+    def log_struct(self, info: dict[str, Any], severity: str = "INFO") -> None:
+        logger.info("%s %s", severity, json.dumps(info, default=str))
+
+    def batch(self) -> "LocalLogger":
+        return self
+
+    def commit(self) -> None:
+        pass
+
+
+def build_engine(backend: str, model_latency: float, bullets: int) -> Any:
+    """Set up an `AgentEngineApp` for the app's agent graph without GCP."""
+    import vertexai
+    from google.adk.artifacts import InMemoryArtifactService
+    from google.auth.credentials import AnonymousCredentials
+    from vertexai.agent_engines.templates.adk import AdkApp
+
+    from app.app_utils import model_backend, publish
+    from app.app_utils.storage import StoragePool
+
+    vertexai.init(
+        project="local", location="us-central1", credentials=AnonymousCredentials()
+    )
+    model_backend.register_backend(
+        "stub",
+        lambda model: StubLlm(
+            model=model, latency=model_latency, respond=swot_agent_script(bullets)
+        ),
+    )
+    os.environ["MODEL_BACKEND"] = backend
+    memory_fs = fsspec.filesystem("memory")
+    publish.get_storage_pool = lambda: cast(StoragePool, MemoryStoragePool(memory_fs))
+    publish.get_pdf_cache = lambda: None
+
+    from app.agent import app as adk_app
+    from app.agent_engine_app import AgentEngineApp
+
+    engine = AgentEngineApp(
+        app=adk_app, artifact_service_builder=InMemoryArtifactService
+    )
+    AdkApp.set_up(engine)  # Skips Cloud Logging and telemetry export.
+    engine.logger = LocalLogger()
+    engine.start_feedback_writer()
+    # Storage and model clients need credentials; warm the render workers.
+    os.environ.setdefault("WARMUP_STEPS", "render")
+    engine.warm_up()
+    return engine
+
+
+def build_server(engine: Any, worker: int, workers: int) -> web.Application:
+    modes = {
+        method: mode
+        for mode, methods in engine.register_operations().items()
+        for method in methods
+    }
+
+    def resolve(body: dict[str, Any], allowed: tuple[str, ...]) -> Any:
+        method = body.get("class_method", "")
+        if modes.get(method) not in allowed:
+            raise web.HTTPBadRequest(text=f"Unsupported class_method {method!r}")
+        return getattr(engine, method)
+
+    async def query(request: web.Request) -> web.Response:
+        body = await request.json()
+        output = resolve(body, ("", "async"))(**body.get("input", {}))
+        if inspect.isawaitable(output):
+            output = await output
+        return web.json_response(
+            {"output": output}, dumps=lambda o: json.dumps(o, default=str)
+        )
+
+    async def stream_query(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        method = resolve(body, ("async_stream",))
+        sse = request.query.get("alt") == "sse"
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream" if sse else "application/json"}
+        )
+        await response.prepare(request)
+
+        async def send(payload: dict[str, Any]) -> None:
+            line = json.dumps(payload, default=str)
+            await response.write((f"data: {line}\n\n" if sse else f"{line}\n").encode())
+
+        try:
+            async for event in method(**body.get("input", {})):
+                await send(event)
+        except Exception as e:
+            logger.exception("Stream query failed")
+            await send({"code": 500, "message": str(e)})
+        await response.write_eof()
+        return response
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response(
+            {"worker": worker, "workers": workers, **engine.readiness()}
+        )
+
+    server = web.Application()
+    server.router.add_post(f"{ENGINE_PATH}:query", query)
+    server.router.add_post(f"{ENGINE_PATH}:streamQuery", stream_query)
+    server.router.add_get("/healthz", health)
+    return server
+
+
+def serve(args: argparse.Namespace, worker: int) -> None:
+    logging.basicConfig(level=logging.INFO)
+    engine = build_engine(args.backend, args.model_latency, args.bullets)
+    web.run_app(
+        build_server(engine, worker, args.workers),
+        host=args.host,
+        port=args.port + worker,
+        print=None,
+    )
+    # Stop the render pool so its processes don't block this worker's exit.
+    get_render_service().shutdown()
+
+
+def pin_cpus(cpus: int) -> None:
+    """Restrict this process and the ones it starts to `cpus` CPUs."""
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("CPU pinning is not supported here; --cpus ignored")
+        return
+    available = sorted(os.sched_getaffinity(0))
+    if cpus > len(available):
+        logger.warning("Only %d CPUs available, --cpus=%d", len(available), cpus)
+    os.sched_setaffinity(0, available[:cpus])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("NUM_WORKERS", 1)),
+        help="Worker processes (default: NUM_WORKERS or 1)",
+    )
+    parser.add_argument("--cpus", type=int, help="Pin the server to this many CPUs")
+    parser.add_argument("--backend", choices=("stub", "replay"), default="stub")
+    parser.add_argument(
+        "--model-latency", type=float, default=0.5, help="Stub seconds per call"
+    )
+    parser.add_argument(
+        "--bullets", type=int, default=10, help="Stub findings per SWOT section"
+    )
+    args = parser.parse_args()
+    if args.cpus:
+        pin_cpus(args.cpus)
+    # Worker processes and their render pools size themselves from this.
+    os.environ["NUM_WORKERS"] = str(args.workers)
+    last_port = args.port + args.workers - 1
+    print(f"Serving {ENGINE_PATH} on http://{args.host}:{args.port}-{last_port}")
+    if args.workers == 1:
+        serve(args, 0)
+        return
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=serve, args=(args, worker))
+        for worker in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
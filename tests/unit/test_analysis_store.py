@@ -0,0 +1,114 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.models import LlmRequest
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from app.app_utils.analysis_store import (
+    LATEST_ANALYSIS_KEY,
+    TOKENS_SAVED_KEY,
+    resolve_analysis,
+    store_analysis,
+)
+from app.pdf_tool import build_pdf_tool
+from tests.fakes import (
+    StubLlm,
+    last_user_text,
+    pdf_request_script,
+    swot_research_agent,
+)
+
+ANALYSIS = "### Strengths\n* Brand\n### Weaknesses\n* Cost"
+resolved: list[str | None] = []
+
+
+async def generate_and_upload_swot_pdf(
+    company_name: str, analysis_key: str, tool_context: ToolContext
+) -> str:
+    resolved.append(resolve_analysis(tool_context.state, analysis_key))
+    return "https://storage.cloud.google.com/bucket/x.pdf"
+
+
+async def run_turns(model: StubLlm, *messages: str) -> dict:
+    root_agent = Agent(
+        name="swot_agent",
+        model=model,
+        tools=[
+            swot_research_agent,
+            build_pdf_tool(generate_and_upload_swot_pdf, model=model),
+        ],
+        after_model_callback=store_analysis,
+    )
+    runner = InMemoryRunner(agent=root_agent, app_name="test")
+    session = await runner.session_service.create_session(
+        app_name="test", user_id="user"
+    )
+    for text in messages:
+        message = types.Content(role="user", parts=[types.Part.from_text(text=text)])
+        async for _ in runner.run_async(
+            user_id="user", session_id=session.id, new_message=message
+        ):
+            pass
+    finished = await runner.session_service.get_session(
+        app_name="test", user_id="user", session_id=session.id
+    )
+    assert finished is not None
+    return finished.state
+
+
+@pytest.mark.asyncio
+async def test_pdf_tool_receives_analysis_by_key() -> None:
+    resolved.clear()
+    model = StubLlm(
+        respond=pdf_request_script(
+            {"company_name": "Acme", "analysis_key": "swot_analysis_1"}, ANALYSIS
+        )
+    )
+    state = await run_turns(model, "Analyze Acme", "Make the PDF")
+
+    assert state["swot_analysis_1"] == ANALYSIS
+    assert state[LATEST_ANALYSIS_KEY] == "swot_analysis_1"
+    assert resolved == [ANALYSIS]
+    assert state[TOKENS_SAVED_KEY] > 0
+
+
+@pytest.mark.asyncio
+async def test_only_research_answers_are_stored() -> None:
+    script = pdf_request_script({}, ANALYSIS)
+
+    def respond(llm_request: LlmRequest) -> str | types.Content:
+        if last_user_text(llm_request) == "Help":
+            return "## Help\nName a company to analyze."
+        return script(llm_request)
+
+    state = await run_turns(StubLlm(respond=respond), "Help")
+    assert LATEST_ANALYSIS_KEY not in state
+
+    state = await run_turns(StubLlm(respond=respond), "Analyze Acme", "Help")
+    assert state[LATEST_ANALYSIS_KEY] == "swot_analysis_1"
+    assert state["swot_analysis_1"] == ANALYSIS
+    assert "swot_analysis_2" not in state
+
+
+def test_resolve_missing_key() -> None:
+    state: dict = {}
+    assert resolve_analysis(state, "swot_analysis_9") is None
+    assert TOKENS_SAVED_KEY not in state
+
+    state.update({"swot_analysis_1": ANALYSIS, LATEST_ANALYSIS_KEY: "swot_analysis_1"})
+    assert resolve_analysis(state, "") == ANALYSIS
@@ -0,0 +1,143 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import io
+import json
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from google.adk.events import Event
+from google.adk.models import LlmRequest
+from google.adk.sessions import Session
+
+from app.batch import (
+    RateLimiter,
+    SwotBatch,
+    build_batch_pipeline,
+    read_companies,
+    write_manifest,
+)
+from tests.fakes import StubLlm, last_user_text
+
+written: list[str] = []
+
+
+def write_or_research(llm_request: LlmRequest) -> str:
+    if "Write the SWOT analysis" in str(llm_request.config.system_instruction):
+        written.append(str(llm_request.config.system_instruction))
+        return "### Strengths\n* Brand"
+    return last_user_text(llm_request)
+
+
+class FakePublisher:
+    def __init__(self, failures: dict[str, int] | None = None):
+        self.failures = dict(failures or {})
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, company: str, text: str) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures.get(company, 0):
+                self.failures[company] -= 1
+                raise OSError("upload failed")
+            return f"https://storage.cloud.google.com/bucket/{company}.pdf"
+        finally:
+            self.in_flight -= 1
+
+
+def make_batch(publish: FakePublisher, **kwargs: int) -> SwotBatch:
+    pipeline = build_batch_pipeline(StubLlm(respond=write_or_research), tools=[])
+    return SwotBatch(pipeline, publish, rate_limit=0, retry_backoff=0, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_batch_bounds_concurrency() -> None:
+    written.clear()
+    publish = FakePublisher()
+    companies = [f"Company {i}" for i in range(6)]
+    results = [r async for r in make_batch(publish, concurrency=2).run(companies)]
+
+    assert sorted(r.company for r in results) == companies
+    assert all(r.status == "ok" and r.attempts == 1 for r in results)
+    assert results[0].url and results[0].url.endswith(f"{results[0].company}.pdf")
+    assert publish.max_in_flight == 2
+    assert any("Company 3" in instruction for instruction in written)
+
+
+@pytest.mark.asyncio
+async def test_batch_retries_only_the_failed_step() -> None:
+    written.clear()
+    publish = FakePublisher({"Acme": 1, "Globex": 5})
+    results = {
+        r.company: r
+        async for r in make_batch(publish, max_attempts=3).run(["Acme", "Globex"])
+    }
+
+    assert results["Acme"].status == "ok"
+    assert results["Acme"].attempts == 2
+    assert results["Globex"].status == "failed"
+    assert results["Globex"].attempts == 3
+    assert results["Globex"].error == "OSError: upload failed"
+    assert len(written) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_session_is_reported_as_no_analysis(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    batch = make_batch(FakePublisher())
+    sessions = batch._runner.session_service
+    run_async, get_session = batch._runner.run_async, sessions.get_session
+    finished = False
+
+    async def run_and_expire(**kwargs: Any) -> AsyncGenerator[Event, None]:
+        nonlocal finished
+        async for event in run_async(**kwargs):
+            yield event
+        finished = True
+
+    async def expired_session(**kwargs: Any) -> Session | None:
+        return None if finished else await get_session(**kwargs)
+
+    monkeypatch.setattr(batch._runner, "run_async", run_and_expire)
+    monkeypatch.setattr(sessions, "get_session", expired_session)
+
+    with pytest.raises(RuntimeError, match="No SWOT analysis"):
+        await batch.analyze("Acme")
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_starts() -> None:
+    limiter = RateLimiter(50)
+    start = time.monotonic()
+    await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+    assert time.monotonic() - start >= 0.07
+
+
+@pytest.mark.asyncio
+async def test_write_manifest_jsonl() -> None:
+    companies = read_companies(["Acme\n", "\n", "# skipped\n", " Globex \n"])
+    out = io.StringIO()
+    failed = await write_manifest(make_batch(FakePublisher()), companies, out)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert failed == 0
+    assert sorted(r["company"] for r in records) == ["Acme", "Globex"]
+    assert {r["index"] for r in records} == {0, 1}
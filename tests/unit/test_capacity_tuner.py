@@ -0,0 +1,100 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from tests.load_test.capacity_tuner import (
+    Measurement,
+    ProcessTreeSampler,
+    percentile,
+    recommend,
+)
+
+
+def run(
+    cpus: int, concurrency: int, completed: int, p95: float, **kw: int
+) -> Measurement:
+    return Measurement(
+        cpus=cpus,
+        concurrency=concurrency,
+        completed=completed,
+        errors=kw.get("errors", 0),
+        duration=10,
+        p50=p95 / 2,
+        p95=p95,
+        peak_rss_bytes=kw.get("rss", 3 * 2**30),
+    )
+
+
+def test_percentile() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.95) == 95
+    assert percentile([2.0], 0.95) == 2
+    assert percentile([], 0.5) != percentile([], 0.5)  # NaN
+
+
+def test_recommends_most_throughput_per_cpu_within_latency_budget() -> None:
+    results = [
+        run(2, 4, completed=40, p95=2.0),
+        run(2, 9, completed=80, p95=2.8),
+        run(2, 16, completed=100, p95=6.0),  # Over 1.5x the best p95.
+        run(4, 16, completed=120, p95=2.5),  # Faster, but less per CPU.
+        run(2, 12, completed=150, p95=2.1, errors=3),
+    ]
+
+    best, flags = recommend(results, target_rps=20)
+
+    assert (best.cpus, best.concurrency) == (2, 9)
+    assert flags == {
+        "cpu": "2",
+        "memory": "4Gi",
+        "container-concurrency": "9",
+        "max-instances": "3",
+    }
+    assert recommend(results, max_p95=1.0) is None
+    relaxed = recommend(results, max_p95=10)
+    assert relaxed is not None and relaxed[0].concurrency == 16
+
+
+def test_cpu_rounds_up_to_a_supported_limit() -> None:
+    _, flags = recommend([run(3, 9, completed=30, p95=1.0, rss=10 * 2**30)])
+    assert flags["cpu"] == "4"
+    assert flags["memory"] == "16Gi"
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_sampler_includes_child_processes() -> None:
+    child = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "b = bytearray(200 * 2**20); import time; time.sleep(30)",
+        ]
+    )
+    try:
+        time.sleep(1)
+        cpu, rss = ProcessTreeSampler(os.getpid()).sample()
+        child_only = ProcessTreeSampler(child.pid).sample()
+    finally:
+        child.kill()
+        child.wait()
+
+    assert child_only is not None
+    assert child_only[1] >= 200 * 2**20
+    assert rss >= child_only[1]
+    assert cpu > 0
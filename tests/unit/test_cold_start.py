@@ -0,0 +1,58 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+import subprocess
+import sys
+
+# Loaded on the first PDF or batch request or in `set_up`, never at import.
+DEFERRED_MODULES = (
+    "app.batch",
+    "reportlab",
+    "gcsfs",
+    "google.cloud.logging",
+    "app.app_utils.pdf",
+    "app.app_utils.publish",
+    "app.app_utils.storage",
+)
+
+IMPORT_SCRIPT = """
+import json, sys
+import google.auth
+
+def no_auth(*args, **kwargs):
+    raise AssertionError("google.auth.default() called at import")
+
+google.auth.default = no_auth
+import app.agent_engine_app
+import app.agent
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def test_entrypoints_import_without_auth_or_pdf_stack() -> None:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "MODEL_BACKEND": "gemini"},
+    )
+    assert result.returncode == 0, result.stderr
+    modules = json.loads(result.stdout.splitlines()[-1])
+    loaded = [
+        name
+        for name in DEFERRED_MODULES
+        if any(m == name or m.startswith(f"{name}.") for m in modules)
+    ]
+    assert loaded == []
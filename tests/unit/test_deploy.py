@@ -0,0 +1,242 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from click.testing import CliRunner
+from google.genai import errors
+
+from app.app_utils import deploy
+
+ENGINE = "projects/123/locations/us-central1/reasoningEngines/456"
+OTHER = "projects/123/locations/us-central1/reasoningEngines/789"
+
+
+class FakeAgentEngines:
+    """In-memory `client.agent_engines` that records the calls it receives."""
+
+    def __init__(
+        self, engines: list[str], filter_error: Exception | None = None
+    ) -> None:
+        self.engines = engines
+        self.filter_error = filter_error
+        self.calls: list[str] = []
+        self.created: list[Any] = []
+        self.updates: list[Any] = []
+
+    def _engine(self, name: str) -> Any:
+        return SimpleNamespace(
+            api_resource=SimpleNamespace(
+                name=name,
+                display_name="adk-pdf-create" if name == ENGINE else "other",
+                spec=SimpleNamespace(service_account=None),
+            )
+        )
+
+    def get(self, name: str) -> Any:
+        self.calls.append("get")
+        if name not in self.engines:
+            raise errors.ClientError(404, {"error": {"message": "not found"}})
+        return self._engine(name)
+
+    def list(self, config: dict[str, Any] | None = None) -> Iterator[Any]:
+        query = (config or {}).get("filter")
+        self.calls.append(f"list {query}" if query else "list")
+        if query and self.filter_error is not None:
+            raise self.filter_error
+        for name in self.engines:
+            engine = self._engine(name)
+            if (
+                not query
+                or query == f'display_name="{engine.api_resource.display_name}"'
+            ):
+                yield engine
+
+    def create(self, config: Any) -> Any:
+        self.created.append(config)
+        self.engines.append(ENGINE)
+        return self._engine(ENGINE)
+
+    def update(self, name: str, config: Any) -> Any:
+        self.updates.append(config)
+        return self._engine(name)
+
+
+@pytest.fixture
+def project(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "agent.py").write_text("root_agent = None\n")
+    (tmp_path / "requirements.txt").write_text("google-adk==1.0\n")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def fingerprint(**overrides: Any) -> dict[str, Any]:
+    args: dict[str, Any] = {
+        "source_packages": ["./app"],
+        "entrypoint": "app.agent_engine_app:agent_engine",
+        "requirements_file": "requirements.txt",
+        "env_vars": {"NUM_WORKERS": "1"},
+        "target": {"project": "p", "location": "us-central1"},
+        "deployment": {"min_instances": 1, "max_instances": 10},
+        "metadata": {"description": "SWOT agent", "labels": {}},
+    }
+    return deploy.deployment_fingerprint(**{**args, **overrides})
+
+
+def test_fingerprint_tracks_source_but_not_bytecode(project: Path) -> None:
+    before = fingerprint()
+    (project / "app" / "__pycache__").mkdir()
+    (project / "app" / "__pycache__" / "agent.cpython-312.pyc").write_bytes(b"\0")
+    assert fingerprint() == before
+
+    (project / "app" / "agent.py").write_text("root_agent = 1\n")
+    after = fingerprint()
+    assert deploy.plan_update(before, after) == "full"
+    assert deploy.diff_fingerprints(before, after) == [
+        f"source: {before['source'][:12]} -> {after['source'][:12]}"
+    ]
+
+
+def test_plan_update(project: Path) -> None:
+    current = fingerprint()
+
+    assert deploy.plan_update(None, current) == "full"
+    assert deploy.plan_update(current, fingerprint()) == "skip"
+    relabeled = fingerprint(
+        metadata={"description": "SWOT agent", "labels": {"a": "b"}}
+    )
+    assert deploy.plan_update(current, relabeled) == "metadata"
+    assert deploy.diff_fingerprints(current, relabeled) == [
+        "metadata.labels: {} -> {'a': 'b'}"
+    ]
+    for changed in (
+        fingerprint(env_vars={"NUM_WORKERS": "2"}),
+        fingerprint(deployment={"min_instances": 2, "max_instances": 10}),
+        fingerprint(entrypoint="app.other:agent_engine"),
+    ):
+        assert deploy.plan_update(current, changed) == "full"
+
+
+def test_env_var_values_are_not_recorded(project: Path) -> None:
+    previous = fingerprint(env_vars={"API_KEY": "secret-1"})
+    current = fingerprint(env_vars={"API_KEY": "secret-2"})
+
+    assert "secret" not in json.dumps(current)
+    assert deploy.diff_fingerprints(previous, current) == ["env_vars.API_KEY: changed"]
+
+
+def run_deploy(
+    monkeypatch: pytest.MonkeyPatch, engines: FakeAgentEngines, *args: str
+) -> Any:
+    monkeypatch.setattr(
+        deploy.vertexai,
+        "Client",
+        lambda **kwargs: SimpleNamespace(agent_engines=engines),
+    )
+    monkeypatch.setattr(deploy.vertexai, "init", lambda **kwargs: None)
+    monkeypatch.setattr(deploy, "generate_class_methods_from_agent", lambda agent: [])
+    result = CliRunner().invoke(
+        deploy.deploy_agent_engine_app,
+        [
+            "--project=p",
+            "--requirements-file=requirements.txt",
+            "--entrypoint-module=fake_entrypoint",
+            *args,
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def test_redeploys_only_what_changed(
+    monkeypatch: pytest.MonkeyPatch, project: Path
+) -> None:
+    (project / "fake_entrypoint.py").write_text("agent_engine = object()\n")
+    monkeypatch.syspath_prepend(str(project))
+    engines = FakeAgentEngines([])
+
+    assert (
+        "Planned update: full" in run_deploy(monkeypatch, engines, "--dry-run").output
+    )
+    assert engines.created == []
+
+    run_deploy(monkeypatch, engines)
+    [created] = engines.created
+    assert created.source_packages == ["./app"]
+    recorded = deploy.read_deployment_metadata()
+    assert recorded is not None
+    assert recorded["remote_agent_engine_id"] == ENGINE
+    assert "fingerprint" in recorded
+
+    result = run_deploy(monkeypatch, engines)
+    assert "Planned update: skip" in result.output
+    assert engines.updates == []
+    assert "list" not in engines.calls
+
+    result = run_deploy(monkeypatch, engines, "--labels=team=swot")
+    assert "metadata.labels: {} -> {'team': 'swot'}" in result.output
+    [patch] = engines.updates
+    assert patch.labels == {"team": "swot"}
+    assert patch.source_packages is None
+
+    (project / "app" / "agent.py").write_text("root_agent = 1\n")
+    run_deploy(monkeypatch, engines, "--labels=team=swot")
+    assert engines.updates[-1].source_packages == ["./app"]
+
+
+def lookup(engines: FakeAgentEngines, recorded: str | None = None) -> Any:
+    client = SimpleNamespace(agent_engines=engines)
+    return deploy.find_existing_engine(
+        client, "adk-pdf-create", "us-central1", recorded
+    )
+
+
+def test_lookup_uses_recorded_name_first(caplog: pytest.LogCaptureFixture) -> None:
+    engines = FakeAgentEngines([OTHER, ENGINE])
+
+    with caplog.at_level(logging.INFO):
+        assert lookup(engines, ENGINE).api_resource.name == ENGINE
+
+    assert engines.calls == ["get"]
+    assert "Engine lookup by recorded name: " + ENGINE in caplog.text
+
+
+def test_lookup_falls_back_to_filtered_list() -> None:
+    engines = FakeAgentEngines([OTHER, ENGINE])
+    stale = ENGINE.replace("456", "000")
+
+    assert lookup(engines, stale).api_resource.name == ENGINE
+    assert lookup(FakeAgentEngines([OTHER])) is None
+    assert engines.calls == ["get", 'list display_name="adk-pdf-create"']
+
+    # A recorded engine from another region is not looked up at all.
+    engines.calls.clear()
+    lookup(engines, ENGINE.replace("us-central1", "europe-west1"))
+    assert engines.calls == ['list display_name="adk-pdf-create"']
+
+
+def test_lookup_scans_only_if_filter_fails(caplog: pytest.LogCaptureFixture) -> None:
+    engines = FakeAgentEngines(
+        [OTHER, ENGINE], filter_error=errors.ClientError(400, {"error": {}})
+    )
+
+    assert lookup(engines).api_resource.name == ENGINE
+    assert engines.calls == ['list display_name="adk-pdf-create"', "list"]
+    assert "Engine lookup by filtered list failed" in caplog.text
@@ -0,0 +1,140 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from app.app_utils.feedback_writer import FeedbackWriter
+from app.app_utils.typing import Feedback
+
+
+class FakeBatch:
+    def __init__(self, sink: "FakeLoggingSink") -> None:
+        self.sink = sink
+        self.entries: list[dict[str, Any]] = []
+
+    def log_struct(self, info: dict[str, Any], **kw: Any) -> None:
+        self.entries.append(info)
+
+    def commit(self) -> None:
+        if self.sink.fail:
+            raise ConnectionError("logging unavailable")
+        with self.sink.lock:
+            self.sink.batches.append(self.entries)
+
+
+class FakeLoggingSink:
+    """Records the batches a Cloud Logging logger would have written."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.batches: list[list[dict[str, Any]]] = []
+        self.lock = threading.Lock()
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+    @property
+    def scores(self) -> list[float]:
+        with self.lock:
+            return [entry["score"] for batch in self.batches for entry in batch]
+
+
+def feedback(score: float) -> Feedback:
+    return Feedback(score=score, text="ok", user_id="u", session_id="s")
+
+
+def wait_for(condition: Any, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_flushes_full_batches() -> None:
+    sink = FakeLoggingSink()
+    writer = FeedbackWriter(sink, batch_size=2, flush_interval=60).start()
+
+    for score in range(4):
+        assert writer.submit(feedback(score))
+    wait_for(lambda: len(sink.batches) == 2)
+
+    assert [len(batch) for batch in sink.batches] == [2, 2]
+    assert sink.scores == [0, 1, 2, 3]
+    writer.close()
+
+
+def test_flushes_partial_batch_after_interval() -> None:
+    sink = FakeLoggingSink()
+    writer = FeedbackWriter(sink, batch_size=100, flush_interval=0.05).start()
+
+    writer.submit(feedback(1))
+    wait_for(lambda: sink.scores == [1])
+
+    assert writer.stats.written == 1
+    assert writer.stats.last_flush_latency > 0
+    writer.close()
+
+
+def test_close_writes_queued_feedback() -> None:
+    sink = FakeLoggingSink()
+    writer = FeedbackWriter(sink, batch_size=100, flush_interval=60).start()
+
+    for score in range(3):
+        writer.submit(feedback(score))
+    writer.close()
+
+    assert sink.scores == [0, 1, 2]
+    assert writer.queue_depth == 0
+    assert not writer.submit(feedback(4))
+    assert writer.stats.dropped == 1
+
+
+def test_full_queue_spills_and_next_writer_sends_spill(tmp_path: Path) -> None:
+    spill_path = str(tmp_path / "feedback.jsonl")
+    writer = FeedbackWriter(FakeLoggingSink(), max_queue=1, spill_path=spill_path)
+
+    assert writer.submit(feedback(1))
+    assert not writer.submit(feedback(2))
+    assert writer.stats.spilled == 1
+
+    sink = FakeLoggingSink()
+    FeedbackWriter(sink, spill_path=spill_path).start().close()
+    assert sink.scores == [2]
+    assert not Path(spill_path).exists()
+
+
+def test_failed_flush_spills_entries(tmp_path: Path) -> None:
+    spill_path = tmp_path / "feedback.jsonl"
+    writer = FeedbackWriter(
+        FakeLoggingSink(fail=True), flush_interval=60, spill_path=str(spill_path)
+    ).start()
+
+    writer.submit(feedback(1))
+    writer.close()
+
+    assert writer.stats.failed_flushes == 1
+    assert writer.stats.spilled == 1
+    assert '"score": 1' in spill_path.read_text()
+
+
+def test_full_queue_drops_without_spill_path() -> None:
+    writer = FeedbackWriter(FakeLoggingSink(), max_queue=1)
+
+    writer.submit(feedback(1))
+    writer.submit(feedback(2))
+
+    assert writer.stats.dropped == 1
+    assert writer.queue_depth == 1
@@ -0,0 +1,190 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+import fsspec
+import pytest
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+
+from app.app_utils import genai_telemetry
+from app.app_utils.genai_telemetry import BatchedCompletionUploader
+from app.app_utils.telemetry import setup_telemetry
+
+tracer = TracerProvider().get_tracer("test")
+
+
+@dataclass
+class Text:
+    content: str
+    type: str = "text"
+
+
+@dataclass
+class OutputMessage:
+    role: str = "assistant"
+    parts: list[Text] = field(default_factory=lambda: [Text("ok")])
+    finish_reason: str = "stop"
+
+
+def uploader(**kwargs: Any) -> tuple[BatchedCompletionUploader, Any, str]:
+    fs = fsspec.filesystem("memory")
+    base_path = f"/completions-{uuid.uuid4().hex}"
+    return BatchedCompletionUploader(base_path, fs=fs, **kwargs), fs, base_path
+
+
+def complete(hook: BatchedCompletionUploader, span: Any, **output: Any) -> None:
+    hook.on_completion(
+        inputs=[Text("Analyze Acme")],
+        outputs=[OutputMessage(**output)],
+        system_instruction=[Text("You are a SWOT agent")],
+        span=span,
+    )
+
+
+def uploaded_lines(fs: Any, base_path: str) -> list[list[dict[str, Any]]]:
+    return [
+        [json.loads(line) for line in fs.cat_file(path).decode().splitlines()]
+        for path in sorted(fs.find(base_path))
+    ]
+
+
+def test_batches_completions_into_jsonl_objects() -> None:
+    hook, fs, base_path = uploader(batch_size=3, flush_interval=60)
+
+    spans = [tracer.start_span(f"call_llm {i}") for i in range(5)]
+    for span in spans:
+        complete(hook, span)
+    hook.close()
+
+    objects = uploaded_lines(fs, base_path)
+    assert sorted(len(lines) for lines in objects) == [2, 3]
+    first = next(lines for lines in objects if len(lines) == 3)[0]
+    assert first["trace_id"] == f"{spans[0].get_span_context().trace_id:032x}"
+    assert first["outputs"][0]["parts"] == [{"content": "ok", "type": "text"}]
+    assert isinstance(spans[0], ReadableSpan) and spans[0].attributes
+    ref = str(spans[0].attributes["gen_ai.output.messages_ref"])
+    assert ref.startswith("memory://") and ref.endswith(".jsonl")
+    assert hook.stats.uploads == 2
+    assert hook.stats.uploaded_records == 5
+
+
+def test_head_sampling_keeps_whole_traces() -> None:
+    hook, _, _ = uploader(head_sample_rate=0.3, batch_size=1000)
+
+    kept = []
+    for i in range(200):
+        with tracer.start_as_current_span(f"invocation {i}"):
+            first, second = (tracer.start_span("call_llm") for _ in range(2))
+            kept.append(
+                (hook.sample([OutputMessage()], first), hook.sample([], second))
+            )
+    hook.close()
+
+    assert all(a == b for a, b in kept)
+    assert 30 < sum(a == "head" for a, _ in kept) < 90
+
+
+def test_tail_completions_use_tail_rate() -> None:
+    hook, _, _ = uploader(head_sample_rate=0, tail_sample_rate=1, slow_threshold=60)
+
+    complete(hook, tracer.start_span("call_llm"))
+    complete(hook, tracer.start_span("call_llm"), finish_reason="length")
+    slow = tracer.start_span("call_llm", start_time=1)
+    complete(hook, slow)
+    hook.close()
+
+    assert hook.stats.sampled_out == 1
+    assert hook.stats.tail == 2
+    assert hook.stats.uploaded_records == 2
+
+
+@pytest.mark.parametrize("mode", ["batched", "per-completion", "bogus"])
+def test_setup_telemetry_upload_modes(
+    monkeypatch: pytest.MonkeyPatch, mode: str
+) -> None:
+    installed: list[str] = []
+
+    def install(base_path: str) -> object:
+        installed.append(base_path)
+        return object()
+
+    monkeypatch.setattr(genai_telemetry, "install_completion_uploader", install)
+    env = {
+        "LOGS_BUCKET_NAME": "logs",
+        "OTEL_INSTRUMENTATION_GENAI_CAPTURE_MESSAGE_CONTENT": "true",
+        "GENAI_TELEMETRY_UPLOAD": mode,
+    }
+    monkeypatch.setattr(os, "environ", env)
+
+    if mode == "bogus":
+        with pytest.raises(ValueError):
+            setup_telemetry()
+        return
+    setup_telemetry()
+
+    hook = env.get("OTEL_INSTRUMENTATION_GENAI_COMPLETION_HOOK")
+    if mode == "batched":
+        assert installed == ["gs://logs/completions"]
+        assert hook is None
+    else:
+        assert installed == []
+        assert hook == "upload"
+
+
+def test_install_completion_uploader_instruments_google_genai(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from opentelemetry.instrumentation.google_genai import (
+        GoogleGenAiSdkInstrumentor,
+        instrumentor,
+    )
+
+    hooks: list[Any] = []
+    snapshots: list[Any] = []
+    instrument_generate_content = instrumentor.instrument_generate_content
+
+    def spy(otel_wrapper: Any, completion_hook: Any, **kwargs: Any) -> Any:
+        hooks.append(completion_hook)
+        snapshots.append(
+            instrument_generate_content(otel_wrapper, completion_hook, **kwargs)
+        )
+        return snapshots[-1]
+
+    monkeypatch.setattr(instrumentor, "instrument_generate_content", spy)
+    # Only the installed google-genai version is checked here, not the call.
+    monkeypatch.setattr(
+        GoogleGenAiSdkInstrumentor, "_check_dependency_conflicts", lambda self: None
+    )
+    GoogleGenAiSdkInstrumentor().uninstrument()
+
+    hook = genai_telemetry.install_completion_uploader(
+        f"memory://completions-{uuid.uuid4().hex}"
+    )
+    try:
+        assert isinstance(hook, BatchedCompletionUploader)
+        assert hooks == [hook]
+        assert GoogleGenAiSdkInstrumentor().is_instrumented_by_opentelemetry
+    finally:
+        # Every constructor call re-runs __init__ on the singleton, which
+        # forgets the snapshot needed to uninstrument.
+        otel = GoogleGenAiSdkInstrumentor()
+        if snapshots:
+            otel._generate_content_snapshot = snapshots[-1]
+            otel.uninstrument()
+        if hook is not None:
+            hook.close()
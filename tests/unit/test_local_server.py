@@ -0,0 +1,101 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from aiohttp import ClientResponse
+from aiohttp.test_utils import TestClient, TestServer
+
+from tests.load_test.local_server import ENGINE_PATH, build_server
+
+
+class FakeEngine:
+    async def async_create_session(self, user_id: str) -> dict[str, Any]:
+        return {"id": "s1", "user_id": user_id}
+
+    async def async_stream_query(
+        self, message: str, user_id: str, session_id: str
+    ) -> AsyncIterator[dict[str, Any]]:
+        yield {"content": {"parts": [{"text": f"{session_id}: {message}"}]}}
+        if message == "fail":
+            raise RuntimeError("model unavailable")
+
+    def readiness(self) -> dict[str, Any]:
+        return {"ready": True}
+
+    def register_operations(self) -> dict[str, list[str]]:
+        return {
+            "async": ["async_create_session"],
+            "async_stream": ["async_stream_query"],
+        }
+
+
+async def post(
+    client: TestClient, method: str, params: str = "", **inputs: Any
+) -> ClientResponse:
+    return await client.post(
+        f"{ENGINE_PATH}:{method}{params}",
+        json={"class_method": inputs.pop("class_method"), "input": inputs},
+    )
+
+
+@pytest.mark.asyncio
+async def test_query_and_sse_stream_query() -> None:
+    async with TestClient(TestServer(build_server(FakeEngine(), 0, 2))) as client:
+        response = await post(
+            client, "query", class_method="async_create_session", user_id="u"
+        )
+        assert await response.json() == {"output": {"id": "s1", "user_id": "u"}}
+
+        response = await post(
+            client,
+            "streamQuery",
+            "?alt=sse",
+            class_method="async_stream_query",
+            message="Hi!",
+            user_id="u",
+            session_id="s1",
+        )
+        assert response.content_type == "text/event-stream"
+        events = [
+            json.loads(line.removeprefix("data: "))
+            for line in (await response.text()).splitlines()
+            if line
+        ]
+        assert events == [{"content": {"parts": [{"text": "s1: Hi!"}]}}]
+
+        health = await (await client.get("/healthz")).json()
+        assert health == {"worker": 0, "workers": 2, "ready": True}
+
+
+@pytest.mark.asyncio
+async def test_stream_errors_are_reported_as_events() -> None:
+    async with TestClient(TestServer(build_server(FakeEngine(), 0, 1))) as client:
+        response = await post(
+            client,
+            "streamQuery",
+            class_method="async_stream_query",
+            message="fail",
+            user_id="u",
+            session_id="s1",
+        )
+        lines = (await response.text()).splitlines()
+        assert json.loads(lines[-1]) == {"code": 500, "message": "model unavailable"}
+
+        response = await post(
+            client, "streamQuery", class_method="async_create_session", user_id="u"
+        )
+        assert response.status == 400
@@ -0,0 +1,135 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import pytest
+from reportlab.platypus import Paragraph, Table
+
+from app.app_utils.markdown import (
+    HeadingBlock,
+    ListBlock,
+    ParagraphBlock,
+    TableBlock,
+    inline_markup,
+    markdown_story,
+    parse_markdown,
+)
+from app.app_utils.pdf import SWOT_TEMPLATE, get_template_engine, render_swot_pdf
+
+DOCUMENT = """### Strengths
+* Brand trusted by [AT&T][1]
+  * Nested point
+    continued here
+* Second point
+1. First
+2. Second
+
+Opening line
+continues the paragraph.
+
+| Area | Score |
+|------|:-----:|
+| R&D | 4 |
+
+[1]: https://example.com/?a=1&b=2
+"""
+
+
+def test_parse_builds_blocks() -> None:
+    document = parse_markdown(DOCUMENT)
+    heading, bullets, numbered, paragraph, table = document.blocks
+
+    assert heading == HeadingBlock(3, "Strengths")
+    assert isinstance(bullets, ListBlock) and not bullets.ordered
+    assert bullets.items[0].children[0].items[0].lines == [
+        "Nested point",
+        "continued here",
+    ]
+    assert isinstance(numbered, ListBlock) and numbered.ordered
+    assert paragraph == ParagraphBlock("Opening line continues the paragraph.")
+    assert table == TableBlock(["Area", "Score"], [["R&D", "4"]])
+    assert document.references == {"1": "https://example.com/?a=1&b=2"}
+
+
+def test_inline_markup_escapes_and_formats() -> None:
+    assert inline_markup("R&D <b> 1 < 2") == "R&amp;D &lt;b&gt; 1 &lt; 2"
+    assert inline_markup("**bold _it_** and `a<b`") == (
+        '<b>bold <i>it</i></b> and <font face="Courier">a&lt;b</font>'
+    )
+    assert inline_markup("[site](https://a.com/?x=1&y=2)") == (
+        '<a href="https://a.com/?x=1&amp;y=2" color="blue">site</a>'
+    )
+    assert inline_markup("see [docs] and [1]", {"docs": "https://d.com"}) == (
+        'see <a href="https://d.com" color="blue">docs</a> and [1]'
+    )
+    assert inline_markup("snake_case_name") == "snake_case_name"
+
+
+def _best_time(text: str) -> float:
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        inline_markup(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.parametrize("token", ["*a ", "_a ", "**a ", "[a ", "`a ", "<https://a "])
+def test_inline_markup_is_linear_in_unmatched_markers(token: str) -> None:
+    # 8x the input: linear work takes ~8x as long, quadratic work ~64x.
+    assert _best_time(token * 4000) < 24 * _best_time(token * 500)
+
+
+def test_story_fragments_match_parsed_markup() -> None:
+    template = get_template_engine().get(SWOT_TEMPLATE.name)
+    document = parse_markdown(DOCUMENT)
+    story = list(markdown_story(template, DOCUMENT))
+
+    def styled_text(paragraph: Paragraph) -> list[tuple[str, str, str, list]]:
+        return [
+            (char, frag.fontName, str(frag.textColor), frag.link)
+            for frag in paragraph.frags
+            for char in frag.text
+        ]
+
+    markers = ["", "• ", "• ", "• ", "1. ", "2. ", ""]
+    for flowable, marker in zip(story, markers, strict=False):
+        markup = marker + inline_markup(flowable.text, document.references)
+        parsed = Paragraph(markup, flowable.style)
+        assert styled_text(flowable) == styled_text(parsed)
+    header = story[7]._cellvalues[0][0]
+    assert styled_text(header) == styled_text(Paragraph("<b>Area</b>", header.style))
+
+
+def test_story_merges_lines_into_few_flowables() -> None:
+    template = get_template_engine().get(SWOT_TEMPLATE.name)
+    story = list(markdown_story(template, DOCUMENT))
+
+    assert [type(flowable) for flowable in story] == [Paragraph] * 7 + [Table]
+    assert [flowable.frags[0].text.split()[0] for flowable in story[1:6]] == [
+        "•",
+        "•",
+        "•",
+        "1.",
+        "2.",
+    ]
+    assert story[2].style.leftIndent > story[1].style.leftIndent
+    assert story[4].style.firstLineIndent < story[1].style.firstLineIndent < 0
+    assert story[6].text == "Opening line continues the paragraph."
+
+
+def test_render_accepts_markup_characters() -> None:
+    text = "### R&D <team>\n* AT&T [link](https://a.com) **bold** <i>\n"
+    assert render_swot_pdf(text, "Procter & Gamble <PG>").startswith(b"%PDF")
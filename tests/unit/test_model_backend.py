@@ -0,0 +1,171 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm, LlmRequest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.app_utils.model_backend import (
+    Cassette,
+    CassetteMissError,
+    RecordingLlm,
+    ReplayLlm,
+    build_model,
+    request_key,
+)
+from tests.fakes import StubLlm, has_function_response, last_user_text
+
+
+def make_pdf(company_name: str) -> str:
+    """Returns a URL that differs on every call, like a real upload."""
+    return f"https://storage.cloud.google.com/bucket/{company_name}-{uuid.uuid4()}.pdf"
+
+
+def script(llm_request: LlmRequest) -> str | types.Content:
+    if has_function_response(llm_request):
+        return "Done"
+    if last_user_text(llm_request).startswith("Analyze"):
+        return "### Strengths\n* Brand"
+    return types.Content(
+        role="model",
+        parts=[
+            types.Part(
+                function_call=types.FunctionCall(
+                    name="make_pdf", args={"company_name": "Acme"}
+                )
+            )
+        ],
+    )
+
+
+async def converse(model: BaseLlm) -> list[str]:
+    agent = Agent(name="root", model=model, tools=[make_pdf])
+    runner = InMemoryRunner(agent=agent, app_name="test")
+    session = await runner.session_service.create_session(app_name="test", user_id="u")
+    texts = []
+    for text in ("Analyze Acme", "Make the PDF"):
+        message = types.Content(role="user", parts=[types.Part.from_text(text=text)])
+        async for event in runner.run_async(
+            user_id="u", session_id=session.id, new_message=message
+        ):
+            if event.content and event.content.parts and event.content.parts[0].text:
+                texts.append(event.content.parts[0].text)
+    return texts
+
+
+async def record(path: Path) -> tuple[list[str], StubLlm]:
+    stub = StubLlm(latency=0.05, respond=script)
+    model = RecordingLlm(model="stub", inner=stub, cassette=Cassette(path))
+    return await converse(model), stub
+
+
+@pytest.mark.asyncio
+async def test_replay_reproduces_recorded_session(tmp_path: Path) -> None:
+    recorded, stub = await record(tmp_path / "c.jsonl")
+    assert stub.calls == 3
+    assert len(Cassette(tmp_path / "c.jsonl")) == 3
+
+    model = ReplayLlm(model="stub", cassette=Cassette(tmp_path / "c.jsonl"), latency=0)
+    assert await converse(model) == recorded == ["### Strengths\n* Brand", "Done"]
+
+
+@pytest.mark.asyncio
+async def test_replay_injects_latency(tmp_path: Path) -> None:
+    await record(tmp_path / "c.jsonl")
+
+    recorded = ReplayLlm(model="stub", cassette=Cassette(tmp_path / "c.jsonl"))
+    start = time.perf_counter()
+    await converse(recorded)
+    assert time.perf_counter() - start >= 3 * 0.05
+
+    fixed = ReplayLlm(
+        model="stub", cassette=Cassette(tmp_path / "c.jsonl"), latency=0.2
+    )
+    start = time.perf_counter()
+    await converse(fixed)
+    assert time.perf_counter() - start >= 3 * 0.2
+
+
+@pytest.mark.asyncio
+async def test_replay_estimates_usage(tmp_path: Path) -> None:
+    await record(tmp_path / "c.jsonl")
+    model = ReplayLlm(
+        model="stub",
+        cassette=Cassette(tmp_path / "c.jsonl"),
+        latency=0,
+        usage="estimate",
+    )
+    assert await converse(model) == ["### Strengths\n* Brand", "Done"]
+
+
+@pytest.mark.asyncio
+async def test_replay_miss_raises(tmp_path: Path) -> None:
+    model = ReplayLlm(model="stub", cassette=Cassette(tmp_path / "empty.jsonl"))
+    with pytest.raises(CassetteMissError):
+        await converse(model)
+
+
+def test_request_key_ignores_call_ids_and_tool_output() -> None:
+    def request(call_id: str, url: str) -> LlmRequest:
+        return LlmRequest(
+            model="stub",
+            contents=[
+                types.Content(
+                    role="model",
+                    parts=[
+                        types.Part(
+                            function_call=types.FunctionCall(
+                                id=call_id, name="make_pdf", args={"company_name": "A"}
+                            )
+                        )
+                    ],
+                ),
+                types.Content(
+                    role="user",
+                    parts=[
+                        types.Part(
+                            function_response=types.FunctionResponse(
+                                id=call_id, name="make_pdf", response={"result": url}
+                            )
+                        )
+                    ],
+                ),
+            ],
+        )
+
+    assert request_key(request("a", "x")) == request_key(request("b", "y"))
+
+
+def test_build_model_selects_backend(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("MODEL_BACKEND", "replay")
+    monkeypatch.setenv("MODEL_CASSETTE", str(tmp_path / "c.jsonl"))
+    monkeypatch.setenv("MODEL_REPLAY_LATENCY", "0.01")
+    model = build_model()
+    assert isinstance(model, ReplayLlm)
+    assert model.latency == 0.01
+    again = build_model()
+    assert isinstance(again, ReplayLlm)
+    assert model.cassette is again.cassette
+
+    monkeypatch.setenv("MODEL_BACKEND", "bogus")
+    with pytest.raises(ValueError):
+        build_model()
@@ -0,0 +1,128 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Any
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.apps.app import App
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.app_utils import model_backend
+from app.app_utils.model_tiers import (
+    RoutedLlm,
+    agent_model,
+    build_agent_model,
+)
+from app.app_utils.telemetry import StageMetricsPlugin, setup_local_telemetry
+from tests.fakes import StubLlm, swot_agent_script, swot_markdown
+
+
+def test_agent_models_from_configuration(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("MODEL_TIERS", raising=False)
+    monkeypatch.delenv("AGENT_MODELS", raising=False)
+    assert agent_model("swot_agent") == "gemini-2.5-flash"
+    assert agent_model("pdf_generator_agent") == "gemini-2.5-flash-lite"
+
+    monkeypatch.setenv("MODEL_TIERS", "standard=gemini-2.5-pro")
+    monkeypatch.setenv(
+        "AGENT_MODELS", "google_search_agent=light, swot_batch_pipeline=custom-model"
+    )
+    assert agent_model("swot_agent") == "gemini-2.5-pro"
+    assert agent_model("google_search_agent") == "gemini-2.5-flash-lite"
+    assert agent_model("swot_batch_pipeline") == "custom-model"
+
+    monkeypatch.setenv("AGENT_MODELS", "swot_agent")
+    with pytest.raises(ValueError):
+        agent_model("swot_agent")
+
+
+def test_only_listed_agents_are_routed(monkeypatch: pytest.MonkeyPatch) -> None:
+    model_backend.register_backend("tiers", lambda model: StubLlm(model=model))
+    monkeypatch.setenv("MODEL_BACKEND", "tiers")
+    monkeypatch.setenv("MODEL_ROUTER", "swot_agent,pdf_generator_agent")
+    monkeypatch.delenv("AGENT_MODELS", raising=False)
+    monkeypatch.delenv("MODEL_TIERS", raising=False)
+
+    routed = build_agent_model("swot_agent")
+    assert isinstance(routed, RoutedLlm)
+    assert (routed.heavy.model, routed.light.model) == (
+        "gemini-2.5-flash",
+        "gemini-2.5-flash-lite",
+    )
+    # Already on the light tier, so there is nothing to route.
+    assert isinstance(build_agent_model("pdf_generator_agent"), StubLlm)
+    assert isinstance(build_agent_model("google_search_agent"), StubLlm)
+
+
+def metric_points(reader: Any, name: str) -> list[Any]:
+    return [
+        point
+        for resource_metrics in reader.get_metrics_data().resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+        if metric.name == name
+        for point in metric.data.data_points
+    ]
+
+
+@pytest.mark.asyncio
+async def test_simple_turns_use_the_light_model() -> None:
+    _, reader = setup_local_telemetry()
+    script = swot_agent_script(bullets=10)
+    heavy = StubLlm(model="routing-heavy", respond=script)
+    light = StubLlm(model="routing-light", respond=script)
+
+    def swot_research_agent(request: str) -> str:
+        """Research the company."""
+        return swot_markdown(10)
+
+    root_agent = Agent(
+        name="routed_swot_agent",
+        model=RoutedLlm(model=heavy.model, heavy=heavy, light=light),
+        tools=[swot_research_agent],
+    )
+    runner = InMemoryRunner(
+        app=App(name="test", root_agent=root_agent, plugins=[StageMetricsPlugin()])
+    )
+    session = await runner.session_service.create_session(
+        app_name="test", user_id="user"
+    )
+    for text in ("Hi!", "Acme Corp"):
+        message = types.Content(role="user", parts=[types.Part.from_text(text=text)])
+        async for _ in runner.run_async(
+            user_id="user", session_id=session.id, new_message=message
+        ):
+            pass
+
+    # Greeting and tool call are simple; presenting the research is not.
+    assert (light.calls, heavy.calls) == (2, 1)
+    served = {
+        (point.attributes["gen_ai.request.model"], point.count)
+        for point in metric_points(reader, "swot.stage.duration")
+        if point.attributes.get("gen_ai.agent.name") == "routed_swot_agent"
+    }
+    assert served == {("routing-light", 2), ("routing-heavy", 1)}
+    token_models = {
+        point.attributes["gen_ai.request.model"]
+        for point in metric_points(reader, "swot.llm.tokens")
+        if point.attributes.get("gen_ai.agent.name") == "routed_swot_agent"
+    }
+    assert token_models == {"routing-light", "routing-heavy"}
+    routes = {
+        (point.attributes["swot.model.route"], point.value)
+        for point in metric_points(reader, "swot.model.routes")
+        if point.attributes["gen_ai.request.model"].startswith("routing-")
+    }
+    assert routes == {("simple", 2), ("complex", 1)}
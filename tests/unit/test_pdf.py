@@ -0,0 +1,45 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import fsspec
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+
+from app.app_utils.pdf import render_swot_pdf, render_swot_pdf_with_pages, upload_pdf
+
+SWOT_TEXT = "\n".join(
+    f"### {section}\n" + "\n".join(f"* {section} point {i}" for i in range(200))
+    for section in ("Strengths", "Weaknesses", "Opportunities", "Threats")
+)
+
+
+def test_render_with_pages_matches_buffered_render() -> None:
+    pdf, pages = render_swot_pdf_with_pages(SWOT_TEXT, "Acme")
+
+    assert pages >= 2
+    assert len(pdf) == len(render_swot_pdf(SWOT_TEXT, "Acme"))
+    assert pdf.startswith(b"%PDF")
+
+
+def test_upload_pdf_to_async_filesystem() -> None:
+    fs = fsspec.filesystem("memory")
+    full_path = "/bucket/pdfs/SWOT_Acme.pdf"
+    pdf = render_swot_pdf(SWOT_TEXT, "Acme")
+
+    asyncio.run(
+        upload_pdf(AsyncFileSystemWrapper(fs), full_path, pdf, chunk_size=256 * 1024)
+    )
+
+    assert fs.cat_file(full_path) == pdf
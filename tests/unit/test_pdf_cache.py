@@ -0,0 +1,90 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import uuid
+
+import fsspec
+import pytest
+from fsspec.implementations.memory import MemoryFileSystem
+
+from app.app_utils.pdf import pdf_object_path
+from app.app_utils.pdf_cache import PdfDedupCache, content_key, get_pdf_cache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fs() -> MemoryFileSystem:
+    return fsspec.filesystem("memory")
+
+
+def test_content_key_covers_all_inputs() -> None:
+    key = content_key("1", "Acme", "text")
+    assert key == content_key("1", "Acme", "text")
+    assert key != content_key("2", "Acme", "text")
+    assert key != content_key("1", "Globex", "text")
+    assert key != content_key("1", "Acme", "other")
+    assert content_key("1", "ab", "c") != content_key("1", "a", "bc")
+
+
+def test_content_addressed_path_is_stable() -> None:
+    key = content_key("1", "Acme Corp", "text")
+    assert pdf_object_path("Acme Corp", key[:32]) == pdf_object_path(
+        "Acme Corp", key[:32]
+    )
+    assert pdf_object_path("Acme Corp").endswith(".pdf")
+
+
+def test_lookup_hits_local_then_remote(fs: MemoryFileSystem) -> None:
+    cache = PdfDedupCache(max_entries=8, ttl=60)
+    path = f"/{uuid.uuid4()}/SWOT_Acme.pdf"
+
+    assert not cache.lookup(fs, "k1", path)
+    fs.pipe_file(path, b"%PDF")
+    assert cache.lookup(fs, "k1", path)  # found in the bucket
+    assert cache.lookup(fs, "k1", path)  # found in the local index
+
+    assert cache.stats.misses == 1
+    assert cache.stats.remote_hits == 1
+    assert cache.stats.local_hits == 1
+    assert cache.metrics()["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_lru_and_ttl_eviction(fs: MemoryFileSystem) -> None:
+    clock = FakeClock()
+    cache = PdfDedupCache(max_entries=2, ttl=10, clock=clock)
+    cache.put("a", "/a.pdf")
+    cache.put("b", "/b.pdf")
+    cache.put("c", "/c.pdf")
+    assert cache.metrics()["size"] == 2
+    assert not cache.lookup(fs, "a", "/a.pdf")  # evicted as least recently used
+
+    clock.now = 11
+    assert not cache.lookup(fs, "b", "/b.pdf")  # expired
+    assert cache.stats.evictions == 2
+
+
+def test_dedup_is_opt_in(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("PDF_DEDUP", raising=False)
+    assert get_pdf_cache() is None
+    monkeypatch.setenv("PDF_DEDUP", "false")
+    assert get_pdf_cache() is None
+    monkeypatch.setenv("PDF_DEDUP", "true")
+    assert get_pdf_cache() is get_pdf_cache()
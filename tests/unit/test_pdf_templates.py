@@ -0,0 +1,123 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import weakref
+from collections.abc import Iterator
+from io import BytesIO
+from typing import Any
+
+from reportlab.platypus import BaseDocTemplate, Paragraph
+
+from app.app_utils.pdf import SWOT_TEMPLATE, get_template_engine, render_swot_pdf
+from app.app_utils.pdf_templates import (
+    CompiledTemplate,
+    ReportTemplate,
+    TemplateEngine,
+)
+
+
+def plain_story(template: CompiledTemplate, body: str) -> list[Any]:
+    return [Paragraph(body, template.body_style)]
+
+
+def test_templates_are_compiled_once() -> None:
+    engine = get_template_engine()
+    assert engine.get(SWOT_TEMPLATE.name) is engine.get(SWOT_TEMPLATE.name)
+    assert get_template_engine() is engine
+
+
+def test_repeated_renders_reuse_cached_template() -> None:
+    first = render_swot_pdf("### Strengths\n* Brand", "Acme")
+    second = render_swot_pdf("### Strengths\n* Brand", "Globex")
+    assert first.startswith(b"%PDF")
+    assert second.startswith(b"%PDF")
+
+
+def test_multiple_named_templates() -> None:
+    engine = TemplateEngine()
+    engine.register(
+        ReportTemplate(name="memo", version="1", title_format="Memo: {subject}"),
+        plain_story,
+    )
+    engine.register(
+        ReportTemplate(
+            name="letterhead",
+            version="1",
+            title_format="{subject}",
+            header_text="Confidential",
+            footer_text="Page {page}",
+        ),
+        plain_story,
+    )
+    assert engine.get("memo") is not engine.get("letterhead")
+    assert engine.render("memo", "Hello", subject="Q3").startswith(b"%PDF")
+
+    output = BytesIO()
+    assert engine.render("letterhead", "Hello", output=output, subject="Q3") == b""
+    assert output.getvalue().startswith(b"%PDF")
+
+
+def test_register_invalidates_compiled_template() -> None:
+    engine = TemplateEngine()
+    template = ReportTemplate(name="memo", version="1", title_format="{subject}")
+    engine.register(template, plain_story)
+    compiled = engine.get("memo")
+    engine.register(
+        ReportTemplate(name="memo", version="2", title_format="{subject}"),
+        plain_story,
+    )
+    assert engine.get("memo") is not compiled
+    assert engine.template("memo").version == "2"
+
+
+def numbered_paragraphs(template: CompiledTemplate, count: int) -> Iterator[Any]:
+    for i in range(count):
+        yield Paragraph(f"Finding {i} " * 20, template.body_style)
+
+
+def page_count(pdf: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b", pdf))
+
+
+def test_streaming_layout_matches_list_layout() -> None:
+    template = get_template_engine().get(SWOT_TEMPLATE.name)
+    streamed = BytesIO()
+    template.build(streamed, numbered_paragraphs(template, 300))
+
+    listed = BytesIO()
+    doc = BaseDocTemplate(listed, pageTemplates=template.page_templates)
+    doc.build(list(numbered_paragraphs(template, 300)))
+
+    assert page_count(streamed.getvalue()) == page_count(listed.getvalue()) > 10
+
+
+def test_streaming_layout_frees_drawn_flowables() -> None:
+    template = get_template_engine().get(SWOT_TEMPLATE.name)
+    alive = peak = 0
+
+    def collected() -> None:
+        nonlocal alive
+        alive -= 1
+
+    def story() -> Iterator[Any]:
+        nonlocal alive, peak
+        for paragraph in numbered_paragraphs(template, 1000):
+            alive += 1
+            peak = max(peak, alive)
+            weakref.finalize(paragraph, collected)
+            yield paragraph
+
+    template.build(BytesIO(), story())
+    assert peak < 50
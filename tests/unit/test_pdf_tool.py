@@ -0,0 +1,79 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import AgentTool, FunctionTool, ToolContext
+from google.genai import types
+
+from app.pdf_tool import build_pdf_tool
+from tests.fakes import StubLlm, pdf_request_script
+
+pdf_calls: list[str] = []
+
+
+async def generate_and_upload_swot_pdf(
+    company_name: str, analysis_key: str, tool_context: ToolContext
+) -> str:
+    pdf_calls.append(company_name)
+    return "https://storage.cloud.google.com/bucket/x.pdf"
+
+
+async def request_pdf(mode: str) -> StubLlm:
+    model = StubLlm(
+        respond=pdf_request_script(
+            {"company_name": "Acme", "analysis_key": "swot_analysis_1"}
+        )
+    )
+    root_agent = Agent(
+        name="swot_agent",
+        model=model,
+        tools=[build_pdf_tool(generate_and_upload_swot_pdf, model=model, mode=mode)],
+    )
+    runner = InMemoryRunner(agent=root_agent, app_name="test")
+    session = await runner.session_service.create_session(
+        app_name="test", user_id="user"
+    )
+    message = types.Content(role="user", parts=[types.Part.from_text(text="PDF")])
+    async for _ in runner.run_async(
+        user_id="user", session_id=session.id, new_message=message
+    ):
+        pass
+    return model
+
+
+def test_mode_selects_topology(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert isinstance(
+        build_pdf_tool(generate_and_upload_swot_pdf, "stub", mode="direct"),
+        FunctionTool,
+    )
+    monkeypatch.setenv("PDF_TOOL_MODE", "agent")
+    assert isinstance(build_pdf_tool(generate_and_upload_swot_pdf, "stub"), AgentTool)
+    with pytest.raises(ValueError):
+        build_pdf_tool(generate_and_upload_swot_pdf, "stub", mode="other")
+
+
+@pytest.mark.asyncio
+async def test_direct_mode_skips_the_sub_agent_hop() -> None:
+    pdf_calls.clear()
+    direct = await request_pdf("direct")
+    agent = await request_pdf("agent")
+
+    assert pdf_calls == ["Acme", "Acme"]
+    assert direct.calls == 2
+    assert agent.calls == 4
+    assert direct.prompt_tokens + direct.output_tokens < (
+        agent.prompt_tokens + agent.output_tokens
+    )
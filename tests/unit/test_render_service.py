@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import itertools
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from app.app_utils import render_service
+from app.app_utils.render_service import PdfRenderService, RenderQueueFullError
+
+SWOT_TEXT = """### Strengths
+* Strong brand
+### Weaknesses
+* High costs
+Some closing remarks.
+"""
+
+
+def slow_render(swot_analysis_text: str, company_name: str) -> bytes:
+    """Stand-in for a large report: holds a worker busy for a while."""
+    time.sleep(0.5)
+    return f"{company_name}:{len(swot_analysis_text)}".encode()
+
+
+@pytest.fixture
+def service() -> Iterator[PdfRenderService]:
+    service = PdfRenderService(render_workers=2, upload_workers=2, max_pending=2)
+    yield service
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_render_produces_pdf(service: PdfRenderService) -> None:
+    pdf_content = await service.render(SWOT_TEXT, "Acme Corp")
+    assert pdf_content.startswith(b"%PDF")
+
+
+@pytest.mark.asyncio
+async def test_sessions_keep_streaming_while_rendering(
+    service: PdfRenderService,
+) -> None:
+    """Other sessions on the loop must not stall while a PDF renders."""
+    service.render_fn = slow_render
+    await service.render("warm", "up")  # Start the worker processes.
+
+    ticks: list[float] = []
+    rendering = True
+
+    async def stream_session() -> None:
+        while rendering:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    streamer = asyncio.create_task(stream_session())
+    results = await asyncio.gather(
+        service.render(SWOT_TEXT, "Acme"), service.render(SWOT_TEXT, "Globex")
+    )
+    rendering = False
+    await streamer
+
+    assert list(results) == [b"Acme:79", b"Globex:79"]
+    assert len(ticks) > 20
+    assert max(b - a for a, b in itertools.pairwise(ticks)) < 0.2
+
+
+@pytest.mark.asyncio
+async def test_back_pressure_when_queue_full() -> None:
+    service = PdfRenderService(
+        render_workers=1, max_pending=1, queue_timeout=0.1, render_fn=slow_render
+    )
+    try:
+        first = asyncio.create_task(service.render(SWOT_TEXT, "Acme"))
+        await asyncio.sleep(0)
+        with pytest.raises(RenderQueueFullError):
+            await service.render(SWOT_TEXT, "Globex")
+        assert await first == b"Acme:79"
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_upload_runs_in_io_pool(service: PdfRenderService) -> None:
+    result = await service.upload(lambda data: data.upper(), b"pdf")
+    assert result == b"PDF"
+
+
+@pytest.mark.parametrize(
+    ("cpus", "num_workers", "expected"), [(8, "1", 4), (8, "4", 2), (2, "4", 1)]
+)
+def test_render_pool_shares_cpus_between_serving_workers(
+    monkeypatch: pytest.MonkeyPatch, cpus: int, num_workers: str, expected: int
+) -> None:
+    monkeypatch.setattr(render_service, "available_cpus", lambda: cpus)
+    monkeypatch.setenv("NUM_WORKERS", num_workers)
+    monkeypatch.delenv("PDF_RENDER_WORKERS", raising=False)
+
+    assert PdfRenderService().render_workers == expected
@@ -0,0 +1,105 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import pytest
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.research import build_research_stage
+from tests.fakes import StubLlm
+
+
+def topic_answer(llm_request: LlmRequest) -> str:
+    instruction = str(llm_request.config.system_instruction)
+    return "finding for " + instruction.split("Research the ")[1].split(":")[0]
+
+
+def build_stage(concurrency: int, latency: float) -> BaseAgent:
+    return build_research_stage(
+        model=StubLlm(latency=latency, respond=topic_answer),
+        tools=[],
+        concurrency=concurrency,
+        extra_topics=[],
+    )
+
+
+async def run_stage(stage: BaseAgent) -> tuple[str, float]:
+    runner = InMemoryRunner(agent=stage, app_name="test")
+    session = await runner.session_service.create_session(
+        app_name="test", user_id="user"
+    )
+    message = types.Content(role="user", parts=[types.Part.from_text(text="Acme")])
+    start = time.perf_counter()
+    events = [
+        event
+        async for event in runner.run_async(
+            user_id="user", session_id=session.id, new_message=message
+        )
+    ]
+    elapsed = time.perf_counter() - start
+    content = events[-1].content
+    assert content is not None and content.parts
+    return content.parts[0].text or "", elapsed
+
+
+@pytest.mark.asyncio
+async def test_concurrency_caps_researchers_in_flight() -> None:
+    in_flight = peak = 0
+
+    async def acquire(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+
+    async def release(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> None:
+        nonlocal in_flight
+        in_flight -= 1
+
+    stage = build_research_stage(
+        model=StubLlm(latency=0.05, respond=topic_answer),
+        tools=[],
+        concurrency=2,
+        extra_topics=["news"],
+    )
+    for researcher in stage.sub_agents[0].sub_agents:
+        assert isinstance(researcher, LlmAgent)
+        researcher.before_model_callback = acquire
+        researcher.after_model_callback = release
+
+    merged, _ = await run_stage(stage)
+    assert "finding for the most important news" in merged
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_research_is_merged_into_one_context() -> None:
+    merged, _ = await run_stage(build_stage(concurrency=4, latency=0))
+    assert merged.index("## Strengths") < merged.index("## Threats")
+    assert "finding for internal strengths" in merged
+    assert "finding for external threats" in merged
+
+
+@pytest.mark.asyncio
+async def test_quadrants_run_concurrently() -> None:
+    _, parallel = await run_stage(build_stage(concurrency=4, latency=0.2))
+    assert parallel < 0.6  # Sequential research takes at least 4 * 0.2s.
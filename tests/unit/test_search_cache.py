@@ -0,0 +1,166 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from app.app_utils.search_cache import (
+    CachedAgentTool,
+    InMemorySearchCache,
+    SqliteSearchCache,
+    normalize_query,
+)
+from app.research import build_research_stage
+from tests.fakes import StubLlm
+
+
+class FakeSearchAgent(BaseAgent):
+    """Answers every request without touching the network."""
+
+    calls: int = 0
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        self.calls += 1
+        parts = ctx.user_content.parts if ctx.user_content else None
+        query = parts[0].text if parts else ""
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            content=types.Content(
+                role="model",
+                parts=[types.Part.from_text(text=f"result {self.calls}: {query}")],
+            ),
+            actions=EventActions(state_delta={"search_calls": self.calls}),
+        )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def make_tool_context(agent: BaseAgent) -> ToolContext:
+    session_service = InMemorySessionService()
+    session = await session_service.create_session(app_name="test", user_id="user")
+    ctx = InvocationContext(
+        session_service=session_service,
+        invocation_id="inv",
+        agent=agent,
+        session=session,
+    )
+    return ToolContext(ctx)
+
+
+def test_normalize_query() -> None:
+    assert normalize_query("  Acme   Corp SWOT? ") == "acme corp swot"
+    assert normalize_query("ACME corp swot") == "acme corp swot"
+
+
+@pytest.mark.asyncio
+async def test_repeat_queries_skip_the_search_agent() -> None:
+    agent = FakeSearchAgent(name="google_search_agent")
+    tool = CachedAgentTool(agent, InMemorySearchCache())
+    tool_context = await make_tool_context(agent)
+
+    first = await tool.run_async(
+        args={"request": "Acme SWOT"}, tool_context=tool_context
+    )
+    second = await tool.run_async(
+        args={"request": "  acme swot?"}, tool_context=tool_context
+    )
+
+    assert first == second == "result 1: Acme SWOT"
+    assert agent.calls == 1
+    assert tool.stats.hits == 1
+    assert tool.stats.misses == 1
+    assert tool.metrics()["hit_rate"] == 0.5
+    assert tool.stats.latency_saved > 0
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate() -> None:
+    agent = FakeSearchAgent(name="google_search_agent")
+    clock = FakeClock()
+    tool = CachedAgentTool(
+        agent, InMemorySearchCache(), ttl=10, stale_ttl=10, clock=clock
+    )
+    tool_context = await make_tool_context(agent)
+    args = {"request": "Acme SWOT"}
+
+    await tool.run_async(args=args, tool_context=tool_context)
+    clock.now += 15
+    stale = await tool.run_async(args=args, tool_context=tool_context)
+    assert stale == "result 1: Acme SWOT"
+    assert tool.stats.stale_hits == 1
+
+    while tool._refreshing:
+        await asyncio.sleep(0)
+    assert agent.calls == 2
+    # The refresh ran detached from the caller, whose state it left alone.
+    assert tool_context.state["search_calls"] == 1
+    assert await tool.run_async(args=args, tool_context=tool_context) == (
+        "result 2: Acme SWOT"
+    )
+
+    clock.now += 100
+    await tool.run_async(args=args, tool_context=tool_context)
+    assert tool.stats.misses == 2
+    assert agent.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_persists_results(tmp_path: Path) -> None:
+    path = str(tmp_path / "search_cache.sqlite3")
+    agent = FakeSearchAgent(name="google_search_agent")
+    tool_context = await make_tool_context(agent)
+
+    tool = CachedAgentTool(agent, SqliteSearchCache(path))
+    await tool.run_async(args={"request": "Acme SWOT"}, tool_context=tool_context)
+
+    restarted = CachedAgentTool(agent, SqliteSearchCache(path))
+    result = await restarted.run_async(
+        args={"request": "acme swot"}, tool_context=tool_context
+    )
+    assert result == "result 1: Acme SWOT"
+    assert agent.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_research_stage_is_cached_by_company() -> None:
+    model = StubLlm(respond=lambda llm_request: "finding")
+    stage = build_research_stage(model=model, tools=[], extra_topics=[])
+    tool = CachedAgentTool(stage, InMemorySearchCache())
+    tool_context = await make_tool_context(stage)
+
+    first = await tool.run_async(args={"request": "Acme"}, tool_context=tool_context)
+    second = await tool.run_async(args={"request": " acme "}, tool_context=tool_context)
+
+    assert first == second
+    assert "## Strengths\nfinding" in first
+    assert model.calls == 4
+    assert tool.cache_key({"request": "Acme"}) == "swot_research_agent:acme"
@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+from app.app_utils.storage import (
+    ConnectionStats,
+    StoragePool,
+    build_artifact_service,
+    connection_trace_config,
+)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool() -> StoragePool:
+    return StoragePool(project="test-project", credentials=AnonymousCredentials())
+
+
+@pytest.mark.asyncio
+async def test_trace_config_counts_reused_connections(server_url: str) -> None:
+    stats = ConnectionStats()
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=2),
+        trace_configs=[connection_trace_config(stats)],
+    ) as session:
+        for _ in range(3):
+            async with session.get(server_url) as response:
+                await response.read()
+    assert stats == ConnectionStats(opened=1, reused=2)
+
+
+def test_storage_client_reuses_pooled_connections(
+    pool: StoragePool, server_url: str
+) -> None:
+    session = pool.storage_client_kwargs()["_http"]
+    for _ in range(3):
+        session.get(server_url).raise_for_status()
+    assert pool.stats()["storage_client"] == {"opened": 1, "reused": 2}
+
+
+def test_storage_session_is_created_once(pool: StoragePool) -> None:
+    session = pool.storage_client_kwargs()["_http"]
+    assert pool.storage_client_kwargs()["_http"] is session
+    assert pool.project == "test-project"
+
+
+def test_artifact_service_shares_storage_pool(
+    pool: StoragePool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("app.app_utils.storage._storage_pool", pool)
+    service = build_artifact_service("test-bucket")
+    assert service.storage_client._http is pool.storage_client_kwargs()["_http"]
+    assert service.bucket.name == "test-bucket"
+
+
+@pytest.mark.asyncio
+async def test_async_filesystem_is_pooled_per_event_loop(
+    pool: StoragePool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        pool, "_filesystem_kwargs", lambda: {"project": "test-project", "token": "anon"}
+    )
+    fs = await pool.async_filesystem()
+    try:
+        assert fs.asynchronous
+        assert await pool.async_filesystem() is fs
+        assert isinstance(fs.session_kwargs["connector"], aiohttp.TCPConnector)
+    finally:
+        await fs.session.close()
@@ -0,0 +1,163 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from collections.abc import Iterator
+from typing import Any
+
+import fsspec
+import pytest
+from google.adk.agents import Agent
+from google.adk.apps.app import App
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from app.app_utils import publish
+from app.app_utils.analysis_store import store_analysis
+from app.app_utils.telemetry import (
+    StageMetricsPlugin,
+    setup_local_telemetry,
+    stage_span,
+)
+from app.pdf_tool import build_pdf_tool, generate_and_upload_swot_pdf
+from tests.fakes import (
+    InlineRenderService,
+    MemoryStoragePool,
+    StubLlm,
+    pdf_request_script,
+    swot_markdown,
+    swot_research_agent,
+)
+
+
+@pytest.fixture
+def telemetry() -> Iterator[tuple[InMemorySpanExporter, InMemoryMetricReader]]:
+    exporter, reader = setup_local_telemetry()
+    exporter.clear()
+    yield exporter, reader
+
+
+def histogram_points(reader: InMemoryMetricReader, name: str) -> list[Any]:
+    data = reader.get_metrics_data()
+    assert data is not None
+    return [
+        point
+        for resource_metrics in data.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+        if metric.name == name
+        for point in metric.data.data_points
+    ]
+
+
+async def send(runner: InMemoryRunner, session_id: str, text: str) -> None:
+    message = types.Content(role="user", parts=[types.Part.from_text(text=text)])
+    async for _ in runner.run_async(
+        user_id="user", session_id=session_id, new_message=message
+    ):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_pdf_turn_span_tree_and_metrics(
+    monkeypatch: pytest.MonkeyPatch,
+    telemetry: tuple[InMemorySpanExporter, InMemoryMetricReader],
+) -> None:
+    exporter, reader = telemetry
+    memory_fs = fsspec.filesystem("memory")
+    monkeypatch.setattr(
+        publish, "get_storage_pool", lambda: MemoryStoragePool(memory_fs)
+    )
+    monkeypatch.setattr(publish, "get_render_service", InlineRenderService)
+    monkeypatch.setattr(publish, "get_pdf_cache", lambda: None)
+    analysis = swot_markdown(5)
+    model = StubLlm(
+        respond=pdf_request_script(
+            {"company_name": "Acme", "analysis_key": "swot_analysis_1"}, analysis
+        )
+    )
+    root_agent = Agent(
+        name="swot_agent",
+        model=model,
+        tools=[
+            swot_research_agent,
+            build_pdf_tool(generate_and_upload_swot_pdf, model, mode="direct"),
+        ],
+        after_model_callback=store_analysis,
+    )
+    runner = InMemoryRunner(
+        app=App(name="test", root_agent=root_agent, plugins=[StageMetricsPlugin()])
+    )
+    session = await runner.session_service.create_session(
+        app_name="test", user_id="user"
+    )
+
+    await send(runner, session.id, "Analyze Acme")
+    existing = set(memory_fs.find("/"))
+    await send(runner, session.id, "Yes, create the PDF")
+    [uploaded] = set(memory_fs.find("/")) - existing
+
+    # Finished spans have a context, parent and attributes.
+    spans: dict[str, Any] = {span.name: span for span in exporter.get_finished_spans()}
+    tool_span = spans["execute_tool generate_and_upload_swot_pdf"]
+    publish_span = spans["swot.pdf.publish"]
+    render_span = spans["swot.pdf.render"]
+    upload_span = spans["swot.pdf.upload"]
+    assert publish_span.parent.span_id == tool_span.context.span_id
+    assert render_span.parent.span_id == publish_span.context.span_id
+    assert upload_span.parent.span_id == publish_span.context.span_id
+    assert publish_span.attributes["swot.report.chars"] == len(analysis)
+    assert render_span.attributes["swot.pdf.pages"] >= 1
+    assert upload_span.attributes["swot.upload.bytes"] == memory_fs.size(uploaded)
+    assert render_span.end_time <= upload_span.start_time
+
+    stages = {
+        (point.attributes["swot.stage"], point.attributes.get("gen_ai.tool.name"))
+        for point in histogram_points(reader, "swot.stage.duration")
+    }
+    assert {
+        ("llm", None),
+        ("tool", "generate_and_upload_swot_pdf"),
+        ("pdf.publish", None),
+        ("pdf.render", None),
+        ("pdf.upload", None),
+    } <= stages
+    assert any(
+        point.max == upload_span.attributes["swot.upload.bytes"]
+        for point in histogram_points(reader, "swot.pdf.size")
+    )
+    token_types = {
+        point.attributes["gen_ai.token.type"]
+        for point in histogram_points(reader, "swot.llm.tokens")
+    }
+    assert token_types == {"input", "output"}
+
+
+def test_stage_span_labels_failures(
+    telemetry: tuple[InMemorySpanExporter, InMemoryMetricReader],
+) -> None:
+    exporter, reader = telemetry
+
+    with pytest.raises(TimeoutError), stage_span("search", {"swot.query": "acme"}):
+        raise TimeoutError
+
+    [span] = exporter.get_finished_spans()
+    assert span.name == "swot.search"
+    assert not span.status.is_ok
+    assert any(
+        dict(point.attributes) == {"swot.stage": "search", "error.type": "TimeoutError"}
+        for point in histogram_points(reader, "swot.stage.duration")
+    )
@@ -0,0 +1,196 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any
+
+import fsspec
+import pytest
+
+from app.app_utils import publish
+from app.app_utils.upload_queue import UploadQueue
+from tests.fakes import InlineRenderService, MemoryStoragePool, swot_markdown
+
+
+class FlakyFileSystem:
+    """Memory filesystem whose first `failures` uploads raise."""
+
+    def __init__(self, failures: int = 0, gate: threading.Event | None = None):
+        self.fs = fsspec.filesystem("memory")
+        self.failures = failures
+        self.gate = gate
+        self.attempts = 0
+
+    def put_file(self, lpath: str, rpath: str) -> None:
+        self.attempts += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.attempts <= self.failures:
+            raise ConnectionError("upload interrupted")
+        self.fs.put_file(lpath, rpath)
+
+
+def spool(queue: UploadQueue, data: bytes = b"%PDF-1.4") -> Any:
+    job = queue.new_job(f"/bucket-{uuid.uuid4().hex}/pdfs/SWOT_Acme.pdf")
+    Path(job.staging_file).write_bytes(data)
+    queue.submit(job)
+    return job
+
+
+def test_uploads_spooled_pdf_and_clears_spool(tmp_path: Path) -> None:
+    storage = FlakyFileSystem()
+    uploaded: list[str] = []
+    queue = UploadQueue(
+        lambda: storage,
+        spool_dir=str(tmp_path),
+        workers=2,
+        on_uploaded=lambda job: uploaded.append(job.full_path),
+    ).start()
+
+    job = spool(queue)
+
+    assert queue.join(5)
+    assert storage.fs.cat_file(job.full_path) == b"%PDF-1.4"
+    assert uploaded == [job.full_path]
+    assert queue.status() == {"pending": [], "failed": [], "uploaded": 1}
+    assert os.listdir(tmp_path) == []
+    queue.close()
+
+
+def test_retries_to_the_same_object(tmp_path: Path) -> None:
+    storage = FlakyFileSystem(failures=2)
+    queue = UploadQueue(
+        lambda: storage, spool_dir=str(tmp_path), workers=1, retry_delay=0.01
+    ).start()
+
+    job = spool(queue)
+
+    assert queue.join(5)
+    assert storage.attempts == 3
+    assert storage.fs.find(os.path.dirname(job.full_path)) == [job.full_path]
+    queue.close()
+
+
+def test_failed_uploads_are_reported_and_resumed_on_restart(tmp_path: Path) -> None:
+    queue = UploadQueue(
+        lambda: FlakyFileSystem(failures=99),
+        spool_dir=str(tmp_path),
+        workers=1,
+        max_attempts=2,
+        retry_delay=0.01,
+    ).start()
+    job = spool(queue)
+
+    assert queue.join(5)
+    [failed] = queue.status()["failed"]
+    assert failed["full_path"] == job.full_path
+    assert failed["attempts"] == 2
+    assert "upload interrupted" in failed["error"]
+    queue.close()
+
+    storage = FlakyFileSystem()
+    restarted = UploadQueue(lambda: storage, spool_dir=str(tmp_path)).start()
+    assert restarted.join(5)
+    assert storage.fs.exists(job.full_path)
+    assert restarted.status()["uploaded"] == 1
+    restarted.close()
+
+
+def test_callback_errors_do_not_stop_the_queue(tmp_path: Path) -> None:
+    storage = FlakyFileSystem()
+
+    def on_uploaded(job: Any) -> None:
+        raise RuntimeError("cache unavailable")
+
+    queue = UploadQueue(
+        lambda: storage, spool_dir=str(tmp_path), workers=1, on_uploaded=on_uploaded
+    ).start()
+
+    jobs = [spool(queue), spool(queue)]
+
+    assert queue.join(5)
+    assert all(storage.fs.exists(job.full_path) for job in jobs)
+    assert queue.status()["uploaded"] == 2
+    queue.close()
+
+
+def test_recovery_skips_jobs_claimed_by_live_processes(tmp_path: Path) -> None:
+    dead_pid = 2**22 + 1  # Above the default pid_max, so never alive.
+    queue = UploadQueue(lambda: None, spool_dir=str(tmp_path), workers=1)
+    claimed, abandoned = (queue.new_job(f"/bucket/pdfs/{i}.pdf") for i in range(2))
+    for job in (claimed, abandoned):
+        Path(job.spool_file).write_bytes(b"%PDF-1.4")
+        job.owner = dead_pid
+        queue._write_manifest(job)
+    # Another process is taking over one job; the other one's claimant died.
+    os.rename(claimed.manifest_file, f"{claimed.manifest_file}.{os.getppid()}")
+    os.rename(abandoned.manifest_file, f"{abandoned.manifest_file}.{dead_pid}")
+
+    storage = FlakyFileSystem()
+    restarted = UploadQueue(lambda: storage, spool_dir=str(tmp_path)).start()
+    assert restarted.join(5)
+    restarted.close()
+
+    assert storage.fs.exists(abandoned.full_path)
+    assert not storage.fs.exists(claimed.full_path)
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [f"{claimed.job_id}.pdf", f"{claimed.job_id}.json.{os.getppid()}"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_render_leaves_no_staging_file(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    queue = UploadQueue(lambda: None, spool_dir=str(tmp_path))
+
+    def render(path: str, *args: Any) -> int:
+        Path(path).write_bytes(b"%PDF-1.4")
+        raise ValueError("layout failed")
+
+    monkeypatch.setattr(publish, "get_upload_queue", lambda: queue)
+    monkeypatch.setattr(publish, "get_render_service", InlineRenderService)
+    monkeypatch.setattr(publish, "render_swot_pdf_to_file", render)
+
+    with pytest.raises(ValueError):
+        await publish._render_to_spool("/bucket/pdfs/SWOT_Acme.pdf", None, "", "Acme")
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_write_behind_returns_url_before_upload(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    gate = threading.Event()
+    storage = FlakyFileSystem(gate=gate)
+    queue = UploadQueue(lambda: storage, spool_dir=str(tmp_path)).start()
+    monkeypatch.setenv("PDF_UPLOAD_MODE", "write-behind")
+    monkeypatch.setattr(
+        publish, "get_storage_pool", lambda: MemoryStoragePool(storage.fs)
+    )
+    monkeypatch.setattr(publish, "get_render_service", InlineRenderService)
+    monkeypatch.setattr(publish, "get_pdf_cache", lambda: None)
+    monkeypatch.setattr(publish, "get_upload_queue", lambda: queue)
+
+    url = await publish.publish_swot_pdf("Acme", swot_markdown(5))
+
+    [pending] = queue.status()["pending"]
+    assert url.endswith(pending["full_path"])
+    assert not storage.fs.exists(pending["full_path"])
+    gate.set()
+    assert queue.join(5)
+    assert storage.fs.cat_file(pending["full_path"]).startswith(b"%PDF")
+    queue.close()
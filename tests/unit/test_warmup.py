@@ -0,0 +1,115 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from google.adk.agents import Agent, SequentialAgent
+from google.adk.tools import AgentTool
+
+from app.app_utils import warmup
+from app.app_utils.model_backend import Cassette, RecordingLlm
+from app.app_utils.model_tiers import RoutedLlm
+from tests.fakes import StubLlm
+
+
+def test_iter_models_walks_sub_agents_and_agent_tools() -> None:
+    shared, root_model, sub_model = StubLlm(), StubLlm(), StubLlm()
+    research = SequentialAgent(
+        name="research",
+        sub_agents=[
+            Agent(name="a", model=shared),
+            Agent(name="b", model=shared),
+        ],
+    )
+    root = Agent(
+        name="root",
+        model=root_model,
+        tools=[AgentTool(research)],
+        sub_agents=[Agent(name="sub", model=sub_model)],
+    )
+    models = list(warmup.iter_models(root))
+    assert len(models) == 3
+    assert {id(m) for m in models} == {id(shared), id(root_model), id(sub_model)}
+
+
+def test_iter_models_unwraps_routed_and_recording_models(tmp_path: Path) -> None:
+    heavy, light, recorded = StubLlm(), StubLlm(), StubLlm()
+    routed = RoutedLlm(model="routed", heavy=heavy, light=light)
+    root = Agent(
+        name="root",
+        model=routed,
+        sub_agents=[
+            Agent(
+                name="sub",
+                model=RecordingLlm(
+                    model="stub",
+                    inner=recorded,
+                    cassette=Cassette(tmp_path / "cassette.json"),
+                ),
+            )
+        ],
+    )
+    models = {id(m) for m in warmup.iter_models(root)}
+    assert {id(heavy), id(light), id(recorded), id(routed)} <= models
+
+
+def test_warm_up_renders_on_every_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    created: list[str] = []
+    service = SimpleNamespace(render_workers=2, render_pool=ThreadPoolExecutor(2))
+    monkeypatch.setattr(warmup, "get_render_service", lambda: service)
+    monkeypatch.setattr(
+        warmup,
+        "get_storage_pool",
+        lambda: SimpleNamespace(filesystem=lambda: created.append("fs")),
+    )
+    monkeypatch.setenv("WARMUP_STEPS", "storage,render")
+    rendered: list[int] = []
+    worker = warmup.warm_render_worker
+
+    def counting_worker() -> int:
+        pages = worker()
+        rendered.append(pages)
+        return pages
+
+    monkeypatch.setattr(warmup, "warm_render_worker", counting_worker)
+
+    report = warmup.warm_up(Agent(name="root", model=StubLlm()))
+
+    assert list(report.durations) == ["storage", "render"]
+    assert report.errors == {}
+    assert created == ["fs"]
+    assert len(rendered) == 2
+    assert all(pages >= 1 for pages in rendered)
+
+
+def test_failed_step_is_reported_and_others_run(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def no_credentials() -> None:
+        raise OSError("no credentials")
+
+    monkeypatch.setattr(warmup, "get_storage_pool", no_credentials)
+
+    report = warmup.warm_up(Agent(name="root", model=StubLlm()), ["models", "storage"])
+
+    assert list(report.durations) == ["models", "storage"]
+    assert report.errors == {"storage": "no credentials"}
+    assert report.to_dict()["total_s"] == report.total
+
+
+def test_unknown_step_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        warmup.warm_up(Agent(name="root", model=StubLlm()), ["fonts"])